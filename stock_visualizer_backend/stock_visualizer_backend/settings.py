@@ -26,6 +26,10 @@ STATIC_ROOT = '/home/ubuntu/web-projects/finance/static_files'
 # RAPIDAPI_KEY = env('RAPIDAPI_KEY')
 # BE SURE TO FIX THIS!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
 RAPIDAPI_KEY='b577ed1706msh668cf605f5832dfp138561jsn2e972d085c15'
+# Alpha Vantage endpoints: JSON through RapidAPI, CSV directly. Point both at a local
+# stand-in (`manage.py mock_alpha_vantage`) to run syncs offline.
+ALPHA_VANTAGE_URL = env('ALPHA_VANTAGE_URL', default='https://alpha-vantage.p.rapidapi.com/query')
+ALPHA_VANTAGE_CSV_URL = env('ALPHA_VANTAGE_CSV_URL', default='https://www.alphavantage.co/query')
 AWS_ACCESS_KEY_ID = env('AWS_ACCESS_KEY_ID')
 AWS_SECRET_ACCESS_KEY = env('AWS_SECRET_ACCESS_KEY')
 AWS_STORAGE_BUCKET_NAME = env('AWS_STORAGE_BUCKET_NAME')
@@ -79,6 +83,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so that its request timings cover all other middleware
+    'stocks.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -108,6 +114,13 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'stock_visualizer_backend.wsgi.application'
+# For ASGI servers, e.g. `uvicorn stock_visualizer_backend.asgi:application`. The
+# per-symbol views are async and don't hold a worker thread while they wait on queries.
+# Under ASGI, sync code runs on threads that come and go, so persistent connections
+# (CONN_MAX_AGE) would pile up unused instead of being reused: asgi.py sets
+# DJANGO_SERVER_INTERFACE=asgi, which turns them off by default. Use DB_POOL instead.
+ASGI_APPLICATION = 'stock_visualizer_backend.asgi.application'
+SERVER_INTERFACE = env('DJANGO_SERVER_INTERFACE', default='wsgi')
 
 
 LOGGING = {
@@ -147,9 +160,41 @@ DATABASES = {
         'PASSWORD': env('DB_PASSWORD'),
         'HOST': env('DB_HOST'),  # Or your PostgreSQL server address
         'PORT': env('DB_PORT'),
+        # Keep connections open across requests (in seconds; 0 closes the connection at
+        # the end of every request) and check them before reuse. Off under ASGI, see above.
+        'CONN_MAX_AGE': env.int('DB_CONN_MAX_AGE', default=0 if SERVER_INTERFACE == 'asgi' else 60),
+        'CONN_HEALTH_CHECKS': env.bool('DB_CONN_HEALTH_CHECKS', default=True),
     }
 }
 
+# Alternatively, Django's connection pool (Django 5.1+, requires psycopg 3 with
+# psycopg[pool] instead of psycopg2). Pooled connections replace persistent ones, and
+# are the way to reuse connections under ASGI.
+if env.bool('DB_POOL', default=False):
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': env.int('DB_POOL_MIN_SIZE', default=2),
+            'max_size': env.int('DB_POOL_MAX_SIZE', default=10),
+            'timeout': env.int('DB_POOL_TIMEOUT', default=10),
+        },
+    }
+
+# A local SQLite file instead, e.g. to run the benchmarks against both databases
+if env('DB_ENGINE', default='postgresql') == 'sqlite':
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': env('DB_SQLITE_NAME', default=str(BASE_DIR / 'db.sqlite3')),
+        'CONN_MAX_AGE': DATABASES['default']['CONN_MAX_AGE'],
+        'CONN_HEALTH_CHECKS': DATABASES['default']['CONN_HEALTH_CHECKS'],
+    }
+
+
+
+# Optional columnar mirror of StockPriceData (see stocks/utils/price_store.py). When
+# enabled, syncs keep it up to date and the analytics endpoints read prices from it.
+PRICE_STORE_ENABLED = env.bool('PRICE_STORE_ENABLED', default=False)
+PRICE_STORE_DIR = env('PRICE_STORE_DIR', default=str(BASE_DIR / 'data' / 'price_store'))
 
 
 # Password validation
@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class StocksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'stocks'
+
+    def ready(self):
+        from stocks.utils import metrics
+
+        connection_created.connect(metrics.install_query_recorder, dispatch_uid='stocks.metrics.record_query')
@@ -0,0 +1,52 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from stocks.utils import benchmarks, synthetic
+
+
+class Command(BaseCommand):
+    help = 'Runs performance benchmarks against the configured database and prints the timings.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'names',
+            nargs='*',
+            help=f"The benchmarks to run: {', '.join(benchmarks.BENCHMARKS)} (default: all)",
+        )
+        parser.add_argument('--repeat', type=int, default=3, help='Number of timed runs per benchmark')
+        parser.add_argument(
+            '--size',
+            choices=list(synthetic.SIZES),
+            default=synthetic.DEFAULT_SIZE,
+            help='Size of the synthetic payloads of the sync and views benchmarks',
+        )
+        parser.add_argument('--seed', type=int, default=0, help='Seed of the synthetic payloads')
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+        parser.add_argument('--compare', help='Compare the timings with a JSON results file of an earlier run')
+
+    def handle(self, *args, **options):
+        names = options['names'] or list(benchmarks.BENCHMARKS)
+        unknown = set(names) - set(benchmarks.BENCHMARKS)
+        if unknown:
+            raise CommandError(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+
+        run = benchmarks.run_benchmarks(
+            names, repeat=options['repeat'], size=options['size'], seed=options['seed']
+        )
+        for name, result in run['results'].items():
+            self.stdout.write(f"{name}: {json.dumps(result, indent=2)}")
+
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                json.dump(run, file, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+        if options['compare']:
+            with open(options['compare']) as file:
+                baseline = json.load(file)
+            self.stdout.write(f"Compared with {baseline.get('commit') or options['compare']}:")
+            for row in benchmarks.compare_results(baseline, run):
+                ratio = f"{row['ratio']:.2f}x" if row['ratio'] is not None else 'n/a'
+                self.stdout.write(
+                    f"  {row['path']}: {row['baseline'] * 1000:.3f}ms -> {row['current'] * 1000:.3f}ms ({ratio})"
+                )
@@ -0,0 +1,36 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from stocks.utils import loadtest
+
+
+class Command(BaseCommand):
+    help = (
+        'Load tests endpoints under concurrent clients and prints p50/p99 latency and '
+        'throughput, comparing the WSGI and ASGI applications in-process or a running server.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help='Request paths, e.g. /summary/AAPL/')
+        parser.add_argument('--clients', type=int, default=16, help='Number of concurrent clients')
+        parser.add_argument('--requests', type=int, default=500, help='Total requests per target')
+        parser.add_argument(
+            '--target',
+            action='append',
+            choices=loadtest.TARGETS,
+            help='In-process application to test (repeatable, default: both)',
+        )
+        parser.add_argument('--url', help='Base URL of a running server to test instead, e.g. http://localhost:8000')
+
+    def handle(self, *args, **options):
+        if options['clients'] < 1 or options['requests'] < 1:
+            raise CommandError('--clients and --requests must be at least 1')
+        results = loadtest.load_test(
+            options['paths'],
+            clients=options['clients'],
+            requests=options['requests'],
+            targets=options['target'] or loadtest.TARGETS,
+            url=options['url'],
+        )
+        for target, summary in results.items():
+            self.stdout.write(f"{target}: {json.dumps(summary, indent=2)}")
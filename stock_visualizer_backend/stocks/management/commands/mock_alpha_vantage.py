@@ -0,0 +1,55 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from stocks.utils import mock_av, synthetic
+
+
+class Command(BaseCommand):
+    help = (
+        'Serves a local stand-in for the Alpha Vantage API with recorded or synthetic payloads, '
+        'configurable latency, rate limits and injected 429s. Point ALPHA_VANTAGE_URL and '
+        'ALPHA_VANTAGE_CSV_URL at it to run syncs offline.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1', help='Address to listen on')
+        parser.add_argument('--port', type=int, default=8765, help='Port to listen on')
+        parser.add_argument('--latency', type=float, default=0.0, help='Delay of every response in milliseconds')
+        parser.add_argument('--jitter', type=float, default=0.0, help='Random extra delay of up to this many milliseconds')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='Share of requests answered with a 429 (0-1)')
+        parser.add_argument('--rate-limit', type=int, default=None, help='Requests allowed per API key per window')
+        parser.add_argument('--rate-window', type=float, default=60.0, help='Rate limit window in seconds')
+        parser.add_argument('--recordings', help='Directory of recorded payloads, e.g. OVERVIEW_AAPL.json')
+        parser.add_argument(
+            '--size', choices=list(synthetic.SIZES), default=synthetic.DEFAULT_SIZE, help='Size of synthetic payloads'
+        )
+        parser.add_argument('--seed', type=int, default=0, help='Seed of synthetic payloads and injected errors')
+
+    def handle(self, *args, **options):
+        try:
+            server = mock_av.make_server(
+                options['host'],
+                options['port'],
+                latency=options['latency'] / 1000,
+                jitter=options['jitter'] / 1000,
+                error_rate=options['error_rate'],
+                rate_limit=options['rate_limit'],
+                rate_window=options['rate_window'],
+                recordings=options['recordings'],
+                size=options['size'],
+                seed=options['seed'],
+            )
+        except (ValueError, OSError) as e:
+            raise CommandError(str(e))
+
+        url = mock_av.query_url(server)
+        self.stdout.write(f"Serving {len(mock_av.SUPPORTED_FUNCTIONS)} Alpha Vantage functions at {url}")
+        self.stdout.write(f"Run syncs against it with ALPHA_VANTAGE_URL={url} ALPHA_VANTAGE_CSV_URL={url}")
+        self.stdout.write(f"Counters are at {url.replace('/query', '/stats')}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(f"Stats: {json.dumps(server.mock.stats)}")
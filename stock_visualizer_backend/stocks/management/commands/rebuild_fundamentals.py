@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from stocks.models import BaseStockData
+from stocks.utils import fundamentals
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the derived TTM and ratio metrics from the stored quarterly statements.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start-index', type=int, help='Start index for stock selection', default=None)
+        parser.add_argument('--stop-index', type=int, help='Stop index for stock selection', default=None)
+        parser.add_argument('--include-all', action='store_true', help='Include all stocks, not just S&P 500')
+
+    def handle(self, *args, **options):
+        if options['include_all']:
+            stocks_to_iterate = BaseStockData.objects.all()
+        else:
+            stocks_to_iterate = BaseStockData.objects.filter(is_sp500=True)
+        stocks_to_iterate = stocks_to_iterate.order_by('symbol')[options['start_index']:options['stop_index']]
+
+        fundamentals.rebuild_fundamental_metrics(stocks_to_iterate)
+        self.stdout.write(f"Recomputed fundamental metrics for {len(stocks_to_iterate)} stocks")
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from stocks.models import BaseStockData, StockPriceData
+from stocks.utils import price_store
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the columnar price store from StockPriceData.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=str,
+            choices=[choice for choice, _ in StockPriceData.INTERVAL_CHOICES],
+            help='Only rebuild this interval (default: all intervals)',
+        )
+        parser.add_argument('--include-all', action='store_true', help='Include all stocks, not just S&P 500')
+
+    def handle(self, *args, **options):
+        if options['include_all']:
+            stocks_to_iterate = BaseStockData.objects.all()
+        else:
+            stocks_to_iterate = BaseStockData.objects.filter(is_sp500=True)
+        symbols = list(stocks_to_iterate.order_by('symbol').values_list('symbol', flat=True))
+
+        if options['interval']:
+            intervals = [options['interval']]
+        else:
+            intervals = [choice for choice, _ in StockPriceData.INTERVAL_CHOICES]
+
+        price_store.rebuild(symbols, intervals)
+        self.stdout.write(f"Rebuilt the price store for {len(symbols)} stocks")
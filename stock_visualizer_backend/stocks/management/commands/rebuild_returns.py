@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from stocks.models import BaseStockData, StockPriceData
+from stocks.utils import returns
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the derived log return table from the stored adjusted close prices.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=str,
+            choices=[choice for choice, _ in StockPriceData.INTERVAL_CHOICES],
+            help='Only rebuild this interval (default: all intervals)',
+        )
+        parser.add_argument('--start-index', type=int, help='Start index for stock selection', default=None)
+        parser.add_argument('--stop-index', type=int, help='Stop index for stock selection', default=None)
+        parser.add_argument('--include-all', action='store_true', help='Include all stocks, not just S&P 500')
+
+    def handle(self, *args, **options):
+        if options['include_all']:
+            stocks_to_iterate = BaseStockData.objects.all()
+        else:
+            stocks_to_iterate = BaseStockData.objects.filter(is_sp500=True)
+        stocks_to_iterate = stocks_to_iterate.order_by('symbol')[options['start_index']:options['stop_index']]
+
+        if options['interval']:
+            intervals = [options['interval']]
+        else:
+            intervals = [choice for choice, _ in StockPriceData.INTERVAL_CHOICES]
+
+        for interval in intervals:
+            returns.rebuild_returns(stocks_to_iterate, interval)
+            self.stdout.write(f"Rebuilt {interval} returns for {len(stocks_to_iterate)} stocks")
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from stocks.utils import sectors
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the sector and industry aggregate tables. Meant to run nightly after the syncs.'
+
+    def handle(self, *args, **options):
+        counts = sectors.rebuild_sector_aggregates()
+        self.stdout.write(
+            f"Rebuilt {counts['index']} index, {counts['valuation']} valuation and "
+            f"{counts['earnings']} earnings aggregate rows"
+        )
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from stocks.utils import snapshots
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the latest overview snapshot (LatestStockOverview) used by the screener.'
+
+    def handle(self, *args, **options):
+        count = snapshots.refresh_latest_overviews()
+        self.stdout.write(f"Refreshed the latest overview snapshot for {count} stocks")
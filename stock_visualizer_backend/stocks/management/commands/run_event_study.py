@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+from stocks.utils import event_study
+
+
+class Command(BaseCommand):
+    help = 'Computes abnormal returns around every quarterly earnings report (EarningsEventData).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--window',
+            action='append',
+            help='Trading day window around the report as start:end, e.g. -1:1 (repeatable). '
+                 'Defaults to -1:1, 0:1, 2:20 and 2:60.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            windows = [event_study.parse_window(window) for window in options['window'] or []]
+        except ValueError as e:
+            raise CommandError(str(e))
+        count = event_study.run_event_study(windows or event_study.DEFAULT_EVENT_WINDOWS)
+        self.stdout.write(f"Stored {count} earnings event windows")
@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand
-from stocks.utils import parse_alpha_vantage as pav
-from stocks.models import BaseStockData, StockPriceData, IncomeStatementData, BalanceSheetData, CashFlowData, EarningsData, QuarterlyStockOverview
+from django.db import close_old_connections
+from stocks.utils import aggregation, telemetry, parse_alpha_vantage as pav
+from stocks.models import SyncRunReport, BaseStockData, StockPriceData, IncomeStatementData, BalanceSheetData, CashFlowData, EarningsData, QuarterlyStockOverview
 from django.conf import settings
 import logging
 import functools
@@ -50,6 +51,21 @@ class Command(BaseCommand):
         )
         parser.add_argument('--outputsize', type=str, help='Specify the output size')
         parser.add_argument('--include-all', action='store_true', help='Include all stocks, not just S&P 500')
+        parser.add_argument(
+            '--from-api',
+            action='store_true',
+            help=(
+                'Fetch weekly/monthly bars from the API instead of deriving them from the '
+                'stored daily bars (derived bars only replace the periods the daily bars cover)'
+            )
+        )
+        parser.add_argument(
+            '--backoff-seconds',
+            type=float,
+            default=60,
+            help='Initial wait after a rate limited or failed request, doubled on every retry'
+        )
+        parser.add_argument('--max-retries', type=int, default=5, help='Attempts per symbol before giving up')
         # parser.add_argument(
         #     '--extra-args', 
         #     type=str, 
@@ -63,7 +79,12 @@ class Command(BaseCommand):
         stop_index = options['stop_index']
         check_exists = options['check_exists']
         include_all = options['include_all']
+        from_api = options['from_api']
         outputsize = options.get('outputsize', None)
+        retry_options = {
+            'backoff_seconds': options['backoff_seconds'],
+            'max_retries': options['max_retries'],
+        }
         # extra_args = json.loads(options.get('extra-args', '{}'))
         # print("Extra args:", extra_args)  # Debugging line
 
@@ -83,46 +104,91 @@ class Command(BaseCommand):
             logging.error(f"No syncing function found for {function}. Please check your mappings.")
             return
           
+        run = telemetry.SyncRun(function)
         for stock in stocks_to_iterate:
-            if check_exists and function not in ['OVERVIEW'] + list(self.ts_function_intervals.keys()):
-                exists = model_class.objects.filter(stock=stock).exists()
-            elif check_exists and function == 'OVERVIEW':
-                exists = QuarterlyStockOverview.objects.filter(stock=stock).exists()
-            elif check_exists and interval:
-                exists = (
-                    model_class.objects.
-                    filter(stock=stock, interval=interval)
-                    .exists()
+            with run.track(stock.symbol) as record:
+                self.sync_stock(
+                    stock, function, sync_func, model_class, interval,
+                    check_exists, from_api, outputsize, retry_options, record
                 )
-            else:
-                exists = False
-                      
-            if exists:
-                self.stdout.write(f"Data for {stock.symbol} already exists. Skipping API call.")
-                continue
 
+        previous = (
+            SyncRunReport.objects
+            .filter(function=function)
+            .values_list('report', flat=True)
+            .first()
+        )
+        report = run.save().report
+        for line in telemetry.format_report(report, previous):
+            self.stdout.write(line)
+
+    def sync_stock(
+        self, stock, function, sync_func, model_class, interval,
+        check_exists, from_api, outputsize, retry_options, record
+    ):
+        """
+        Fetches and syncs one stock, noting the outcome in its telemetry record.
+        """
+        # Syncs run for hours on one connection: drop it if it has outlived
+        # CONN_MAX_AGE or broke, and health-check it before the next query
+        close_old_connections()
+        if check_exists and function not in ['OVERVIEW'] + list(self.ts_function_intervals.keys()):
+            exists = model_class.objects.filter(stock=stock).exists()
+        elif check_exists and function == 'OVERVIEW':
+            exists = QuarterlyStockOverview.objects.filter(stock=stock).exists()
+        elif check_exists and interval:
+            exists = (
+                model_class.objects.
+                filter(stock=stock, interval=interval)
+                .exists()
+            )
+        else:
+            exists = False
+                  
+        if exists:
+            record.status = telemetry.SKIPPED
+            self.stdout.write(f"Data for {stock.symbol} already exists. Skipping API call.")
+            return
+
+        # Weekly and monthly bars are aggregated from the daily bars, saving two API calls
+        if interval in aggregation.AGGREGATED_INTERVALS and not from_api:
+            record.status = telemetry.DERIVED
             try:
-                if interval:
-                    data = pav.fetch_data(
-                        function=function, 
-                        stock_symbol=stock.symbol, 
-                        api_key=settings.RAPIDAPI_KEY, 
-                        interval=interval,
-                        outputsize=outputsize
-                    )
-                else:
-                    data = pav.fetch_data(
-                        function=function, 
-                        stock_symbol=stock.symbol, 
-                        api_key=settings.RAPIDAPI_KEY,
-                        outputsize=outputsize
-                    )
+                with telemetry.measure_sync():
+                    count = aggregation.update_aggregated_bars(stock, interval)
+                self.stdout.write(f"Derived {count} {interval} bars for {stock.symbol} from daily data")
             except Exception as e:
-                logging.error(f"Error fetching data for {stock.symbol}: {e}")
-                continue
-            
-            try:
+                record.status, record.error = telemetry.SYNC_ERROR, str(e)
+                logging.error(f"Error deriving {interval} bars for {stock.symbol}: {e}")
+            return
+
+        try:
+            if interval:
+                data = pav.fetch_data(
+                    function=function, 
+                    stock_symbol=stock.symbol, 
+                    api_key=settings.RAPIDAPI_KEY, 
+                    interval=interval,
+                    outputsize=outputsize,
+                    **retry_options
+                )
+            else:
+                data = pav.fetch_data(
+                    function=function, 
+                    stock_symbol=stock.symbol, 
+                    api_key=settings.RAPIDAPI_KEY,
+                    outputsize=outputsize,
+                    **retry_options
+                )
+        except Exception as e:
+            record.status, record.error = telemetry.FETCH_ERROR, str(e)
+            logging.error(f"Error fetching data for {stock.symbol}: {e}")
+            return
+        
+        try:
+            with telemetry.measure_sync():
                 sync_func(data)
-                self.stdout.write(f"Fetched and synced {function} for {stock.symbol}")
-            except Exception as e:
-                logging.error(f"Error syncing {function} for {stock.symbol}: {e}")
+            self.stdout.write(f"Fetched and synced {function} for {stock.symbol}")
+        except Exception as e:
+            record.status, record.error = telemetry.SYNC_ERROR, str(e)
+            logging.error(f"Error syncing {function} for {stock.symbol}: {e}")
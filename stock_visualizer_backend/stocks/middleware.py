@@ -0,0 +1,77 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from stocks.utils import metrics
+
+
+class MetricsMiddleware:
+    """
+    Records the latency, database queries and time, response size and cache lookups of
+    every request into metrics.registry, labelled by URL name.
+
+    Place it first in MIDDLEWARE so that the timings cover the rest of the stack. It
+    runs natively under both WSGI and ASGI, so async views don't get a thread of their
+    own for the length of the request. Streaming responses are recorded once their
+    content has been sent, including the queries run while it is generated.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = metrics.RequestStats(method=request.method)
+        start = time.perf_counter()
+        with metrics.collect(stats):
+            response = self.get_response(request)
+        return self._finish(request, response, stats, start)
+
+    async def __acall__(self, request):
+        stats = metrics.RequestStats(method=request.method)
+        start = time.perf_counter()
+        with metrics.collect(stats):
+            response = await self.get_response(request)
+        return self._finish(request, response, stats, start)
+
+    def _finish(self, request, response, stats, start):
+        stats.seconds = time.perf_counter() - start
+        stats.status = response.status_code
+        match = request.resolver_match
+        stats.view = (match.url_name or match.view_name) if match else 'unmatched'
+
+        if not response.streaming:
+            stats.response_bytes = len(response.content)
+            metrics.registry.record(stats)
+        elif response.is_async:
+            response.streaming_content = self._astream(response.streaming_content, stats, start)
+        else:
+            response.streaming_content = self._stream(response.streaming_content, stats, start)
+        return response
+
+    @staticmethod
+    def _stream(content, stats, start):
+        try:
+            with metrics.collect(stats):
+                for chunk in content:
+                    stats.response_bytes += len(chunk)
+                    yield chunk
+        finally:
+            stats.seconds = time.perf_counter() - start
+            metrics.registry.record(stats)
+
+    @staticmethod
+    async def _astream(content, stats, start):
+        try:
+            with metrics.collect(stats):
+                async for chunk in content:
+                    stats.response_bytes += len(chunk)
+                    yield chunk
+        finally:
+            stats.seconds = time.perf_counter() - start
+            metrics.registry.record(stats)
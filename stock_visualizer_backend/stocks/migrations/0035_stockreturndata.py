@@ -0,0 +1,27 @@
+# Generated by Django 5.0.3 on 2026-10-19 09:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stocks', '0034_remove_earningscalendardata_horizon_months'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockReturnData',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('interval', models.CharField(choices=[('daily', 'Daily'), ('weekly', 'Weekly'), ('monthly', 'Monthly')], max_length=7)),
+                ('log_return', models.FloatField()),
+                ('stock', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='return_data', to='stocks.basestockdata')),
+            ],
+            options={
+                'unique_together': {('stock', 'date', 'interval')},
+            },
+        ),
+    ]
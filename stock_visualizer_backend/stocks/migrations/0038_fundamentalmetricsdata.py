@@ -0,0 +1,43 @@
+# Generated by Django 5.0.3 on 2026-10-19 09:26
+
+import django.db.models.deletion
+import stocks.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stocks', '0037_lateststockoverview'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FundamentalMetricsData',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('gross_margin_ttm', models.FloatField(blank=True, null=True)),
+                ('operating_margin_ttm', models.FloatField(blank=True, null=True)),
+                ('net_margin_ttm', models.FloatField(blank=True, null=True)),
+                ('free_cash_flow_margin_ttm', models.FloatField(blank=True, null=True)),
+                ('return_on_equity_ttm', models.FloatField(blank=True, null=True)),
+                ('return_on_assets_ttm', models.FloatField(blank=True, null=True)),
+                ('debt_to_equity', models.FloatField(blank=True, null=True)),
+                ('liabilities_to_assets', models.FloatField(blank=True, null=True)),
+                ('current_ratio', models.FloatField(blank=True, null=True)),
+                ('revenue_ttm', stocks.models.StockIntegerField(blank=True, null=True)),
+                ('gross_profit_ttm', stocks.models.StockIntegerField(blank=True, null=True)),
+                ('operating_income_ttm', stocks.models.StockIntegerField(blank=True, null=True)),
+                ('ebitda_ttm', stocks.models.StockIntegerField(blank=True, null=True)),
+                ('net_income_ttm', stocks.models.StockIntegerField(blank=True, null=True)),
+                ('operating_cashflow_ttm', stocks.models.StockIntegerField(blank=True, null=True)),
+                ('capital_expenditures_ttm', stocks.models.StockIntegerField(blank=True, null=True)),
+                ('free_cash_flow_ttm', stocks.models.StockIntegerField(blank=True, null=True)),
+                ('stock', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='fundamental_metrics_data', to='stocks.basestockdata')),
+            ],
+            options={
+                'unique_together': {('stock', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.0.3 on 2026-10-19 09:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stocks', '0038_fundamentalmetricsdata'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SectorEarningsData',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('level', models.CharField(choices=[('sector', 'Sector'), ('industry', 'Industry')], max_length=8)),
+                ('name', models.CharField(max_length=255)),
+                ('constituents', models.PositiveIntegerField()),
+                ('fiscal_date_ending', models.DateField()),
+                ('mean_surprise_percentage', models.FloatField(blank=True, null=True)),
+                ('median_surprise_percentage', models.FloatField(blank=True, null=True)),
+                ('beat_rate', models.FloatField(blank=True, null=True)),
+            ],
+            options={
+                'unique_together': {('level', 'name', 'fiscal_date_ending')},
+            },
+        ),
+        migrations.CreateModel(
+            name='SectorIndexData',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('level', models.CharField(choices=[('sector', 'Sector'), ('industry', 'Industry')], max_length=8)),
+                ('name', models.CharField(max_length=255)),
+                ('constituents', models.PositiveIntegerField()),
+                ('date', models.DateField()),
+                ('equal_weight_level', models.FloatField()),
+                ('cap_weight_level', models.FloatField(blank=True, null=True)),
+            ],
+            options={
+                'unique_together': {('level', 'name', 'date')},
+            },
+        ),
+        migrations.CreateModel(
+            name='SectorValuationData',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('level', models.CharField(choices=[('sector', 'Sector'), ('industry', 'Industry')], max_length=8)),
+                ('name', models.CharField(max_length=255)),
+                ('constituents', models.PositiveIntegerField()),
+                ('quarter_end_date', models.DateField()),
+                ('pe_ratio', models.FloatField(blank=True, null=True)),
+                ('forward_pe', models.FloatField(blank=True, null=True)),
+                ('peg_ratio', models.FloatField(blank=True, null=True)),
+                ('price_to_book_ratio', models.FloatField(blank=True, null=True)),
+                ('price_to_sales_ratio_ttm', models.FloatField(blank=True, null=True)),
+                ('ev_to_revenue', models.FloatField(blank=True, null=True)),
+                ('ev_to_ebitda', models.FloatField(blank=True, null=True)),
+                ('dividend_yield', models.FloatField(blank=True, null=True)),
+            ],
+            options={
+                'unique_together': {('level', 'name', 'quarter_end_date')},
+            },
+        ),
+    ]
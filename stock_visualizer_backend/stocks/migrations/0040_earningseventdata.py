@@ -0,0 +1,33 @@
+# Generated by Django 5.0.3 on 2026-10-19 09:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stocks', '0039_sector_aggregates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EarningsEventData',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fiscal_date_ending', models.DateField()),
+                ('reported_date', models.DateField()),
+                ('event_date', models.DateField()),
+                ('surprise_percentage', models.FloatField(blank=True, null=True)),
+                ('window_start', models.SmallIntegerField()),
+                ('window_end', models.SmallIntegerField()),
+                ('stock_return', models.FloatField()),
+                ('market_return', models.FloatField()),
+                ('abnormal_return', models.FloatField()),
+                ('stock', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='earnings_event_data', to='stocks.basestockdata')),
+            ],
+            options={
+                'unique_together': {('stock', 'fiscal_date_ending', 'window_start', 'window_end')},
+            },
+        ),
+    ]
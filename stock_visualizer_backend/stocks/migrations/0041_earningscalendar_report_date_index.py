@@ -0,0 +1,17 @@
+# Generated by Django 5.0.3 on 2026-10-19 09:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stocks', '0040_earningseventdata'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='earningscalendardata',
+            index=models.Index(fields=['report_date', 'stock'], name='calendar_report_date_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.0.3 on 2026-10-19 09:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stocks', '0041_earningscalendar_report_date_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncRunReport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('function', models.CharField(max_length=50)),
+                ('started_at', models.DateTimeField()),
+                ('finished_at', models.DateTimeField()),
+                ('symbols', models.PositiveIntegerField(default=0)),
+                ('errors', models.PositiveIntegerField(default=0)),
+                ('wall_seconds', models.FloatField(default=0.0)),
+                ('report', models.JSONField(default=dict)),
+            ],
+            options={
+                'ordering': ['-started_at'],
+                'indexes': [models.Index(fields=['function', 'started_at'], name='sync_run_function_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.0.3 on 2026-10-19 10:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stocks', '0042_syncrunreport'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='earningscalendardata',
+            name='calendar_report_date_idx',
+        ),
+        migrations.AddIndex(
+            model_name='earningscalendardata',
+            index=models.Index(fields=['report_date', 'stock', 'id'], name='calendar_report_key_idx'),
+        ),
+    ]
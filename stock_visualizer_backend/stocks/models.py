@@ -39,13 +39,11 @@ class BaseStockData(models.Model):
         return f"{self.symbol} - {self.name}"
 
 
-class QuarterlyStockOverview(models.Model):
-    stock = models.ForeignKey(
-        BaseStockData,
-        on_delete=models.CASCADE,
-        related_name='stock_overview',
-        null=True,
-    )
+class StockOverviewFields(models.Model):
+    """
+    The company overview metrics shared by QuarterlyStockOverview and its latest-row
+    snapshot, LatestStockOverview.
+    """
     quarter_end_date = models.DateField()
     market_capitalization = models.BigIntegerField(null=True, blank=True)
     ebitda = models.BigIntegerField(null=True, blank=True)
@@ -85,6 +83,22 @@ class QuarterlyStockOverview(models.Model):
     shares_outstanding = models.BigIntegerField(null=True, blank=True)
     dividend_date = models.DateField(null=True, blank=True)
     ex_dividend_date = models.DateField(null=True, blank=True)
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def metric_field_names(cls):
+        return [field.name for field in StockOverviewFields._meta.get_fields()]
+
+
+class QuarterlyStockOverview(StockOverviewFields):
+    stock = models.ForeignKey(
+        BaseStockData,
+        on_delete=models.CASCADE,
+        related_name='stock_overview',
+        null=True,
+    )
     
     class Meta:
         unique_together = ('stock', 'quarter_end_date')
@@ -93,6 +107,22 @@ class QuarterlyStockOverview(models.Model):
         return f"{self.stock.symbol} ({self.quarter_end_date})"
 
 
+class LatestStockOverview(StockOverviewFields):
+    """
+    The most recent QuarterlyStockOverview row of each stock, keyed by the stock itself so
+    that screens over the whole universe are a single scan of this table.
+    """
+    stock = models.OneToOneField(
+        BaseStockData,
+        on_delete=models.CASCADE,
+        related_name='latest_overview',
+        primary_key=True,
+    )
+
+    def __str__(self):
+        return f"{self.stock_id} latest ({self.quarter_end_date})"
+
+
 class StockPriceData(models.Model):
     INTERVAL_CHOICES = [
         ('daily', 'Daily'),
@@ -124,6 +154,62 @@ class StockPriceData(models.Model):
         return f"{self.stock.symbol} - {self.date} ({self.interval})"
 
 
+class StockReturnData(models.Model):
+    """
+    Log returns derived from StockPriceData.adj_close, maintained at sync time so that
+    return analysis does not have to recompute them from prices on every request.
+    """
+    stock = models.ForeignKey(
+        BaseStockData,
+        on_delete=models.CASCADE,
+        related_name='return_data',
+        null=True,
+    )
+    date = models.DateField()
+    interval = models.CharField(max_length=7, choices=StockPriceData.INTERVAL_CHOICES)
+    log_return = models.FloatField()
+
+    class Meta:
+        unique_together = ('stock', 'date', 'interval')
+
+    def __str__(self):
+        return f"{self.stock.symbol} - {self.date} ({self.interval}): {self.log_return}"
+
+
+class SyncVersion(models.Model):
+    """
+    A counter that is bumped every time a sync changes a dataset (e.g. 'prices:AAPL'), so
+    cached results derived from that dataset can be keyed by its version.
+    """
+    key = models.CharField(max_length=100, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.key} (v{self.version})"
+
+
+class SyncRunReport(models.Model):
+    """
+    The telemetry report of one sync_av_data run (see utils/telemetry.py): where the time
+    went per stage, the rows written and the symbols that failed.
+    """
+    function = models.CharField(max_length=50)
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField()
+    symbols = models.PositiveIntegerField(default=0)
+    errors = models.PositiveIntegerField(default=0)
+    wall_seconds = models.FloatField(default=0.0)
+    report = models.JSONField(default=dict)
+
+    class Meta:
+        ordering = ['-started_at']
+        indexes = [models.Index(fields=['function', 'started_at'], name='sync_run_function_idx')]
+
+    def __str__(self):
+        return f"{self.function} run at {self.started_at:%Y-%m-%d %H:%M} ({self.symbols} symbols)"
+
+
 # class MonthlyStockPriceData(models.Model):
 #     stock = models.ForeignKey(
 #         BaseStockData,
@@ -304,6 +390,47 @@ class CashFlowData(models.Model, metaclass=FinancialDataMeta):
     def __str__(self):
         return f"{self.stock.symbol} - {self.report_type} - {self.date}"
 
+class FundamentalMetricsData(models.Model, metaclass=FinancialDataMeta):
+    """
+    Trailing-twelve-month sums and cross-statement ratios derived from the quarterly
+    income statement, balance sheet and cash flow rows, recomputed after each statement
+    sync.
+    """
+    stock = models.ForeignKey(
+        BaseStockData,
+        on_delete=models.CASCADE,
+        related_name='fundamental_metrics_data',
+        null=True,
+    )
+    date = models.DateField()
+
+    financial_fields = [
+        'revenue_ttm',
+        'gross_profit_ttm',
+        'operating_income_ttm',
+        'ebitda_ttm',
+        'net_income_ttm',
+        'operating_cashflow_ttm',
+        'capital_expenditures_ttm',
+        'free_cash_flow_ttm',
+    ]
+    gross_margin_ttm = models.FloatField(null=True, blank=True)
+    operating_margin_ttm = models.FloatField(null=True, blank=True)
+    net_margin_ttm = models.FloatField(null=True, blank=True)
+    free_cash_flow_margin_ttm = models.FloatField(null=True, blank=True)
+    return_on_equity_ttm = models.FloatField(null=True, blank=True)
+    return_on_assets_ttm = models.FloatField(null=True, blank=True)
+    debt_to_equity = models.FloatField(null=True, blank=True)
+    liabilities_to_assets = models.FloatField(null=True, blank=True)
+    current_ratio = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ('stock', 'date')
+
+    def __str__(self):
+        return f"{self.stock.symbol} - {self.date}"
+
+
 class EarningsData(models.Model, metaclass=FinancialDataMeta):
     REPORT_TYPE_CHOICES = [
         ('annual', 'Annual'),
@@ -333,6 +460,38 @@ class EarningsData(models.Model, metaclass=FinancialDataMeta):
         unique_together = ('stock', 'report_type', 'fiscal_date_ending', 'reported_date')
 
 
+class EarningsEventData(models.Model):
+    """
+    Cumulative abnormal log returns of a stock over a window of trading days around one
+    quarterly earnings report, computed by the earnings event study.
+    """
+    stock = models.ForeignKey(
+        BaseStockData,
+        on_delete=models.CASCADE,
+        related_name='earnings_event_data',
+        null=True,
+    )
+    fiscal_date_ending = models.DateField()
+    reported_date = models.DateField()
+    # First trading day on or after the reported date (day 0 of the window)
+    event_date = models.DateField()
+    surprise_percentage = models.FloatField(null=True, blank=True)
+    window_start = models.SmallIntegerField()
+    window_end = models.SmallIntegerField()
+    stock_return = models.FloatField()
+    market_return = models.FloatField()
+    abnormal_return = models.FloatField()
+
+    class Meta:
+        unique_together = ('stock', 'fiscal_date_ending', 'window_start', 'window_end')
+
+    def __str__(self):
+        return (
+            f"{self.stock.symbol} - {self.reported_date} "
+            f"[{self.window_start}, {self.window_end}]: {self.abnormal_return}"
+        )
+
+
 class EarningsCalendarData(models.Model):
     stock = models.ForeignKey(
         BaseStockData,
@@ -351,9 +510,84 @@ class EarningsCalendarData(models.Model):
     
     class Meta:
         unique_together = ('stock', 'fiscal_date_ending')
+        # Serves date range scans of the whole market calendar in (report_date, symbol, id)
+        # order, which is also the pagination key
+        indexes = [models.Index(fields=['report_date', 'stock', 'id'], name='calendar_report_key_idx')]
+
+
+class SectorAggregateFields(models.Model):
+    """
+    Identifies the sector or industry a precomputed aggregate row belongs to.
+    """
+    LEVEL_CHOICES = [
+        ('sector', 'Sector'),
+        ('industry', 'Industry'),
+    ]
+
+    level = models.CharField(max_length=8, choices=LEVEL_CHOICES)
+    name = models.CharField(max_length=255)
+    constituents = models.PositiveIntegerField()
+
+    class Meta:
+        abstract = True
+
+
+class SectorIndexData(SectorAggregateFields):
+    """
+    Daily equal-weighted and cap-weighted total return index levels (base 100) of each
+    sector and industry, rebuilt nightly by rebuild_sector_aggregates.
+    """
+    date = models.DateField()
+    equal_weight_level = models.FloatField()
+    cap_weight_level = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ('level', 'name', 'date')
+
+    def __str__(self):
+        return f"{self.name} ({self.level}) - {self.date}"
+
+
+class SectorValuationData(SectorAggregateFields):
+    """
+    Median valuation multiples of each sector and industry per quarter, from
+    QuarterlyStockOverview.
+    """
+    quarter_end_date = models.DateField()
+    pe_ratio = models.FloatField(null=True, blank=True)
+    forward_pe = models.FloatField(null=True, blank=True)
+    peg_ratio = models.FloatField(null=True, blank=True)
+    price_to_book_ratio = models.FloatField(null=True, blank=True)
+    price_to_sales_ratio_ttm = models.FloatField(null=True, blank=True)
+    ev_to_revenue = models.FloatField(null=True, blank=True)
+    ev_to_ebitda = models.FloatField(null=True, blank=True)
+    dividend_yield = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ('level', 'name', 'quarter_end_date')
+
+    def __str__(self):
+        return f"{self.name} ({self.level}) - {self.quarter_end_date}"
+
+
+class SectorEarningsData(SectorAggregateFields):
+    """
+    Earnings surprise statistics of each sector and industry per fiscal quarter, from
+    quarterly EarningsData.
+    """
+    fiscal_date_ending = models.DateField()
+    mean_surprise_percentage = models.FloatField(null=True, blank=True)
+    median_surprise_percentage = models.FloatField(null=True, blank=True)
+    beat_rate = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ('level', 'name', 'fiscal_date_ending')
+
+    def __str__(self):
+        return f"{self.name} ({self.level}) - {self.fiscal_date_ending}"
 
 
-class GDPData(models.Model): 
+class GDPData(models.Model):
     REPORT_TYPE_CHOICES = [
         ('annual', 'Annual'),
         ('quarterly', 'Quarterly'),
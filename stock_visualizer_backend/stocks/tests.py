@@ -1,3 +1,1143 @@
-from django.test import TestCase
+import datetime
+import json
+import tempfile
+import threading
+import time
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+import pandas as pd
+from django.core.cache import cache
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+
+from stocks.models import (
+    BalanceSheetData,
+    BaseStockData,
+    CashFlowData,
+    EarningsCalendarData,
+    EarningsData,
+    EarningsEventData,
+    IncomeStatementData,
+    LatestStockOverview,
+    QuarterlyStockOverview,
+    SectorIndexData,
+    StockPriceData,
+    StockReturnData,
+    TreasuryYieldData,
+)
+from stocks.utils import (
+    aggregation,
+    async_queries,
+    backtest,
+    earnings_calendar,
+    event_study,
+    fundamentals,
+    indicators,
+    metrics,
+    mock_av,
+    optimization,
+    price_matrix,
+    price_store,
+    returns,
+    risk,
+    screener,
+    search,
+    sectors,
+    snapshots,
+    synthetic,
+    telemetry,
+    valuation,
+    versions,
+    yield_curve,
+)
+from stocks.utils import parse_alpha_vantage as pav
+
+
+class BacktestSimulationTests(SimpleTestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.returns = rng.normal(0.0003, 0.02, size=(260, 20))
+        self.prices = 100 * np.cumprod(1 + self.returns, axis=0)
+        self.dates = pd.Index(pd.bdate_range('2020-01-01', periods=260).date)
+
+    def test_daily_equal_weight_matches_mean_return(self):
+        mask = backtest.rebalance_mask(self.dates, 'daily')
+        result = backtest.simulate(self.prices, np.ones(self.prices.shape), mask)
+        np.testing.assert_allclose(result['returns'][1:], self.returns[1:].mean(axis=1))
+
+    def test_buy_and_hold_matches_average_growth(self):
+        mask = np.zeros(len(self.dates), dtype=bool)
+        mask[0] = True
+        result = backtest.simulate(self.prices, np.ones(self.prices.shape), mask)
+        self.assertAlmostEqual(result['nav'][-1], np.mean(self.prices[-1] / self.prices[0]))
+
+    def test_symbols_without_prices_are_not_held(self):
+        prices = self.prices.copy()
+        prices[:100, 0] = np.nan
+        mask = backtest.rebalance_mask(self.dates, 'daily')
+        result = backtest.simulate(prices, np.ones(prices.shape), mask)
+        np.testing.assert_allclose(result['returns'][1:100], self.returns[1:100, 1:].mean(axis=1))
+
+
+class BacktestBenchmarkTests(SimpleTestCase):
+    # 20 years of daily bars for 500 names
+    DAYS = 20 * backtest.TRADING_DAYS_PER_YEAR
+    SYMBOLS = 500
+    MAX_SECONDS = 5
+
+    def test_full_universe_backtest_runs_in_seconds(self):
+        rng = np.random.default_rng(1)
+        prices = 100 * np.cumprod(1 + rng.normal(0.0003, 0.02, size=(self.DAYS, self.SYMBOLS)), axis=0)
+        weights = rng.uniform(1, 100, size=prices.shape)
+        dates = pd.Index(pd.bdate_range('2004-01-01', periods=self.DAYS).date)
+
+        start = time.perf_counter()
+        mask = backtest.rebalance_mask(dates, 'monthly')
+        result = backtest.simulate(prices, weights, mask, cost_bps=5)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(len(result['nav']), self.DAYS)
+        self.assertTrue(np.isfinite(result['nav']).all())
+        self.assertLess(elapsed, self.MAX_SECONDS)
+
+
+class BacktestViewTests(TestCase):
+    def test_negative_or_non_finite_tilts_are_rejected(self):
+        for tilt in ('Technology:-0.5', 'Technology:nan', 'Technology:inf', 'Technology:abc'):
+            with self.subTest(tilt=tilt):
+                response = self.client.get('/backtest/', {'symbols': 'AAPL', 'tilt': tilt})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('Invalid tilt', response.json()['error'])
+        with self.assertRaisesMessage(ValueError, 'Invalid tilt for Energy: -1.0'):
+            backtest.run_backtest(['AAPL'], sector_tilts={'Energy': -1.0})
+
+
+class IncrementalReturnsTests(TestCase):
+    def setUp(self):
+        self.symbol = synthetic.synthetic_symbols(1)[0]
+        self.payload = synthetic.payload('TIME_SERIES_DAILY_ADJUSTED', self.symbol)
+        self.bars = self.payload['Time Series (Daily)']
+        self.dates = sorted(self.bars)
+        pav.sync_base_and_quarterly_overview(synthetic.payload('OVERVIEW', self.symbol))
+        pav.sync_stock_price_data(self.payload, 'daily')
+
+    def stored_returns(self):
+        return list(
+            StockReturnData.objects.filter(stock_id=self.symbol, interval='daily')
+            .order_by('date').values_list('date', 'log_return')
+        )
+
+    def resync(self):
+        """
+        Re-syncs the payload and returns the date the daily returns were recomputed from,
+        checking that the incremental update leaves the same returns as a full recompute.
+        """
+        with mock.patch.object(returns, 'update_returns', wraps=returns.update_returns) as update:
+            pav.sync_stock_price_data(self.payload, 'daily')
+        incremental = self.stored_returns()
+        returns.update_returns(BaseStockData.objects.get(symbol=self.symbol), 'daily')
+        self.assertEqual(incremental, self.stored_returns())
+        # The weekly and monthly bars derived from the daily ones update their own returns
+        since = [call.kwargs['since'] for call in update.call_args_list if call.args[1] == 'daily']
+        return since[0] if since else None
+
+    def test_readjusted_history_is_recomputed_from_the_first_changed_bar(self):
+        # A dividend re-adjustment scales every bar before it
+        for date in self.dates[:100]:
+            bar = self.bars[date]
+            bar['5. adjusted close'] = f"{float(bar['5. adjusted close']) * 0.9:.4f}"
+        self.assertEqual(self.resync(), datetime.date.fromisoformat(self.dates[0]))
+
+    def test_appended_bar_only_recomputes_the_new_return(self):
+        latest = self.dates[-1]
+        StockPriceData.objects.filter(stock_id=self.symbol, date=latest).delete()
+        returns.update_returns(BaseStockData.objects.get(symbol=self.symbol), 'daily')
+        self.assertEqual(self.resync(), datetime.date.fromisoformat(latest))
+        self.assertEqual(len(self.stored_returns()), len(self.dates) - 1)
+
+    def test_unchanged_resync_recomputes_nothing(self):
+        before = self.stored_returns()
+        self.assertIsNone(self.resync())
+        self.assertEqual(self.stored_returns(), before)
+
+    def test_values_equal_at_stored_precision_are_unchanged(self):
+        date = datetime.date(2024, 1, 2)
+        existing = {date: Decimal('101.12')}
+        self.assertIsNone(returns.first_changed_date(existing, {date: Decimal('101.1234'), datetime.date(2024, 1, 3): None}))
+        self.assertEqual(returns.first_changed_date(existing, {date: Decimal('101.1284')}), date)
+
+
+class IndicatorTests(SimpleTestCase):
+    def setUp(self):
+        rng = np.random.default_rng(4)
+        close = 100 * np.cumprod(1 + rng.normal(0, 0.02, size=300))
+        # A missing close and a non-positive one, which must only blank their own windows
+        close[100], close[200] = np.nan, 0.0
+        self.close = pd.Series(close)
+        self.high = self.close * (1 + rng.uniform(0, 0.02, size=300))
+        self.low = self.close * (1 - rng.uniform(0, 0.02, size=300))
+
+    def assert_matches(self, actual, expected):
+        np.testing.assert_allclose(actual, expected.to_numpy(), rtol=1e-9, atol=1e-12)
+        self.assertTrue(np.isfinite(actual[-50:]).all())
+
+    def test_sma_and_std_match_pandas_rolling(self):
+        self.assert_matches(indicators.sma(self.close, 20), self.close.rolling(20).mean())
+        self.assert_matches(indicators.rolling_std(self.close, 20), self.close.rolling(20).std())
+
+    def test_volatility_matches_pandas_rolling(self):
+        log_returns = np.log(self.close.where(self.close > 0)).diff()
+        expected = log_returns.rolling(20).std() * np.sqrt(indicators.TRADING_DAYS_PER_YEAR)
+        self.assert_matches(indicators.volatility(self.close, 20), expected)
+
+    def test_ema_rsi_and_atr_match_pandas_ewm(self):
+        self.assert_matches(indicators.ema(self.close, 20), self.close.ewm(span=20, adjust=False).mean())
+
+        change = self.close.diff().iloc[1:]
+        gain = change.clip(lower=0).ewm(alpha=1 / 14, adjust=False).mean()
+        loss = (-change).clip(lower=0).ewm(alpha=1 / 14, adjust=False).mean()
+        expected = pd.concat([pd.Series([np.nan]), 100 - 100 / (1 + gain / loss)], ignore_index=True)
+        expected.iloc[:14] = np.nan
+        self.assert_matches(indicators.rsi(self.close, 14), expected)
+
+        previous = self.close.shift()
+        true_range = pd.concat(
+            [self.high - self.low, (self.high - previous).abs(), (self.low - previous).abs()], axis=1
+        ).max(axis=1)
+        expected = true_range.ewm(alpha=1 / 14, adjust=False).mean()
+        expected.iloc[:13] = np.nan
+        self.assert_matches(
+            indicators.atr(self.high.to_numpy(), self.low.to_numpy(), self.close.to_numpy(), 14), expected
+        )
+
+
+class FundamentalMetricsTests(SimpleTestCase):
+    QUARTERS = [datetime.date(2023, 3, 31), datetime.date(2023, 6, 30), datetime.date(2023, 9, 30),
+                datetime.date(2023, 12, 31), datetime.date(2024, 3, 31)]
+
+    def statements(self, income_dates=QUARTERS, cash_flow_dates=QUARTERS):
+        def frame(model_class, dates, value):
+            fields = fundamentals.STATEMENT_FIELDS[model_class]
+            return pd.DataFrame(value, index=pd.Index(dates), columns=fields, dtype=float)
+
+        return {
+            IncomeStatementData: frame(IncomeStatementData, income_dates, 100.0),
+            CashFlowData: frame(CashFlowData, cash_flow_dates, 30.0),
+            BalanceSheetData: frame(BalanceSheetData, self.QUARTERS, 1000.0),
+        }
+
+    def test_ttm_sums_four_quarters_and_ratios_join_statements(self):
+        metrics = fundamentals.compute_fundamental_metrics(self.statements())
+        self.assertEqual(metrics['revenue_ttm'].isna().tolist(), [True, True, True, False, False])
+        self.assertEqual(metrics['revenue_ttm'].iloc[-1], 400)
+        self.assertEqual(metrics['free_cash_flow_ttm'].iloc[-1], 0)
+        self.assertEqual(metrics['net_margin_ttm'].iloc[-1], 1)
+        self.assertEqual(metrics['return_on_assets_ttm'].iloc[-1], 0.4)
+
+    def test_date_in_one_statement_does_not_shift_the_others(self):
+        # A cash flow statement filed under an off-quarter date
+        cash_flow_dates = self.QUARTERS[:3] + [datetime.date(2023, 12, 30), self.QUARTERS[4]]
+        metrics = fundamentals.compute_fundamental_metrics(self.statements(cash_flow_dates=cash_flow_dates))
+        self.assertEqual(len(metrics), 6)
+        self.assertEqual(metrics.loc[self.QUARTERS[4], 'revenue_ttm'], 400)
+        self.assertEqual(metrics.loc[self.QUARTERS[4], 'operating_cashflow_ttm'], 120)
+        self.assertEqual(metrics.loc[datetime.date(2023, 12, 30), 'operating_cashflow_ttm'], 120)
+
+    def test_missing_quarter_has_no_ttm(self):
+        income_dates = [date for date in self.QUARTERS if date.month != 6]
+        metrics = fundamentals.compute_fundamental_metrics(self.statements(income_dates=income_dates))
+        self.assertTrue(metrics['revenue_ttm'].isna().all())
+        self.assertEqual(metrics['operating_cashflow_ttm'].iloc[-1], 120)
+
+
+class ValuationTests(TestCase):
+    def test_ttm_eps_skips_windows_with_a_missing_quarter(self):
+        BaseStockData.objects.create(symbol='AAPL', name='Apple Inc', headquarters='')
+        fiscal_dates = ['2023-03-31', '2023-06-30', '2023-12-31', '2024-03-31', '2024-06-30', '2024-09-30']
+        for fiscal_date in map(datetime.date.fromisoformat, fiscal_dates):
+            EarningsData.objects.create(
+                stock_id='AAPL', report_type='quarterly', fiscal_date_ending=fiscal_date,
+                reported_date=fiscal_date + datetime.timedelta(days=30), reported_eps=1,
+            )
+        eps = valuation._ttm_eps('AAPL')['eps_ttm']
+        self.assertEqual(eps.index[-1], datetime.date(2024, 10, 30))
+        self.assertEqual(eps.isna().tolist(), [True] * 5 + [False])
+        self.assertEqual(eps.iloc[-1], 4)
+
+    def test_quarter_reported_twice_is_available_from_its_first_report(self):
+        BaseStockData.objects.create(symbol='AAPL', name='Apple Inc', headquarters='')
+        for reported_date in (datetime.date(2024, 5, 2), datetime.date(2024, 8, 1)):
+            EarningsData.objects.create(
+                stock_id='AAPL', report_type='quarterly', fiscal_date_ending=datetime.date(2024, 3, 31),
+                reported_date=reported_date, reported_eps=1,
+            )
+        available = valuation._availability_dates('AAPL')
+        self.assertEqual(available.to_dict(), {datetime.date(2024, 3, 31): datetime.date(2024, 5, 2)})
+
+
+class AggregationTests(TestCase):
+    def bar(self, date, interval, close):
+        return StockPriceData(
+            stock=self.stock, date=date, interval=interval, open=close, high=close, low=close,
+            close=close, adj_close=close, volume=100, dividend=0, split_coefficient=1,
+        )
+
+    def setUp(self):
+        self.stock = BaseStockData.objects.create(symbol='AAPL', name='Apple Inc', headquarters='')
+        # Monthly bars fetched from the API, and a shorter daily history starting mid-February
+        StockPriceData.objects.bulk_create(
+            [self.bar(datetime.date(2024, month, 28), 'monthly', 50) for month in (1, 2, 3)]
+            + [self.bar(date, 'daily', 100) for date in pd.bdate_range('2024-02-14', '2024-04-30').date]
+        )
+
+    def test_rebuild_keeps_bars_the_daily_history_does_not_cover(self):
+        self.assertEqual(aggregation.update_aggregated_bars(self.stock, 'monthly'), 2)
+        bars = StockPriceData.objects.filter(stock=self.stock, interval='monthly').order_by('date')
+        self.assertEqual(
+            [(bar.date, bar.close) for bar in bars],
+            [
+                (datetime.date(2024, 1, 28), 50), (datetime.date(2024, 2, 28), 50),
+                (datetime.date(2024, 3, 29), 100), (datetime.date(2024, 4, 30), 100),
+            ],
+        )
+
+    def test_nothing_is_deleted_without_daily_bars(self):
+        StockPriceData.objects.filter(interval='daily').delete()
+        self.assertEqual(aggregation.update_aggregated_bars(self.stock, 'monthly'), 0)
+        self.assertEqual(StockPriceData.objects.filter(interval='monthly').count(), 3)
+
+
+class PriceMatrixTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # MSFT has no bar on the second day
+        for symbol, closes in [('AAPL', ['10', '11', '12']), ('MSFT', ['20', None, '22'])]:
+            stock = BaseStockData.objects.create(symbol=symbol, name=symbol, headquarters='')
+            for day, close in enumerate(closes, start=2):
+                if close is not None:
+                    StockPriceData.objects.create(
+                        stock=stock, date=datetime.date(2024, 1, day), interval='daily', open=close, high=close,
+                        low=close, close=close, adj_close=close, volume=100, dividend=0,
+                    )
+
+    def test_missing_bars_are_null(self):
+        response = self.client.get('/prices/', {'symbols': 'msft, AAPL,msft', 'field': 'close'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            'field': 'close',
+            'columns': ['date', 'MSFT', 'AAPL'],
+            'data': [['2024-01-02', 20.0, 10.0], ['2024-01-03', None, 11.0], ['2024-01-04', 22.0, 12.0]],
+        })
+
+    def test_date_range_and_unknown_symbols(self):
+        response = self.client.get('/prices/', {'symbols': 'AAPL,NONE', 'start': '2024-01-03', 'end': '2024-01-03'})
+        self.assertEqual(response.json(), {
+            'field': 'adj_close', 'columns': ['date', 'AAPL', 'NONE'], 'data': [['2024-01-03', 11.0, None]],
+        })
+        self.assertEqual(
+            self.client.get('/prices/', {'symbols': 'NONE'}).json(),
+            {'field': 'adj_close', 'columns': ['date', 'NONE'], 'data': []},
+        )
+
+    def test_invalid_requests_are_rejected(self):
+        symbols = ','.join(f'S{number}' for number in range(price_matrix.MAX_PRICE_MATRIX_SYMBOLS))
+        self.assertEqual(self.client.get('/prices/', {'symbols': symbols}).status_code, 200)
+        for params, error in [
+            ({}, 'At least one symbol is required.'),
+            ({'symbols': ' , '}, 'At least one symbol is required.'),
+            ({'symbols': symbols + ',AAPL'}, 'At most 50 symbols are allowed.'),
+            ({'symbols': 'AAPL', 'start': '2024-13-01'}, 'Invalid start date: 2024-13-01. Expected YYYY-MM-DD.'),
+            ({'symbols': 'AAPL', 'end': 'yesterday'}, 'Invalid end date: yesterday. Expected YYYY-MM-DD.'),
+        ]:
+            with self.subTest(params=params):
+                response = self.client.get('/prices/', params)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {'error': error})
+        response = self.client.get('/prices/', {'symbols': 'AAPL', 'field': 'split_coefficient'})
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(response.json()['error'].startswith('Invalid field: split_coefficient.'))
+
+
+class PriceStoreTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(PRICE_STORE_DIR=directory.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.symbol = synthetic.synthetic_symbols(1)[0]
+        pav.sync_base_and_quarterly_overview(synthetic.payload('OVERVIEW', self.symbol))
+        pav.sync_stock_price_data(synthetic.payload('TIME_SERIES_DAILY_ADJUSTED', self.symbol), 'daily')
+        self.dates = list(
+            StockPriceData.objects.filter(stock=self.symbol, interval='daily')
+            .order_by('date').values_list('date', flat=True)
+        )
+        self.path = price_store._symbol_dir(self.symbol, 'daily')
+
+    def assert_matches_database(self):
+        columns = price_store.load_columns(self.symbol)
+        self.assertEqual(len({len(values) for values in columns.values()}), 1)
+        np.testing.assert_array_equal(columns['date'], np.array(self.dates, dtype='datetime64[D]'))
+
+    def test_append_after_an_interrupted_append(self):
+        StockPriceData.objects.filter(stock=self.symbol, date__gte=self.dates[-10]).delete()
+        price_store.update_symbol(self.symbol, 'daily')
+        # An append that wrote part of one column before failing
+        with open(price_store._column_path(self.path, 'close', 0), 'ab') as f:
+            f.write(np.zeros(3).tobytes())
+        pav.sync_stock_price_data(synthetic.payload('TIME_SERIES_DAILY_ADJUSTED', self.symbol), 'daily')
+        price_store.update_symbol(self.symbol, 'daily', since=self.dates[-10])
+        self.assert_matches_database()
+        np.testing.assert_array_equal(
+            price_store.load_columns(self.symbol)['close'],
+            [float(close) for close in StockPriceData.objects.filter(stock=self.symbol, interval='daily')
+             .order_by('date').values_list('close', flat=True)],
+        )
+
+    def test_previous_generation_is_kept_until_the_next_switch(self):
+        for _ in range(3):
+            price_store.update_symbol(self.symbol, 'daily')
+        self.assertEqual(
+            {column_path.suffixes[0] for column_path in self.path.glob('*.bin')}, {'.1', '.2'}
+        )
+        self.assert_matches_database()
+
+
+class SectorAggregateTests(TestCase):
+    def setUp(self):
+        self.dates = pd.bdate_range('2024-01-02', periods=4).date
+        # AAPL and MSFT are Technology, MSFT joins on the second day; XOM has no
+        # return from the third day on, which leaves Energy without constituents
+        self.closes = pd.DataFrame(
+            {
+                'AAPL': [100, 110, 121, 133.1],
+                'MSFT': [np.nan, 50, 60, 54],
+                'XOM': [10, 11, np.nan, 12.1],
+            },
+            index=pd.Index(self.dates),
+        )
+        self.shares = {'AAPL': 1, 'MSFT': 2}
+        self.membership = pd.DataFrame(
+            {'Energy': [0.0, 0.0, 1.0], 'Technology': [1.0, 1.0, 0.0]}, index=['AAPL', 'MSFT', 'XOM']
+        )
+
+    def test_equal_and_cap_weighted_levels(self):
+        caps = self.closes * pd.Series(self.shares).reindex(self.closes.columns).to_numpy()
+        result = sectors.compute_index_levels(self.closes, caps, self.membership)
+
+        np.testing.assert_allclose(result['equal_weight_level']['Technology'], [100, 110, 126.5, 126.5])
+        # Weighted by the previous day's caps: AAPL 110 and MSFT 100, then 121 and 120
+        cap_returns = [0.1, (110 * 0.1 + 100 * 0.2) / 210, (121 * 0.1 - 120 * 0.1) / 241]
+        np.testing.assert_allclose(
+            result['cap_weight_level']['Technology'], 100 * np.cumprod([1, *np.add(1, cap_returns)])
+        )
+        self.assertEqual(result['constituents']['Technology'].tolist(), [1, 1, 2, 2])
+
+        np.testing.assert_allclose(result['equal_weight_level']['Energy'], [100, 110, 110, 110])
+        self.assertEqual(result['constituents']['Energy'].tolist(), [1, 1, 0, 0])
+        self.assertTrue(result['cap_weight_level']['Energy'].isna().all())
+
+    def test_rebuild_stores_days_with_constituents(self):
+        # XOM has no industry, so only Technology has an industry index
+        for symbol, sector, industry in [
+            ('AAPL', 'Technology', 'Software'), ('MSFT', 'Technology', 'Software'), ('XOM', 'Energy', ''),
+        ]:
+            stock = BaseStockData.objects.create(
+                symbol=symbol, name=symbol, headquarters='', sector=sector, industry=industry
+            )
+            StockPriceData.objects.bulk_create([
+                StockPriceData(
+                    stock=stock, date=date, interval='daily', open=close, high=close, low=close, close=close,
+                    adj_close=close, volume=100, dividend=0, split_coefficient=1,
+                )
+                for date, close in self.closes[symbol].dropna().items()
+            ])
+            if symbol in self.shares:
+                LatestStockOverview.objects.create(
+                    stock=stock, quarter_end_date=datetime.date(2023, 12, 31), shares_outstanding=self.shares[symbol]
+                )
+
+        sectors.rebuild_sector_aggregates()
+        rows = SectorIndexData.objects.order_by('level', 'name', 'date')
+        self.assertEqual(
+            [(row.level, row.name, row.constituents) for row in rows],
+            [('industry', 'Software', count) for count in (1, 1, 2, 2)]
+            + [('sector', 'Energy', 1), ('sector', 'Energy', 1)]
+            + [('sector', 'Technology', count) for count in (1, 1, 2, 2)],
+        )
+        technology = [row for row in rows if row.name == 'Technology']
+        self.assertAlmostEqual(technology[-1].equal_weight_level, 126.5)
+        self.assertIsNone(rows.get(name='Energy', date=self.dates[0]).cap_weight_level)
+
+
+class EventStudyTests(TestCase):
+    def test_quarter_reported_twice_is_one_event(self):
+        symbol = synthetic.synthetic_symbols(1)[0]
+        pav.sync_base_and_quarterly_overview(synthetic.payload('OVERVIEW', symbol))
+        pav.sync_stock_price_data(synthetic.payload('TIME_SERIES_DAILY_ADJUSTED', symbol), 'daily')
+        for reported_date in (datetime.date(2024, 8, 1), datetime.date(2024, 9, 3)):
+            EarningsData.objects.create(
+                stock_id=symbol, report_type='quarterly', fiscal_date_ending=datetime.date(2024, 6, 30),
+                reported_date=reported_date, surprise_percentage=5,
+            )
+
+        self.assertEqual(event_study.run_event_study([(-1, 1)]), 1)
+        event = EarningsEventData.objects.get()
+        self.assertEqual(event.reported_date, datetime.date(2024, 8, 1))
+
+
+class YieldCurveTests(SimpleTestCase):
+    def setUp(self):
+        self.matrix = pd.DataFrame([[1.0, 3.0, 4.0]], index=[datetime.date(2024, 1, 2)], columns=[1, 2, 4])
+
+    def test_parse_maturity_and_pair(self):
+        self.assertEqual(
+            [yield_curve.parse_maturity(label) for label in ('3m', '10Y', '1.5y')], [3.0, 120.0, 18.0]
+        )
+        self.assertEqual(yield_curve.parse_pair('10y-2y'), (120.0, 24.0))
+        for label in ('ten', '10', '10d', '-2y'):
+            with self.subTest(label=label), self.assertRaisesMessage(ValueError, 'Invalid maturity'):
+                yield_curve.parse_maturity(label)
+
+    def test_pchip_matches_known_values(self):
+        # Fritsch-Carlson slopes of (1, 1), (2, 3), (4, 4) are 2.5, 6/7 and 0, as in
+        # scipy.interpolate.PchipInterpolator
+        curve = yield_curve.interpolate(self.matrix, [1, 1.5, 2, 3, 4, 0.5, 5], 'pchip').iloc[0]
+        np.testing.assert_allclose(curve.iloc[:5], [1.0, 2.3125 - 0.75 / 7, 3.0, 26 / 7, 4.0], rtol=1e-12)
+        self.assertTrue(curve.iloc[5:].isna().all())
+
+    def test_pchip_is_monotone_between_nodes(self):
+        knots = [1, 3, 6, 12, 24, 60, 120, 360]
+        matrix = pd.DataFrame(
+            [[0.050, 0.051, 0.052, 0.052, 0.045, 0.040, 0.041, 0.046]], index=[datetime.date(2024, 1, 2)], columns=knots
+        )
+        grid = np.linspace(1, 360, 2000)
+        curve = yield_curve.interpolate(matrix, grid, 'pchip').iloc[0].to_numpy()
+        values = matrix.iloc[0].to_numpy()
+        for position in range(len(knots) - 1):
+            inside = (grid >= knots[position]) & (grid <= knots[position + 1])
+            segment = curve[inside]
+            low, high = sorted(values[position:position + 2])
+            self.assertTrue((segment >= low - 1e-15).all() and (segment <= high + 1e-15).all())
+            steps = np.diff(segment) * np.sign(values[position + 1] - values[position])
+            self.assertTrue((steps >= -1e-15).all())
+
+    def test_spreads_and_invalid_method(self):
+        result = yield_curve.spreads(self.matrix, ['4m-1m', '3m-2m'])
+        self.assertEqual(result.iloc[0].tolist(), [3.0, 0.5])
+        with self.assertRaisesMessage(ValueError, 'Invalid method: cubic'):
+            yield_curve.interpolate(self.matrix, [2], 'cubic')
+
+
+class YieldCurveViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        TreasuryYieldData.objects.bulk_create([
+            TreasuryYieldData(date=datetime.date(2024, 1, 2), maturity_months=months, value=value)
+            for months, value in [(3, '0.054'), (24, '0.043'), (120, '0.039')]
+        ])
+
+    def test_curve_and_spread(self):
+        response = self.client.get('/yield_curve/', {'maturities': '3m,1y,10y', 'method': 'pchip'})
+        self.assertEqual(response.status_code, 200)
+        curve = response.json()['curve']
+        self.assertEqual([point['months'] for point in curve], [3.0, 12.0, 120.0])
+        self.assertAlmostEqual(curve[2]['yield'], 0.039)
+        spread = self.client.get('/yield_spread/').json()
+        self.assertAlmostEqual(spread[0]['10y-2y'], -0.004)
+
+    def test_invalid_maturity_or_method_is_rejected(self):
+        for path, params in [
+            ('/yield_curve/', {'maturities': '3m,ten'}),
+            ('/yield_curve/', {'method': 'cubic'}),
+            ('/yield_spread/', {'pair': '10y'}),
+            ('/yield_spread/', {'pair': '10y-2x'}),
+            ('/yield_spread/', {'method': 'cubic'}),
+        ]:
+            with self.subTest(path=path, params=params):
+                response = self.client.get(path, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('Invalid', response.json()['error'])
+
+
+class RiskTests(TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(2)
+        self.dates = pd.bdate_range('2023-01-02', periods=120).date
+        self.returns = pd.DataFrame(
+            rng.normal(0, 0.01, size=(120, 4)) @ rng.uniform(0.5, 1.5, size=(4, 4)),
+            index=pd.Index(self.dates), columns=['AAPL', 'GOOG', 'MSFT', 'NVDA'],
+        )
+
+    def test_ledoit_wolf_matches_the_definition(self):
+        values = self.returns.to_numpy()[:30]
+        observations, count = values.shape
+        centred = values - values.mean(axis=0)
+        sample = centred.T @ centred / observations
+        target = np.trace(sample) / count * np.eye(count)
+        distance = ((sample - target) ** 2).sum() / count
+        variance = sum(((np.outer(row, row) - sample) ** 2).sum() for row in centred) / observations ** 2 / count
+        shrinkage = min(variance, distance) / distance
+
+        result = risk.ledoit_wolf(values)
+        self.assertAlmostEqual(result['shrinkage'], shrinkage)
+        np.testing.assert_allclose(result['covariance'], shrinkage * target + (1 - shrinkage) * sample)
+
+    def test_ledoit_wolf_is_positive_definite_with_more_symbols_than_returns(self):
+        values = np.random.default_rng(3).normal(0, 0.01, size=(20, 50))
+        result = risk.ledoit_wolf(values)
+        self.assertTrue(0 < result['shrinkage'] <= 1)
+        self.assertGreater(np.linalg.eigvalsh(result['covariance']).min(), 0)
+
+    def test_rolling_matrices_match_pandas(self):
+        result = risk.rolling_risk(self.returns, window=60, step=10, start=self.dates[80])
+        self.assertEqual(result['dates'], [self.dates[index] for index in (89, 99, 109, 119)])
+        expected = self.returns.rolling(60).cov()
+        for date, covariance in zip(result['dates'], result['covariance']):
+            np.testing.assert_allclose(covariance, expected.loc[date].to_numpy())
+        np.testing.assert_allclose(
+            result['correlation'][-1], self.returns.iloc[-60:].corr().to_numpy(), atol=1e-12
+        )
+
+    def test_rolling_windows_leave_out_symbols_with_gaps(self):
+        returns = self.returns.copy()
+        returns.iloc[:50, 0] = np.nan
+        result = risk.rolling_risk(returns, window=40, step=40)
+        first, last = result['correlation'][0], result['correlation'][-1]
+        self.assertTrue(np.isnan(first[0]).all() and np.isnan(first[:, 0]).all())
+        self.assertEqual(first[1, 1], 1.0)
+        self.assertFalse(np.isnan(last).any())
+
+    def test_window_drops_symbols_missing_too_many_returns_or_without_variance(self):
+        returns = self.returns.assign(HALT=0.0)
+        for symbol in returns.columns:
+            BaseStockData.objects.create(symbol=symbol, name=symbol, headquarters='')
+        returns.iloc[-10:, 0] = np.nan
+        returns.iloc[-2:, 1] = np.nan
+        StockReturnData.objects.bulk_create([
+            StockReturnData(stock_id=symbol, date=date, interval='daily', log_return=value)
+            for symbol in returns.columns for date, value in returns[symbol].dropna().items()
+        ])
+
+        window = risk.load_window(returns.columns, window=60)
+        self.assertEqual(list(window.columns), ['GOOG', 'MSFT', 'NVDA'])
+        self.assertEqual((window.index[0], window.index[-1]), (self.dates[60], self.dates[-1]))
+        self.assertEqual(window['GOOG'].iloc[-2:].tolist(), [0.0, 0.0])
+        self.assertEqual(risk.compute_risk_matrix(returns.columns, window=60)['excluded'], ['AAPL', 'HALT'])
+
+    def test_rolling_series_are_bounded_by_their_total_size(self):
+        returns = pd.DataFrame(0.01, index=pd.Index(self.dates), columns=[f'S{number:03d}' for number in range(200)])
+        with self.assertRaisesMessage(ValueError, 'Too many values: 81 matrices of 200 symbols'):
+            risk.rolling_risk(returns, window=40, step=1)
+        self.assertEqual(len(risk.rolling_risk(returns, window=40, step=20)['dates']), 5)
+
+    def test_oversized_requests_are_rejected(self):
+        for params in ({'window': 1_000_000}, {'window': 1_000_000, 'step': 5}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get('/correlation/', params).status_code, 400)
+        symbols = [f'S{number:04d}' for number in range(2000)]
+        with self.assertRaisesMessage(ValueError, 'Too many values: 1 matrices of 2000 symbols'):
+            risk.compute_rolling_risk(symbols, window=60, step=1)
+
+
+class OptimizationTests(SimpleTestCase):
+    def setUp(self):
+        rng = np.random.default_rng(5)
+        loadings = rng.normal(0, 0.01, size=(8, 3))
+        self.covariance = loadings @ loadings.T + np.diag(rng.uniform(1e-5, 4e-4, size=8))
+        self.excess = rng.normal(0.0002, 0.0004, size=8)
+
+    def assert_kkt(self, weights, budget):
+        # Minimizing w' C w subject to budget . w = 1, w >= 0: the marginal variance of each
+        # held symbol is the same multiple of its budget, and no smaller for the others
+        marginal = self.covariance @ weights
+        held = weights > 1e-12
+        multiplier = marginal[held][0] / budget[held][0]
+        np.testing.assert_allclose(marginal[held], multiplier * budget[held], rtol=1e-6)
+        self.assertTrue((marginal[~held] >= multiplier * budget[~held] - 1e-12).all())
+
+    def test_min_variance_satisfies_kkt(self):
+        weights = optimization.min_variance(self.covariance)
+        self.assertAlmostEqual(weights.sum(), 1)
+        self.assertTrue((weights >= 0).all())
+        self.assert_kkt(weights, np.ones(8))
+
+    def test_long_short_min_variance_has_equal_marginal_variance(self):
+        weights = optimization.min_variance(self.covariance, long_only=False)
+        marginal = self.covariance @ weights
+        np.testing.assert_allclose(marginal, marginal.mean(), rtol=1e-9)
+
+    def test_max_sharpe_satisfies_kkt(self):
+        weights = optimization.max_sharpe(self.covariance, self.excess)
+        self.assertAlmostEqual(weights.sum(), 1)
+        self.assert_kkt(weights / (self.excess @ weights), self.excess)
+
+    def test_risk_parity_contributions_are_equal(self):
+        weights = optimization.risk_parity(self.covariance)
+        contributions = weights * (self.covariance @ weights)
+        self.assertAlmostEqual(weights.sum(), 1)
+        np.testing.assert_allclose(contributions, contributions.mean(), rtol=1e-8)
+
+    def test_risk_parity_rejects_symbols_without_variance(self):
+        covariance = self.covariance.copy()
+        covariance[3, :] = covariance[:, 3] = 0
+        with self.assertRaisesMessage(ValueError, 'but 1 have none'):
+            optimization.risk_parity(covariance)
+
+
+class SymbolIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.index = search.SymbolIndex([
+            ('AAPL', 'Apple Inc', True),
+            ('APLE', 'Apple Hospitality REIT Inc', False),
+            ('MSFT', 'Microsoft Corporation', True),
+            ('PAPL', 'Pineapple Energy Inc', False),
+            ('A', 'Agilent Technologies Inc', True),
+        ])
+
+    def test_matches_are_ranked_by_kind_then_membership(self):
+        matches = self.index.search('appl')
+        self.assertEqual([match['symbol'] for match in matches], ['AAPL', 'APLE', 'PAPL'])
+        self.assertEqual([match['match'] for match in matches], ['name_prefix', 'name_prefix', 'substring'])
+
+    def test_exact_symbol_comes_first(self):
+        self.assertEqual(self.index.search('a', limit=3)[0], {
+            'symbol': 'A', 'name': 'Agilent Technologies Inc', 'is_sp500': True, 'match': 'symbol',
+        })
+
+    def test_word_prefix_and_limit(self):
+        self.assertEqual([match['symbol'] for match in self.index.search('corp')], ['MSFT'])
+        self.assertEqual(len(self.index.search('inc', limit=2)), 2)
+
+    def test_stock_matching_several_words_does_not_crowd_out_others(self):
+        index = search.SymbolIndex([
+            ('AAA', 'Apple Applied Inc', False),
+            ('ZAPL', 'Zeta Appliances', False),
+            ('ZAPS', 'Zeta Apps', False),
+        ])
+        matches = index.search('app', limit=3)
+        self.assertEqual(
+            [(match['symbol'], match['match']) for match in matches],
+            [('AAA', 'name_prefix'), ('ZAPL', 'word_prefix'), ('ZAPS', 'word_prefix')],
+        )
+
+
+class ScreenerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for symbol, sector, is_sp500, pe_ratio in [
+            ('AAPL', 'Technology', True, '30'),
+            ('MSFT', 'Technology', True, '35'),
+            ('XOM', 'Energy', False, '12'),
+            ('NEWCO', 'Energy', False, None),
+        ]:
+            stock = BaseStockData.objects.create(
+                symbol=symbol, name=symbol.title(), headquarters='', sector=sector, is_sp500=is_sp500
+            )
+            LatestStockOverview.objects.create(
+                stock=stock, quarter_end_date=datetime.date(2024, 6, 30), pe_ratio=pe_ratio
+            )
+
+    def symbols(self, **kwargs):
+        return [row['symbol'] for row in screener.screen(**kwargs)]
+
+    def test_filters(self):
+        self.assertEqual(self.symbols(filters=['pe_ratio<20']), ['XOM'])
+        self.assertEqual(self.symbols(filters=['sector=Technology', 'pe_ratio >= 32']), ['MSFT'])
+        self.assertEqual(self.symbols(filters=['sector!=Technology']), ['NEWCO', 'XOM'])
+        self.assertEqual(self.symbols(filters=['is_sp500=true']), ['AAPL', 'MSFT'])
+
+    def test_sort_puts_missing_values_last(self):
+        self.assertEqual(self.symbols(sort='pe_ratio'), ['XOM', 'AAPL', 'MSFT', 'NEWCO'])
+        self.assertEqual(self.symbols(sort='-pe_ratio'), ['MSFT', 'AAPL', 'XOM', 'NEWCO'])
+        self.assertEqual(self.symbols(sort='sector,-symbol', limit=3), ['XOM', 'NEWCO', 'MSFT'])
+
+    def test_fields(self):
+        self.assertEqual(
+            screener.screen(filters=['pe_ratio<20'], fields=['pe_ratio']),
+            [{'symbol': 'XOM', 'name': 'Xom', 'sector': 'Energy', 'pe_ratio': Decimal('12.00')}],
+        )
+
+    def test_invalid_screens_are_rejected(self):
+        for params in (
+            {'filter': 'pe_ratio~20'},
+            {'filter': 'volume>5'},
+            {'filter': 'pe_ratio<cheap'},
+            {'sort': 'volume'},
+            {'fields': 'pe_ratio,volume'},
+            {'limit': '0'},
+        ):
+            with self.subTest(params=params):
+                response = self.client.get('/screen/', params)
+                self.assertEqual(response.status_code, 400)
+        self.assertEqual(len(self.client.get('/screen/', {'filter': 'pe_ratio>0'}).json()), 3)
+
+
+class LatestOverviewSnapshotTests(TestCase):
+    def sync_overview(self, quarter_end_date, pe_ratio):
+        payload = synthetic.payload('OVERVIEW', 'AAPL')
+        pav.sync_base_and_quarterly_overview({**payload, 'LatestQuarter': quarter_end_date, 'PERatio': pe_ratio})
+
+    def snapshot(self):
+        overview = LatestStockOverview.objects.get(pk='AAPL')
+        return overview.quarter_end_date.isoformat(), str(overview.pe_ratio)
+
+    def test_snapshot_follows_the_latest_quarter(self):
+        self.sync_overview('2024-06-30', '30')
+        self.assertEqual(self.snapshot(), ('2024-06-30', '30.00'))
+        # Re-syncing an older quarter leaves the snapshot alone
+        self.sync_overview('2024-03-31', '25')
+        self.assertEqual(self.snapshot(), ('2024-06-30', '30.00'))
+        self.sync_overview('2024-06-30', '31')
+        self.assertEqual(self.snapshot(), ('2024-06-30', '31.00'))
+        self.sync_overview('2024-09-30', '32')
+        self.assertEqual(self.snapshot(), ('2024-09-30', '32.00'))
+
+    def test_refresh_rebuilds_the_snapshot_from_the_latest_quarters(self):
+        for symbol in ('AAPL', 'MSFT'):
+            stock = BaseStockData.objects.create(symbol=symbol, name=symbol, headquarters='')
+            for quarter_end_date, pe_ratio in [('2024-03-31', 20), ('2024-06-30', 22)]:
+                QuarterlyStockOverview.objects.create(
+                    stock=stock, quarter_end_date=datetime.date.fromisoformat(quarter_end_date), pe_ratio=pe_ratio
+                )
+        LatestStockOverview.objects.create(stock_id='AAPL', quarter_end_date=datetime.date(2023, 12, 31))
+
+        self.assertEqual(snapshots.refresh_latest_overviews(BaseStockData.objects.filter(symbol='AAPL')), 1)
+        self.assertEqual(self.snapshot(), ('2024-06-30', '22.00'))
+        self.assertFalse(LatestStockOverview.objects.filter(pk='MSFT').exists())
+        self.assertEqual(snapshots.refresh_latest_overviews(), 2)
+        self.assertEqual(
+            list(LatestStockOverview.objects.order_by('pk').values_list('pk', 'quarter_end_date')),
+            [('AAPL', datetime.date(2024, 6, 30)), ('MSFT', datetime.date(2024, 6, 30))],
+        )
+
+    def test_latest_overview_view(self):
+        self.sync_overview('2024-06-30', '30')
+        response = self.client.get('/latest_overview/AAPL/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.json()['quarter_end_date'], response.json()['pe_ratio']), ('2024-06-30', '30.00'))
+        response = self.client.get('/latest_overview/MSFT/')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json(), {'error': 'No overview found for MSFT.'})
+
+
+class StockListPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        BaseStockData.objects.bulk_create([
+            BaseStockData(symbol=symbol, name=name, headquarters='', is_sp500=is_sp500)
+            for symbol, name, is_sp500 in [
+                ('AAPL', 'Apple Inc', True), ('MSFT', 'Microsoft Corp', True), ('APLE', 'Apple Inc', True),
+                ('GOOG', 'Alphabet Inc', True), ('PAPL', 'Pineapple Energy Inc', False),
+            ]
+        ])
+        cls.sp500 = [
+            {'symbol': 'GOOG', 'name': 'Alphabet Inc'}, {'symbol': 'AAPL', 'name': 'Apple Inc'},
+            {'symbol': 'APLE', 'name': 'Apple Inc'}, {'symbol': 'MSFT', 'name': 'Microsoft Corp'},
+        ]
+
+    def test_cursor_pages_cover_the_list_once(self):
+        rows, params = [], {'limit': 2}
+        for _ in range(3):
+            page = self.client.get('/stocks/', params).json()
+            rows += page['results']
+            if page['next_cursor'] is None:
+                break
+            params['cursor'] = page['next_cursor']
+        # Names tie between AAPL and APLE, so the second page starts mid-name
+        self.assertEqual(rows, self.sp500)
+        self.assertEqual(self.client.get('/stocks/', {'cursor': 'not a cursor'}).status_code, 400)
+
+    def test_sp500_only(self):
+        self.assertEqual(self.client.get('/stocks/').json(), self.sp500)
+        symbols = [row['symbol'] for row in self.client.get('/stocks/', {'sp500_only': 'false', 'order': 'symbol'}).json()]
+        self.assertEqual(symbols, ['AAPL', 'APLE', 'GOOG', 'MSFT', 'PAPL'])
+
+    def test_stream_matches_the_full_list(self):
+        response = self.client.get('/stocks/', {'stream': 'true'})
+        self.assertEqual(json.loads(b''.join(response.streaming_content)), self.sp500)
+
+    async def test_stream_is_async_under_asgi(self):
+        response = await self.async_client.get('/stocks/', {'stream': 'true'})
+        self.assertTrue(response.is_async)
+        self.assertEqual(json.loads(b''.join([chunk async for chunk in response.streaming_content])), self.sp500)
+
+
+class EarningsCalendarTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        report_date = datetime.date(2030, 1, 30)
+        for symbol, fiscal_dates, pe_ratio in [
+            ('AAPL', ['2029-12-31'], '30'),
+            # Two fiscal periods reported on the same day
+            ('MSFT', ['2029-09-30', '2029-12-31'], '35'),
+            ('XOM', ['2029-12-31'], None),
+        ]:
+            stock = BaseStockData.objects.create(symbol=symbol, name=symbol.title(), headquarters='', is_sp500=True)
+            LatestStockOverview.objects.create(
+                stock=stock, quarter_end_date=datetime.date(2029, 9, 30), pe_ratio=pe_ratio
+            )
+            for fiscal_date in fiscal_dates:
+                EarningsCalendarData.objects.create(
+                    stock=stock,
+                    report_date=report_date,
+                    fiscal_date_ending=datetime.date.fromisoformat(fiscal_date),
+                    estimate='1.5',
+                )
+
+    def rows(self, params):
+        rows = []
+        for _ in range(5):
+            page = self.client.get('/calendar/', params).json()
+            rows += [(row['symbol'], row['fiscal_date_ending']) for row in page['results']]
+            if page['next_cursor'] is None:
+                return rows
+            params = {**params, 'cursor': page['next_cursor']}
+        self.fail('The calendar pages did not end.')
+
+    def test_cursor_pages_cover_the_calendar_once(self):
+        everything = [
+            ('AAPL', '2029-12-31'), ('MSFT', '2029-09-30'), ('MSFT', '2029-12-31'), ('XOM', '2029-12-31'),
+        ]
+        self.assertEqual(self.rows({'from': '2030-01-01', 'limit': 10}), everything)
+        # A page of two ends between the two MSFT reports
+        self.assertEqual(self.rows({'from': '2030-01-01', 'limit': 2}), everything)
+        self.assertEqual(self.rows({'from': '2030-01-01', 'limit': 1}), everything)
+
+    def test_cursor_round_trip(self):
+        cursor = earnings_calendar.encode_cursor(datetime.date(2030, 1, 30), 'MSFT', 7)
+        self.assertEqual(earnings_calendar.decode_cursor(cursor), (datetime.date(2030, 1, 30), 'MSFT', 7))
+        for cursor in ('2030-01-30:MSFT', '2030-01-30::7', 'not a date:MSFT:7', '2030-01-30:MSFT:x'):
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(ValueError):
+                    earnings_calendar.decode_cursor(cursor)
+                self.assertEqual(self.client.get('/calendar/', {'cursor': cursor}).status_code, 400)
+
+    def test_fields(self):
+        rows = self.client.get('/calendar/', {'from': '2030-01-01', 'fields': 'pe_ratio', 'limit': 1}).json()['results']
+        self.assertEqual(rows, [{
+            'symbol': 'AAPL',
+            'name': 'Aapl',
+            'sector': None,
+            'report_date': '2030-01-30',
+            'fiscal_date_ending': '2029-12-31',
+            'estimate': '1.500',
+            'pe_ratio': '30.00',
+        }])
+        for fields in ('pe_ratio,volume', 'symbol', 'stock'):
+            with self.subTest(fields=fields):
+                response = self.client.get('/calendar/', {'fields': fields})
+                self.assertEqual(response.status_code, 400)
+                self.assertTrue(response.json()['error'].startswith('Unknown overview field'))
+
+
+class MetricsMiddlewareTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        BaseStockData.objects.create(symbol='AAPL', name='Apple Inc', headquarters='', is_sp500=True)
+        pav.sync_base_and_quarterly_overview(synthetic.payload('OVERVIEW', 'AAPL'))
+
+    def test_list_endpoints_stay_within_query_budget(self):
+        with metrics.query_budget(1) as captured:
+            responses = [
+                self.client.get('/stocks/'),
+                self.client.get('/symbols/'),
+                self.client.get('/stocks/', {'limit': 10}),
+                self.client.get('/latest_overview/AAPL/'),
+            ]
+        self.assertEqual([response.status_code for response in responses], [200] * 4)
+        self.assertEqual(len(captured), 4)
+
+    async def test_async_views_are_recorded_under_asgi(self):
+        with metrics.capture() as captured:
+            response = await self.async_client.get('/latest_overview/AAPL/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([(stats.view, stats.status, stats.queries) for stats in captured], [
+            ('get_latest_overview', 200, 1),
+        ])
+
+    def test_query_budget_fails_when_exceeded(self):
+        with self.assertRaises(AssertionError):
+            with metrics.query_budget(0):
+                self.client.get('/stocks/')
+
+    def test_metrics_endpoint_exposes_request_counts(self):
+        metrics.registry.reset()
+        self.client.get('/stocks/')
+        text = self.client.get('/metrics/').content.decode()
+        self.assertIn('stocks_http_requests_total{view="stock-list",method="GET",status="200"} 1', text)
+        self.assertIn('stocks_db_queries_total{view="stock-list"} 1', text)
+
+
+# The summary view queries on worker threads with their own connections, which cannot
+# see the uncommitted data of a TestCase
+class AsyncViewTests(TransactionTestCase):
+    def setUp(self):
+        symbol = synthetic.synthetic_symbols(1)[0]
+        pav.sync_base_and_quarterly_overview(synthetic.payload('OVERVIEW', symbol))
+        pav.sync_stock_price_data(synthetic.payload('TIME_SERIES_DAILY_ADJUSTED', symbol), 'daily')
+        pav.sync_earnings(synthetic.payload('EARNINGS', symbol))
+        self.symbol = symbol
+
+    async def test_summary_gathers_every_section(self):
+        response = await self.async_client.get(f'/summary/{self.symbol}/')
+        self.assertEqual(response.status_code, 200)
+        summary = response.json()
+        self.assertEqual(summary['overview']['stock__symbol'], self.symbol)
+        self.assertEqual(len(summary['prices']), synthetic.SIZES[synthetic.DEFAULT_SIZE]['bars'])
+        self.assertEqual(len(summary['earnings']), synthetic.SIZES[synthetic.DEFAULT_SIZE]['quarterly'])
+        self.assertEqual(summary['calendar'], [])
+        response = await self.async_client.get('/summary/NONE/')
+        self.assertEqual(response.status_code, 404)
+
+    async def test_converted_view_streams_its_rows(self):
+        response = await self.async_client.get(f'/earnings/{self.symbol}/')
+        self.assertEqual(response.status_code, 200)
+        dates = [row['fiscal_date_ending'] for row in response.json()]
+        self.assertEqual(len(dates), synthetic.SIZES[synthetic.DEFAULT_SIZE]['quarterly'])
+        self.assertEqual(dates, sorted(dates))
+
+    @staticmethod
+    def close_worker_connections():
+        # One task per worker thread, held on a barrier so that each lands on its own thread
+        barrier = threading.Barrier(async_queries.QUERY_WORKERS)
+
+        def close():
+            barrier.wait()
+            connections.close_all()
+
+        for future in [async_queries._executor.submit(close) for _ in range(async_queries.QUERY_WORKERS)]:
+            future.result()
+
+    def test_worker_connections_persist_with_conn_max_age(self):
+        database = connections.settings['default']
+        original = database['CONN_MAX_AGE']
+        database['CONN_MAX_AGE'] = 60
+        self.addCleanup(database.__setitem__, 'CONN_MAX_AGE', original)
+        self.addCleanup(self.close_worker_connections)
+        opened = []
+
+        def record(sender, connection, **kwargs):
+            opened.append(connection)
+
+        connection_created.connect(record, dispatch_uid='test_worker_connections')
+        self.addCleanup(connection_created.disconnect, dispatch_uid='test_worker_connections')
+
+        # The first request may open a connection per worker thread, the next reuses them
+        self.assertEqual(self.client.get(f'/summary/{self.symbol}/').status_code, 200)
+        first = len(opened)
+        self.assertEqual(self.client.get(f'/summary/{self.symbol}/').status_code, 200)
+        self.assertEqual(len(opened), first)
+
+
+class SyncTelemetryTests(TestCase):
+    def test_upsert_counts_inserted_updated_and_unchanged_rows(self):
+        run = telemetry.SyncRun('OVERVIEW')
+        with self.assertLogs('stocks.utils.telemetry', level='INFO') as logs:
+            with run.track('AAPL') as record:
+                stock, outcome = pav.upsert(BaseStockData, {'name': 'Apple', 'headquarters': ''}, symbol='AAPL')
+                self.assertEqual(outcome, telemetry.INSERTED)
+                _, outcome = pav.upsert(BaseStockData, {'name': 'Apple'}, symbol='AAPL')
+                self.assertEqual(outcome, telemetry.UNCHANGED)
+                _, outcome = pav.upsert(BaseStockData, {'name': 'Apple Inc'}, symbol='AAPL')
+                self.assertEqual(outcome, telemetry.UPDATED)
+        self.assertEqual((record.inserted, record.updated, record.unchanged), (1, 1, 1))
+        logged = json.loads(logs.records[0].getMessage())
+        self.assertEqual(
+            {key: logged[key] for key in ('event', 'symbol', 'status', 'inserted', 'updated', 'unchanged')},
+            {'event': 'sync_symbol', 'symbol': 'AAPL', 'status': 'ok', 'inserted': 1, 'updated': 1, 'unchanged': 1},
+        )
+        stock.refresh_from_db()
+        self.assertEqual(stock.name, 'Apple Inc')
+
+    def test_upsert_updates_a_row_inserted_after_its_lookup(self):
+        existing = BaseStockData.objects.create(symbol='AAPL', name='Apple')
+        # The first lookup misses the row, as if another sync inserted it right after
+        with mock.patch.object(BaseStockData.objects, 'get', side_effect=[BaseStockData.DoesNotExist, existing]):
+            _, outcome = pav.upsert(BaseStockData, {'name': 'Apple Inc'}, symbol='AAPL')
+        self.assertEqual(outcome, telemetry.UPDATED)
+        self.assertEqual(BaseStockData.objects.get(symbol='AAPL').name, 'Apple Inc')
+
+    def test_report_is_saved_with_stage_summaries(self):
+        run = telemetry.SyncRun('EARNINGS')
+        with self.assertLogs('stocks.utils.telemetry', level='INFO') as logs:
+            with run.track('AAPL') as record:
+                telemetry.record_fetch(0.5, 1000)
+                telemetry.record_backoff(2)
+                telemetry.record_fetch(0.25, 1000)
+            with run.track('MSFT') as skipped:
+                skipped.status = telemetry.SKIPPED
+        self.assertEqual(
+            [(logged['symbol'], logged['status']) for logged in (json.loads(r.getMessage()) for r in logs.records)],
+            [('AAPL', 'ok'), ('MSFT', 'skipped')],
+        )
+        report = run.save().report
+        self.assertEqual(report['statuses'], {'ok': 1, 'skipped': 1})
+        self.assertEqual(report['counters']['requests'], 2)
+        self.assertEqual(report['counters']['retries'], 1)
+        self.assertEqual(report['counters']['bytes_received'], 2000)
+        self.assertEqual(report['stages']['fetch_seconds']['total'], 0.75)
+        self.assertEqual(report['stages']['backoff_seconds']['max'], 2)
+
+
+class EconomicSyncTests(TestCase):
+    def test_failed_series_still_invalidates_the_caches(self):
+        with mock.patch.object(pav, 'sync_gdp'), \
+                mock.patch.object(pav, 'sync_treasury_yield', side_effect=ValueError('fetch failed')):
+            with self.assertRaises(ValueError):
+                pav.sync_economic_indicators({})
+        self.assertEqual(versions.get_version(versions.ECONOMIC_KEY), 1)
+
+
+class SyntheticPayloadTests(TestCase):
+    def test_payloads_are_deterministic(self):
+        self.assertEqual(synthetic.payload('BALANCE_SHEET', 'SYN00000'), synthetic.payload('BALANCE_SHEET', 'SYN00000'))
+        self.assertNotEqual(synthetic.payload('CPI'), synthetic.payload('CPI', seed=1))
+
+    def test_payloads_sync_through_the_parsers(self):
+        symbol = synthetic.synthetic_symbols(1)[0]
+        pav.sync_base_and_quarterly_overview(synthetic.payload('OVERVIEW', symbol))
+        pav.sync_stock_price_data(synthetic.payload('TIME_SERIES_DAILY_ADJUSTED', symbol), 'daily')
+        pav.sync_income_statement(synthetic.payload('INCOME_STATEMENT', symbol))
+
+        dimensions = synthetic.SIZES[synthetic.DEFAULT_SIZE]
+        self.assertEqual(
+            StockPriceData.objects.filter(stock=symbol, interval='daily').count(), dimensions['bars']
+        )
+        self.assertEqual(
+            IncomeStatementData.objects.filter(stock=symbol).count(),
+            dimensions['annual'] + dimensions['quarterly'],
+        )
+
+
+class MockAlphaVantageTests(SimpleTestCase):
+    def start(self, **options):
+        server = mock_av.start_server(**options)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        url = mock_av.query_url(server)
+        settings_override = override_settings(ALPHA_VANTAGE_URL=url, ALPHA_VANTAGE_CSV_URL=url)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        return server.mock
+
+    def test_serves_synthetic_json_and_csv_payloads(self):
+        self.start()
+        self.assertEqual(pav.fetch_data('OVERVIEW', 'AAPL', api_key='key'), synthetic.payload('OVERVIEW', 'AAPL'))
+        rows = pav.fetch_csv_data('EARNINGS_CALENDAR', api_key='key', horizon='3month')
+        self.assertEqual(rows[0], ['symbol', 'name', 'reportDate', 'fiscalDateEnding', 'estimate', 'currency'])
+
+    def test_fetch_retries_injected_rate_limits(self):
+        mock = self.start(error_rate=1.0)
+        with self.assertRaisesMessage(ValueError, 'Max retries exceeded'):
+            pav.fetch_data('CPI', api_key='key', backoff_seconds=0, max_retries=2)
+        self.assertEqual(mock.stats['injected_errors'], 2)
+
+    def test_rate_limit_is_per_window(self):
+        mock = self.start(rate_limit=2, rate_window=60)
+        for expected in (200, 200, 429):
+            self.assertEqual(mock.respond({'function': 'CPI'}, 'key')[0], expected)
+        self.assertEqual(mock.respond({'function': 'CPI'}, 'other key')[0], 200)
@@ -20,6 +20,10 @@ urlpatterns = [
          views.get_quarterly_overview,
          name='get_quarterly_overview'
     ),
+    path('latest_overview/<str:symbol>/',
+         views.get_latest_overview,
+         name='get_latest_overview'
+    ),
     path(
          'balance_sheet/<str:symbol>/',
          views.get_balance_sheet,
@@ -35,9 +39,36 @@ urlpatterns = [
           views.get_cash_flow,
           name='get_cash_flow'
      ),
+     path(
+          'fundamentals/<str:symbol>/',
+          views.get_fundamental_metrics,
+          name='get_fundamental_metrics'
+     ),
+     path(
+          'valuation_history/<str:symbol>/',
+          views.get_valuation_history,
+          name='get_valuation_history'
+     ),
      path(
           'earnings_calendar/<str:symbol>/',
           views.get_earnings_calendar,
           name='get_earnings_calendar'
-     )
+     ),
+     path('metrics/', views.get_metrics, name='get_metrics'),
+     path('summary/<str:symbol>/', views.get_stock_summary, name='get_stock_summary'),
+     path('calendar/', views.get_market_earnings_calendar, name='get_market_earnings_calendar'),
+     path('prices/', views.get_price_matrix, name='get_price_matrix'),
+     path('returns/<str:symbol>/', views.get_returns, name='get_returns'),
+     path('indicators/<str:symbol>/', views.get_indicators, name='get_indicators'),
+     path('search/', views.search_stocks, name='search_stocks'),
+     path('screen/', views.screen_stocks, name='screen_stocks'),
+     path('macro/', views.get_macro_panel, name='get_macro_panel'),
+     path('yield_curve/', views.get_yield_curve, name='get_yield_curve'),
+     path('yield_spread/', views.get_yield_spread, name='get_yield_spread'),
+     path('correlation/', views.get_correlation, name='get_correlation'),
+     path('backtest/', views.run_backtest, name='run_backtest'),
+     path('optimize/', views.optimize_portfolio, name='optimize_portfolio'),
+     path('sector/<str:name>/', views.get_sector, name='get_sector'),
+     path('earnings_events/', views.get_earnings_event_statistics, name='get_earnings_event_statistics'),
+     path('earnings_events/<str:symbol>/', views.get_earnings_events, name='get_earnings_events'),
 ]
@@ -0,0 +1,215 @@
+import datetime
+import logging
+from decimal import Decimal
+from typing import Iterable, Optional
+
+import pandas as pd
+from django.db import transaction
+
+from stocks.models import BaseStockData, StockPriceData
+from stocks.utils import price_store, returns, versions
+
+logger = logging.getLogger(__name__)
+
+# Intervals that are derived from the stored daily bars and the pandas period each
+# bar covers. Weekly bars end on Friday, matching Alpha Vantage's weekly series.
+AGGREGATED_INTERVALS = {
+    'weekly': 'W-FRI',
+    'monthly': 'M',
+}
+
+BAR_COLUMNS = [
+    'open',
+    'high',
+    'low',
+    'close',
+    'adj_close',
+    'volume',
+    'dividend',
+    'split_coefficient',
+]
+
+
+def period_start(date: datetime.date, interval: str) -> datetime.date:
+    """
+    Returns the first calendar day of the weekly or monthly period containing a date.
+
+    Args:
+        date (datetime.date): Any date within the period.
+        interval (str): 'weekly' or 'monthly'.
+
+    Returns:
+        datetime.date: The Monday of the week or the first day of the month.
+    """
+    if interval == 'weekly':
+        return date - datetime.timedelta(days=date.weekday())
+    elif interval == 'monthly':
+        return date.replace(day=1)
+    raise ValueError(f"Invalid interval: {interval}. Must be one of {', '.join(AGGREGATED_INTERVALS)}.")
+
+
+def next_period_start(date: datetime.date, interval: str) -> datetime.date:
+    """
+    Returns the first calendar day of the weekly or monthly period after the one
+    containing a date.
+    """
+    start = period_start(date, interval)
+    if interval == 'weekly':
+        return start + datetime.timedelta(days=7)
+    return (start + datetime.timedelta(days=32)).replace(day=1)
+
+
+def derivable_start(stock: BaseStockData, interval: str) -> Optional[datetime.date]:
+    """
+    Returns the first period start from which the stored daily bars cover every period,
+    so bars derived from there on are complete.
+
+    The daily history is often shorter than the weekly and monthly series fetched from
+    the API (a compact daily sync keeps 100 bars). Stored aggregated bars before the
+    first daily bar are kept, as is the stored bar of a period the daily bars only
+    partly cover.
+
+    Args:
+        stock (BaseStockData): The stock.
+        interval (str): 'weekly' or 'monthly'.
+
+    Returns:
+        Optional[datetime.date]: The first derivable period start, or None if the
+            stock has no daily bars.
+    """
+    earliest = (
+        StockPriceData.objects.filter(stock=stock, interval='daily')
+        .order_by('date').values_list('date', flat=True).first()
+    )
+    if earliest is None:
+        return None
+    start = period_start(earliest, interval)
+    partly_covered = earliest > start and StockPriceData.objects.filter(
+        stock=stock, interval=interval, date__gte=start, date__lt=next_period_start(start, interval)
+    ).exists()
+    return next_period_start(start, interval) if partly_covered else start
+
+
+def aggregate_bars(daily: pd.DataFrame, interval: str) -> pd.DataFrame:
+    """
+    Aggregates daily bars into weekly or monthly bars in a single vectorized pass.
+
+    Each period's bar is dated on its last trading day, like Alpha Vantage's weekly and
+    monthly adjusted series: open is the first open, high/low the extremes, close and
+    adj_close the last values, volume and dividend the sums and the split coefficient
+    the product of the daily coefficients.
+
+    Args:
+        daily (pd.DataFrame): Daily bars sorted by date, with a 'date' column and the
+            columns in BAR_COLUMNS.
+        interval (str): 'weekly' or 'monthly'.
+
+    Returns:
+        pd.DataFrame: One row per period with a 'date' column and the BAR_COLUMNS.
+    """
+    if interval not in AGGREGATED_INTERVALS:
+        raise ValueError(f"Invalid interval: {interval}. Must be one of {', '.join(AGGREGATED_INTERVALS)}.")
+
+    daily = daily.astype({column: float for column in BAR_COLUMNS})
+    daily['dividend'] = daily['dividend'].fillna(0.0)
+    daily['split_coefficient'] = daily['split_coefficient'].fillna(1.0)
+
+    periods = pd.to_datetime(daily['date']).dt.to_period(AGGREGATED_INTERVALS[interval])
+    bars = daily.groupby(periods.to_numpy(), sort=True).agg(
+        date=('date', 'last'),
+        open=('open', 'first'),
+        high=('high', 'max'),
+        low=('low', 'min'),
+        close=('close', 'last'),
+        adj_close=('adj_close', 'last'),
+        volume=('volume', 'sum'),
+        dividend=('dividend', 'sum'),
+        split_coefficient=('split_coefficient', 'prod'),
+    )
+    return bars.reset_index(drop=True)
+
+
+def _to_decimal(value: float, field_name: str) -> Optional[Decimal]:
+    """
+    Rounds a float to the decimal places of the given StockPriceData field.
+    """
+    if pd.isna(value):
+        return None
+    decimal_places = StockPriceData._meta.get_field(field_name).decimal_places
+    return Decimal(f"{value:.{decimal_places}f}")
+
+
+def update_aggregated_bars(
+    stock: BaseStockData,
+    interval: str,
+    since: Optional[datetime.date] = None,
+) -> int:
+    """
+    Rebuilds the weekly or monthly bars of a stock from its stored daily bars.
+
+    Only the periods from the one containing `since` onwards are rebuilt, so a daily sync
+    that appends a few bars only rewrites the current week and month. The derived log
+    returns of the interval are refreshed for the same range. Passing since=None rebuilds
+    every period the daily bars cover. Stored bars the daily history doesn't cover (see
+    derivable_start) are never replaced.
+
+    Args:
+        stock (BaseStockData): The stock whose bars to rebuild.
+        interval (str): 'weekly' or 'monthly'.
+        since (Optional[datetime.date]): The earliest daily bar that changed.
+
+    Returns:
+        int: The number of aggregated bars written.
+    """
+    start = derivable_start(stock, interval)
+    if start is None:
+        return 0
+    if since is not None:
+        start = max(start, period_start(since, interval))
+
+    daily_bars = StockPriceData.objects.filter(stock=stock, interval='daily', date__gte=start)
+    stale_bars = StockPriceData.objects.filter(stock=stock, interval=interval, date__gte=start)
+
+    rows = daily_bars.order_by('date').values_list('date', *BAR_COLUMNS)
+    daily = pd.DataFrame.from_records(list(rows), columns=['date', *BAR_COLUMNS])
+    bars = aggregate_bars(daily, interval)
+
+    with transaction.atomic():
+        stale_bars.delete()
+        StockPriceData.objects.bulk_create(
+            [
+                StockPriceData(
+                    stock=stock,
+                    date=bar.date,
+                    interval=interval,
+                    open=_to_decimal(bar.open, 'open'),
+                    high=_to_decimal(bar.high, 'high'),
+                    low=_to_decimal(bar.low, 'low'),
+                    close=_to_decimal(bar.close, 'close'),
+                    adj_close=_to_decimal(bar.adj_close, 'adj_close'),
+                    volume=int(bar.volume),
+                    dividend=_to_decimal(bar.dividend, 'dividend'),
+                    split_coefficient=_to_decimal(bar.split_coefficient, 'split_coefficient'),
+                )
+                for bar in bars.itertuples(index=False)
+            ],
+            batch_size=1000,
+        )
+        returns.update_returns(stock, interval, since=start)
+    if price_store.is_enabled():
+        price_store.update_symbol(stock.symbol, interval, since=start)
+    versions.bump_version(versions.prices_key(stock.symbol))
+    return len(bars)
+
+
+def rebuild_aggregated_bars(stocks: Iterable[BaseStockData], interval: str) -> None:
+    """
+    Rebuilds the weekly or monthly history of every given stock that its daily bars cover.
+
+    Args:
+        stocks (Iterable[BaseStockData]): The stocks to rebuild.
+        interval (str): 'weekly' or 'monthly'.
+    """
+    for stock in stocks:
+        count = update_aggregated_bars(stock, interval)
+        logger.info(f"Derived {count} {interval} bars for {stock.symbol} from daily data")
@@ -0,0 +1,45 @@
+from typing import Iterable, Optional
+
+import pandas as pd
+
+
+def _as_datetime_index(index: pd.Index) -> pd.DatetimeIndex:
+    return pd.DatetimeIndex(pd.to_datetime(index)).as_unit('ns')
+
+
+def asof_join(
+    left: pd.DataFrame,
+    right: pd.DataFrame,
+    columns: Optional[Iterable[str]] = None,
+) -> pd.DataFrame:
+    """
+    Aligns each row of `left` with the most recent row of `right` on or before it.
+
+    Both frames must be indexed by date. The join is a single merge-asof pass over the two
+    sorted indexes, so it is O(n + m) instead of one lookup query per left row. This is the
+    point-in-time join used to attach fundamentals (known from their availability date
+    onwards) to daily prices.
+
+    Args:
+        left (pd.DataFrame): The frame to align to, e.g. daily prices.
+        right (pd.DataFrame): The events to carry forward, e.g. earnings by reported date.
+            Rows sharing a date keep the last one.
+        columns (Optional[Iterable[str]]): The columns of `right` to attach (default: all).
+
+    Returns:
+        pd.DataFrame: `left` with the selected columns of `right` added. Rows before the
+        first event get NaN.
+    """
+    columns = list(columns) if columns is not None else list(right.columns)
+
+    left_keys = pd.DataFrame({'_date': _as_datetime_index(left.index)})
+    right_frame = right[columns].copy()
+    right_frame.index = _as_datetime_index(right.index)
+    right_frame = right_frame[~right_frame.index.duplicated(keep='last')].sort_index()
+    right_frame = right_frame.rename_axis('_date').reset_index()
+
+    joined = pd.merge_asof(left_keys, right_frame, on='_date', direction='backward')
+    result = left.copy()
+    for column in columns:
+        result[column] = joined[column].to_numpy()
+    return result
@@ -0,0 +1,51 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+
+# Worker threads gather_queries runs queries on, each with its own database connection.
+# They outlive requests (under WSGI, each async view runs on a new event loop whose
+# default executor is shut down when it returns), so their connections can persist.
+QUERY_WORKERS = 8
+
+_executor = ThreadPoolExecutor(max_workers=QUERY_WORKERS, thread_name_prefix='stocks-query')
+
+
+def _in_own_connection(func: Callable[[], Any]) -> Callable[[], Any]:
+    """
+    Wraps a query function so that the worker thread's database connection is handled
+    like a request's: it is closed when it returns if it is broken or older than
+    CONN_MAX_AGE, and kept for the next query otherwise.
+    """
+    def run():
+        try:
+            return func()
+        finally:
+            close_old_connections()
+    return run
+
+
+async def gather_queries(**queries: Callable[[], Any]) -> Dict[str, Any]:
+    """
+    Runs independent ORM query functions concurrently.
+
+    The async ORM methods (afirst(), async for, ...) all run in the single thread that
+    sync code is serialized onto, so awaiting several of them with asyncio.gather still
+    executes the queries one after another. Here each function runs in its own worker
+    thread with its own database connection instead, so the queries genuinely overlap
+    and the total latency is that of the slowest one.
+
+    Args:
+        **queries (Callable[[], Any]): Functions without arguments that run a query and
+            return plain data (e.g. a list of values() rows), by result name.
+
+    Returns:
+        Dict[str, Any]: The result of each function under its name.
+    """
+    results = await asyncio.gather(*[
+        sync_to_async(_in_own_connection(query), thread_sensitive=False, executor=_executor)()
+        for query in queries.values()
+    ])
+    return dict(zip(queries, results))
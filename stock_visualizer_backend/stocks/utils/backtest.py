@@ -0,0 +1,217 @@
+import datetime
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from stocks.models import BaseStockData, LatestStockOverview
+from stocks.utils import price_matrix
+
+TRADING_DAYS_PER_YEAR = 252
+
+WEIGHTINGS = ('equal', 'cap')
+
+# Rebalance frequencies and the pandas period between rebalances. A portfolio is
+# rebalanced at the close of the last trading day of each period.
+REBALANCE_FREQUENCIES = {
+    'daily': 'D',
+    'weekly': 'W-FRI',
+    'monthly': 'M',
+    'quarterly': 'Q',
+    'annual': 'Y',
+}
+
+
+def rebalance_mask(dates: pd.Index, frequency: str) -> np.ndarray:
+    """
+    Flags the last trading day of each rebalance period, plus the first day so the
+    portfolio is invested from the start. The last day of the data is never flagged.
+
+    Raises:
+        ValueError: If the frequency is unknown.
+    """
+    if frequency not in REBALANCE_FREQUENCIES:
+        raise ValueError(
+            f"Invalid rebalance frequency: {frequency}. Must be one of {', '.join(REBALANCE_FREQUENCIES)}."
+        )
+    periods = pd.PeriodIndex(pd.to_datetime(dates), freq=REBALANCE_FREQUENCIES[frequency])
+    mask = np.zeros(len(dates), dtype=bool)
+    mask[:-1] = periods[1:] != periods[:-1]
+    if len(mask):
+        mask[0] = True
+    return mask
+
+
+def simulate(
+    prices: np.ndarray,
+    target_weights: np.ndarray,
+    rebalance: np.ndarray,
+    cost_bps: float = 0.0,
+) -> Dict[str, np.ndarray]:
+    """
+    Simulates a periodically rebalanced long-only portfolio without per-day loops.
+
+    Positions are set to the target weights at the close of every rebalance day and then
+    drift with prices until the next one. Within a rebalance segment starting on day s,
+    the value of the portfolio on day t is sum_i w_i(s) * G_i(t) / G_i(s), where G is the
+    cumulative growth of each asset, so every day's return is computed from two T x N
+    array expressions.
+
+    Args:
+        prices (np.ndarray): T x N total return prices (e.g. adj_close), NaN when a symbol
+            has no bar. A missing bar counts as an unchanged price.
+        target_weights (np.ndarray): T x N non-negative weights, only read on rebalance
+            days. Each row is normalized to sum to 1; rows that are all zero hold cash.
+        rebalance (np.ndarray): T booleans, True on rebalance days.
+        cost_bps (float): Transaction cost in basis points of traded value, charged on
+            each rebalance.
+
+    Returns:
+        Dict[str, np.ndarray]: Daily portfolio 'returns' (0 on the first day), the 'nav'
+        starting at 1 and the 'turnover' (traded value as a fraction of the portfolio) on
+        each rebalance day.
+    """
+    prices = np.asarray(prices, dtype=float)
+    count = len(prices)
+    if count == 0:
+        return {'returns': np.empty(0), 'nav': np.empty(0), 'turnover': np.empty(0)}
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        asset_returns = prices[1:] / prices[:-1] - 1
+    asset_returns = np.nan_to_num(asset_returns, nan=0.0, posinf=0.0, neginf=0.0)
+    growth = np.vstack([np.ones(prices.shape[1]), np.cumprod(1 + asset_returns, axis=0)])
+
+    weights = np.where(np.isnan(prices), 0.0, np.nan_to_num(target_weights, nan=0.0))
+    totals = weights.sum(axis=1, keepdims=True)
+    weights = np.divide(weights, totals, out=np.zeros_like(weights), where=totals > 0)
+
+    # Index of the rebalance that sets the positions held over each day
+    segment = np.maximum.accumulate(np.where(rebalance, np.arange(count), 0))
+    held = segment[:-1]
+    relative_now = growth[1:] / growth[held]
+    relative_before = growth[:-1] / growth[held]
+    value_now = (weights[held] * relative_now).sum(axis=1)
+    value_before = (weights[held] * relative_before).sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        daily = np.where(value_before > 0, value_now / value_before - 1, 0.0)
+
+    # Turnover compares the new targets with the positions drifted from the previous
+    # rebalance to the close of the rebalance day
+    previous = np.concatenate([[0], segment[:-1]])
+    drifted = weights[previous] * growth / growth[previous]
+    drifted_totals = drifted.sum(axis=1, keepdims=True)
+    drifted = np.divide(drifted, drifted_totals, out=np.zeros_like(drifted), where=drifted_totals > 0)
+    changes = np.abs(weights - drifted)
+    changes[0] = weights[0]
+    turnover = np.where(rebalance, changes.sum(axis=1), np.nan)
+
+    returns = np.concatenate([[0.0], daily])
+    returns -= np.where(rebalance, turnover, 0.0) * cost_bps / 10_000
+    return {'returns': returns, 'nav': np.cumprod(1 + returns), 'turnover': turnover}
+
+
+def summarize(returns: np.ndarray) -> Dict[str, Optional[float]]:
+    """
+    Computes headline statistics of a daily return series.
+    """
+    if len(returns) < 2:
+        return {'total_return': None, 'cagr': None, 'volatility': None, 'sharpe': None, 'max_drawdown': None}
+    nav = np.cumprod(1 + returns)
+    years = (len(returns) - 1) / TRADING_DAYS_PER_YEAR
+    volatility = float(np.std(returns[1:], ddof=1) * np.sqrt(TRADING_DAYS_PER_YEAR))
+    mean = float(np.mean(returns[1:]) * TRADING_DAYS_PER_YEAR)
+    return {
+        'total_return': float(nav[-1] - 1),
+        'cagr': float(nav[-1] ** (1 / years) - 1) if years > 0 and nav[-1] > 0 else None,
+        'volatility': volatility,
+        'sharpe': mean / volatility if volatility > 0 else None,
+        'max_drawdown': float((nav / np.maximum.accumulate(nav) - 1).min()),
+    }
+
+
+def run_backtest(
+    symbols: Iterable[str],
+    weighting: str = 'equal',
+    rebalance: str = 'monthly',
+    start: Optional[datetime.date] = None,
+    end: Optional[datetime.date] = None,
+    sector_tilts: Optional[Dict[str, float]] = None,
+    use_membership: bool = True,
+    cost_bps: float = 0.0,
+) -> Dict[str, object]:
+    """
+    Backtests a rebalanced portfolio of stored stocks.
+
+    Returns come from adj_close, so dividends are reinvested. Cap weights use the latest
+    shares outstanding times each day's raw close, i.e. shares are held constant.
+
+    Args:
+        symbols (Iterable[str]): The candidate symbols.
+        weighting (str): 'equal' or 'cap'.
+        rebalance (str): One of REBALANCE_FREQUENCIES.
+        start (Optional[datetime.date]): First date (inclusive).
+        end (Optional[datetime.date]): Last date (inclusive).
+        sector_tilts (Optional[Dict[str, float]]): Non-negative multipliers applied to the
+            weights of each sector before normalizing, e.g. {'Technology': 1.5}.
+        use_membership (bool): Only hold S&P 500 members from their date_added_to_sp500
+            onwards (members without a date are always eligible, non-members never are).
+        cost_bps (float): Transaction cost in basis points of traded value.
+
+    Returns:
+        Dict[str, object]: 'series' (a date indexed frame with 'nav', 'returns' and
+        'turnover') and 'stats' (see summarize).
+
+    Raises:
+        ValueError: If the weighting, rebalance frequency or a sector tilt is invalid.
+    """
+    if weighting not in WEIGHTINGS:
+        raise ValueError(f"Invalid weighting: {weighting}. Must be one of {', '.join(WEIGHTINGS)}.")
+    for sector, multiplier in (sector_tilts or {}).items():
+        # simulate() holds long-only portfolios, which need non-negative weights
+        if not (np.isfinite(multiplier) and multiplier >= 0):
+            raise ValueError(f"Invalid tilt for {sector}: {multiplier}. Must be a non-negative number.")
+
+    symbols = list(symbols)
+    prices = price_matrix.load_price_matrix(symbols, 'adj_close', start=start, end=end)
+    mask = rebalance_mask(prices.index, rebalance)
+    dates = pd.to_datetime(prices.index).to_numpy()
+
+    stocks = {
+        symbol: (sector, is_sp500, added)
+        for symbol, sector, is_sp500, added in BaseStockData.objects
+        .filter(symbol__in=symbols)
+        .values_list('symbol', 'sector', 'is_sp500', 'date_added_to_sp500')
+    }
+    tilts = np.array([
+        (sector_tilts or {}).get(stocks.get(symbol, (None,))[0], 1.0) for symbol in symbols
+    ])
+
+    if weighting == 'cap':
+        shares = dict(
+            LatestStockOverview.objects
+            .filter(stock_id__in=symbols)
+            .values_list('stock_id', 'shares_outstanding')
+        )
+        closes = price_matrix.load_price_matrix(symbols, 'close', start=start, end=end)
+        weights = closes.reindex(prices.index).to_numpy() * np.array(
+            [float(shares.get(symbol) or 0) for symbol in symbols]
+        )
+    else:
+        weights = np.ones(prices.shape)
+    weights = weights * tilts
+
+    if use_membership:
+        eligible_from = np.array([
+            np.datetime64(stocks[symbol][2]) if symbol in stocks and stocks[symbol][2] else
+            np.datetime64('1900-01-01') if symbol in stocks and stocks[symbol][1] else
+            np.datetime64('2262-01-01')
+            for symbol in symbols
+        ], dtype='datetime64[ns]')
+        weights = np.where(dates[:, None] >= eligible_from[None, :], weights, 0.0)
+
+    result = simulate(prices.to_numpy(), weights, mask, cost_bps=cost_bps)
+    series = pd.DataFrame(
+        {'nav': result['nav'], 'returns': result['returns'], 'turnover': result['turnover']},
+        index=prices.index,
+    )
+    return {'series': series, 'stats': summarize(result['returns'])}
@@ -0,0 +1,406 @@
+import datetime
+import functools
+import json
+import logging
+import statistics
+import subprocess
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+from unittest import mock
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import override_settings
+
+from stocks.models import BaseStockData
+from stocks.utils import loadtest, metrics, optimization, price_matrix, price_store, risk, synthetic
+from stocks.utils import parse_alpha_vantage as pav
+
+# The per-symbol sync functions, in the order a new stock is synced (OVERVIEW creates it)
+SYNC_FUNCTIONS = {
+    'OVERVIEW': pav.sync_base_and_quarterly_overview,
+    'TIME_SERIES_DAILY_ADJUSTED': functools.partial(pav.sync_stock_price_data, interval='daily'),
+    'INCOME_STATEMENT': pav.sync_income_statement,
+    'BALANCE_SHEET': pav.sync_balance_sheet,
+    'CASH_FLOW': pav.sync_cash_flow,
+    'EARNINGS': pav.sync_earnings,
+}
+
+# The market-wide sync functions, which fetch their own payloads. The benchmark patches
+# fetch_data and fetch_csv_data to return synthetic ones.
+MARKET_SYNC_FUNCTIONS = {
+    'REAL_GDP': pav.sync_gdp,
+    'TREASURY_YIELD': pav.sync_treasury_yield,
+    'EARNINGS_CALENDAR': pav.sync_earnings_calendar,
+}
+
+# Request paths of the view benchmarks; {symbol} and {symbols} are filled in with
+# synthetic stocks. The summary view is left out: it queries on separate connections,
+# which cannot see the uncommitted synthetic data.
+VIEW_PATHS = [
+    '/stocks/',
+    '/symbols/',
+    '/search/?q=syn',
+    '/screen/',
+    '/calendar/',
+    '/adjusted_stock_price/{symbol}/',
+    '/quarterly_overview/{symbol}/',
+    '/latest_overview/{symbol}/',
+    '/earnings/{symbol}/',
+    '/balance_sheet/{symbol}/',
+    '/income_statement/{symbol}/',
+    '/cash_flow/{symbol}/',
+    '/fundamentals/{symbol}/',
+    '/valuation_history/{symbol}/',
+    '/earnings_calendar/{symbol}/',
+    '/returns/{symbol}/',
+    '/indicators/{symbol}/?names=sma,rsi',
+    '/prices/?symbols={symbols}',
+    '/correlation/?symbols={symbols}',
+    '/macro/',
+]
+
+# Values of each converter benchmark: valid, empty and malformed inputs
+CONVERTER_INPUTS = {
+    'safe_decimal': ['123.4567', '-0.0012', 'None', '1e5', '', 'bad'],
+    'safe_int': ['123456789', '12.6', 'None', '-5', '', 'bad'],
+    'safe_date': ['2024-01-31', '1999-12-31', 'None', '2024-02-30', '', 'bad'],
+}
+
+# Benchmarks on synthetic data run without a cache, so each request does its full work
+NO_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+
+def time_call(func: Callable, repeat: int = 3) -> Dict[str, float]:
+    """
+    Times repeated calls of a function.
+
+    Args:
+        func (Callable): The function to call without arguments.
+        repeat (int): The number of timed calls.
+
+    Returns:
+        Dict[str, float]: The best and mean wall clock time in seconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return {'best_seconds': min(timings), 'mean_seconds': statistics.mean(timings)}
+
+
+def universe_symbols(include_all: bool = False) -> List[str]:
+    """
+    Returns the symbols benchmarks run over: the S&P 500 members, or every stock.
+    """
+    stocks = BaseStockData.objects.all() if include_all else BaseStockData.objects.filter(is_sp500=True)
+    return list(stocks.order_by('symbol').values_list('symbol', flat=True))
+
+
+def bench_price_store(repeat: int = 3, symbols: Optional[List[str]] = None, **kwargs) -> Dict[str, dict]:
+    """
+    Compares loading the full-universe daily adj_close matrix through the ORM with
+    loading it from the columnar price store.
+
+    The store is rebuilt for the universe first, so the numbers reflect a warm store.
+    """
+    symbols = symbols or universe_symbols()
+    price_store.rebuild(symbols, ['daily'])
+
+    results = {}
+    for label, enabled in [('orm', False), ('price_store', True)]:
+        with override_settings(PRICE_STORE_ENABLED=enabled):
+            matrix = price_matrix.load_price_matrix(symbols)
+            results[label] = {
+                **time_call(lambda: price_matrix.load_price_matrix(symbols), repeat=repeat),
+                'shape': list(matrix.shape),
+            }
+    return results
+
+
+def bench_correlation(repeat: int = 3, symbols: Optional[List[str]] = None, **kwargs) -> Dict[str, dict]:
+    """
+    Times a full-universe one year covariance/correlation computation, with and without
+    Ledoit-Wolf shrinkage, including loading the return matrix.
+    """
+    symbols = symbols or universe_symbols()
+    results = {}
+    for shrinkage in risk.SHRINKAGE_METHODS:
+        result = risk.compute_risk_matrix(symbols, shrinkage=shrinkage)
+        results[shrinkage] = {
+            **time_call(lambda: risk.compute_risk_matrix(symbols, shrinkage=shrinkage), repeat=repeat),
+            'symbols': len(result['symbols']),
+        }
+    return results
+
+
+def bench_optimize(repeat: int = 3, symbols: Optional[List[str]] = None, **kwargs) -> Dict[str, dict]:
+    """
+    Times each portfolio optimization over the full universe on a cached covariance.
+    """
+    symbols = symbols or universe_symbols()
+    matrix = risk.get_risk_matrix(symbols, shrinkage='ledoit_wolf')
+    covariance = matrix['covariance'] * optimization.TRADING_DAYS_PER_YEAR
+    expected = matrix['mean'] * optimization.TRADING_DAYS_PER_YEAR
+    if not len(covariance):
+        return {}
+    solvers = {
+        'min_variance': lambda: optimization.min_variance(covariance),
+        'max_sharpe': lambda: optimization.max_sharpe(covariance, expected),
+        'risk_parity': lambda: optimization.risk_parity(covariance),
+    }
+    results = {name: time_call(solver, repeat=repeat) for name, solver in solvers.items()}
+    return {'symbols': len(matrix['symbols']), **results}
+
+
+def bench_connections(repeat: int = 3, requests: int = 100, **kwargs) -> Dict[str, dict]:
+    """
+    Measures the per-request latency saved by persistent connections on get_symbols.
+
+    Requests go through the WSGI handler like a real server, so Django closes the
+    connection at the end of each request when CONN_MAX_AGE is 0 and reuses it
+    otherwise. With DB_POOL enabled, 'per_request' connections are checked out of and
+    returned to the pool instead of opened and closed.
+    """
+    handler = WSGIHandler()
+    original = connection.settings_dict['CONN_MAX_AGE']
+    results = {}
+    try:
+        for label, max_age in [('per_request', 0), ('persistent', 600)]:
+            connection.close()
+            connection.settings_dict['CONN_MAX_AGE'] = max_age
+            loadtest.wsgi_get(handler, '/symbols/')
+            timings = time_call(
+                lambda: [loadtest.wsgi_get(handler, '/symbols/') for _ in range(requests)], repeat=repeat
+            )
+            results[label] = {
+                'best_ms_per_request': 1000 * timings['best_seconds'] / requests,
+                'mean_ms_per_request': 1000 * timings['mean_seconds'] / requests,
+            }
+    finally:
+        connection.settings_dict['CONN_MAX_AGE'] = original
+        connection.close()
+    results['saved_ms_per_request'] = (
+        results['per_request']['best_ms_per_request'] - results['persistent']['best_ms_per_request']
+    )
+    results['pool'] = bool(connection.settings_dict.get('OPTIONS', {}).get('pool'))
+    return results
+
+
+@contextmanager
+def synthetic_dataset(
+    symbols: int = 5, size: str = synthetic.DEFAULT_SIZE, seed: int = 0
+) -> Iterator[List[str]]:
+    """
+    Syncs synthetic stocks and economic series inside a transaction that is rolled back
+    at the end of the block, so benchmarks have known data without changing the database.
+
+    Args:
+        symbols (int): The number of synthetic stocks.
+        size (str): The payload size, from synthetic.SIZES.
+        seed (int): The seed of the payloads.
+
+    Yields:
+        List[str]: The symbols of the synthetic stocks.
+    """
+    names = synthetic.synthetic_symbols(symbols)
+    with override_settings(CACHES=NO_CACHE, PRICE_STORE_ENABLED=False), transaction.atomic():
+        try:
+            for symbol in names:
+                for function, sync in SYNC_FUNCTIONS.items():
+                    sync(synthetic.payload(function, symbol, size=size, seed=seed))
+            for function, config in pav.ECONOMIC_INDICATORS_CONFIG.items():
+                pav.store_indicator_data(
+                    synthetic.payload(function, size=size, seed=seed, interval=config.get('interval')),
+                    config['model_class'],
+                    value_transform_func=config['value_transform_func'],
+                )
+            yield names
+        finally:
+            transaction.set_rollback(True)
+
+
+def bench_sync(repeat: int = 3, size: str = synthetic.DEFAULT_SIZE, seed: int = 0, **kwargs) -> Dict[str, dict]:
+    """
+    Times each sync_* function on synthetic payloads: the first sync of a stock, which
+    inserts every row, and a re-sync of the same payload, which finds every row unchanged.
+    The market-wide syncs (GDP, treasury yields and the earnings calendar) are timed the
+    same way, on synthetic payloads in place of their API calls.
+
+    Everything runs inside a rolled back transaction.
+    """
+    results = {}
+    with override_settings(CACHES=NO_CACHE, PRICE_STORE_ENABLED=False), transaction.atomic():
+        try:
+            names = synthetic.synthetic_symbols(repeat)
+            for function, sync in SYNC_FUNCTIONS.items():
+                payloads = [synthetic.payload(function, symbol, size=size, seed=seed) for symbol in names]
+                timings = {}
+                for label in ('insert', 'resync'):
+                    durations = []
+                    for data in payloads:
+                        start = time.perf_counter()
+                        sync(data)
+                        durations.append(time.perf_counter() - start)
+                    timings[label] = {'best_seconds': min(durations), 'mean_seconds': statistics.mean(durations)}
+                results[function] = {**timings, 'payload_bytes': len(json.dumps(payloads[0]))}
+
+            for function, config in pav.ECONOMIC_INDICATORS_CONFIG.items():
+                data = synthetic.payload(function, size=size, seed=seed, interval=config.get('interval'))
+                results[function] = {
+                    **time_call(lambda: pav.store_indicator_data(
+                        data, config['model_class'], value_transform_func=config['value_transform_func']
+                    ), repeat=repeat),
+                    'points': len(data['data']),
+                }
+
+            def fetch(function, stock_symbol=None, api_key=None, **params):
+                return synthetic.payload(function, stock_symbol, size=size, seed=seed, **params)
+
+            def fetch_csv(function, api_key=None, horizon='3month', **params):
+                return synthetic.earnings_calendar(horizon, seed=seed)
+
+            with mock.patch.object(pav, 'fetch_data', fetch), mock.patch.object(pav, 'fetch_csv_data', fetch_csv):
+                for function, sync in MARKET_SYNC_FUNCTIONS.items():
+                    sync = functools.partial(sync, api_key='synthetic')
+                    results[function] = {
+                        'insert': time_call(sync, repeat=1),
+                        'resync': time_call(sync, repeat=repeat),
+                    }
+        finally:
+            transaction.set_rollback(True)
+    return results
+
+
+def bench_converters(repeat: int = 3, calls: int = 100_000, **kwargs) -> Dict[str, dict]:
+    """
+    Times the safe_* converters over a mix of valid, empty and malformed inputs.
+    """
+    results = {}
+    for name, inputs in CONVERTER_INPUTS.items():
+        converter = getattr(pav, name)
+        values = [inputs[number % len(inputs)] for number in range(calls)]
+        # Malformed inputs are logged, which would dominate the timing
+        logging.disable(logging.ERROR)
+        try:
+            timings = time_call(lambda: [converter(value) for value in values], repeat=repeat)
+        finally:
+            logging.disable(logging.NOTSET)
+        results[name] = {
+            **timings,
+            'ns_per_call': 1e9 * timings['best_seconds'] / calls,
+        }
+    return results
+
+
+def bench_views(
+    repeat: int = 3, size: str = synthetic.DEFAULT_SIZE, seed: int = 0, symbols: int = 5, **kwargs
+) -> Dict[str, dict]:
+    """
+    Times each view's queries and serialization on synthetic stocks, without caching.
+
+    `query_seconds` is the part of a request spent in database queries; the rest of
+    `best_seconds` is mostly spent building and serializing the response.
+    """
+    client = Client()
+    results = {}
+    with synthetic_dataset(symbols, size, seed) as names:
+        for template in VIEW_PATHS:
+            path = template.format(symbol=names[0], symbols=','.join(names))
+            client.get(path)
+            with metrics.capture() as captured:
+                timings = time_call(lambda: client.get(path), repeat=repeat)
+            best = min(captured, key=lambda stats: stats.seconds)
+            results[template] = {
+                **timings,
+                'status': best.status,
+                'queries': best.queries,
+                'query_seconds': best.query_seconds,
+                'response_bytes': best.response_bytes,
+            }
+    return results
+
+
+BENCHMARKS = {
+    'price_store': bench_price_store,
+    'correlation': bench_correlation,
+    'optimize': bench_optimize,
+    'connections': bench_connections,
+    'sync': bench_sync,
+    'converters': bench_converters,
+    'views': bench_views,
+}
+
+
+def current_commit() -> Optional[str]:
+    """
+    The git commit of the working tree, if it is a git checkout.
+    """
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(names: List[str], repeat: int = 3, **kwargs) -> Dict:
+    """
+    Runs benchmarks and returns their results with what they ran on, ready to be stored
+    as JSON and compared with another commit's.
+
+    Args:
+        names (List[str]): The benchmarks to run, from BENCHMARKS.
+        repeat (int): The number of timed runs per measurement.
+        **kwargs: Options passed on to every benchmark (e.g. size and seed).
+
+    Returns:
+        Dict: The run's metadata and the results by benchmark name.
+    """
+    return {
+        'commit': current_commit(),
+        'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'database': connection.vendor,
+        'repeat': repeat,
+        'options': kwargs,
+        'results': {name: BENCHMARKS[name](repeat=repeat, **kwargs) for name in names},
+    }
+
+
+def compare_results(baseline: Dict, current: Dict, key: str = 'best_seconds') -> List[Dict]:
+    """
+    Pairs up the timings of two benchmark runs.
+
+    Args:
+        baseline (Dict): The results of run_benchmarks() to compare against.
+        current (Dict): The results of run_benchmarks() to compare.
+        key (str): The timing compared.
+
+    Returns:
+        List[Dict]: The path of each timing in both runs, with its value in each and the
+            ratio of the current to the baseline value.
+    """
+    def timings(results: Dict, prefix: str = '') -> Dict[str, float]:
+        found = {}
+        for name, value in results.items():
+            if isinstance(value, dict):
+                found.update(timings(value, f'{prefix}{name}/'))
+            elif name == key:
+                found[prefix.rstrip('/')] = value
+        return found
+
+    before, after = timings(baseline['results']), timings(current['results'])
+    return [
+        {
+            'path': path,
+            'baseline': before[path],
+            'current': after[path],
+            'ratio': after[path] / before[path] if before[path] else None,
+        }
+        for path in before if path in after
+    ]
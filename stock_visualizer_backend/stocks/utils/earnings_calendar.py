@@ -0,0 +1,134 @@
+import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.db.models import Q
+from django.utils.dateparse import parse_date
+
+from stocks.models import EarningsCalendarData, StockOverviewFields
+
+# Latest overview metrics returned with each upcoming report by default
+DEFAULT_CALENDAR_FIELDS = [
+    'market_capitalization',
+    'pe_ratio',
+    'forward_pe',
+    'eps',
+    'quarterly_earnings_growth_yoy',
+    'analyst_target_price',
+]
+
+DEFAULT_CALENDAR_LIMIT = 100
+MAX_CALENDAR_LIMIT = 1000
+
+
+def encode_cursor(report_date: datetime.date, symbol: str, row_id: int) -> str:
+    """
+    The pagination cursor of a calendar row: its position in (report_date, symbol, id) order.
+
+    A stock can have several reports on one date (one per fiscal period), so the row id
+    breaks the tie and makes the order total.
+    """
+    return f"{report_date.isoformat()}:{symbol}:{row_id}"
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime.date, str, int]:
+    """
+    Parses a cursor produced by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    date_text, _, rest = cursor.partition(':')
+    symbol, _, id_text = rest.rpartition(':')
+    report_date = parse_date(date_text) if symbol and id_text.isdigit() else None
+    if report_date is None:
+        raise ValueError(f"Invalid cursor: {cursor}.")
+    return report_date, symbol, int(id_text)
+
+
+def upcoming_earnings(
+    start: Optional[datetime.date] = None,
+    end: Optional[datetime.date] = None,
+    sp500_only: bool = False,
+    fields: Optional[Iterable[str]] = None,
+    limit: int = DEFAULT_CALENDAR_LIMIT,
+    cursor: Optional[str] = None,
+) -> Dict[str, object]:
+    """
+    Lists the scheduled earnings reports of every stock in a date range.
+
+    Runs as a single query: the calendar is scanned in (report_date, symbol, id) order through
+    its report_date index and joined to each stock and its LatestStockOverview snapshot.
+    Pages are keyset paginated, so a page costs the same however deep it is.
+
+    Args:
+        start (Optional[datetime.date]): First report date (default: today).
+        end (Optional[datetime.date]): Last report date (default: unbounded).
+        sp500_only (bool): Whether to only list S&P 500 members.
+        fields (Optional[Iterable[str]]): The overview metrics to return (default:
+            DEFAULT_CALENDAR_FIELDS).
+        limit (int): The page size, at most MAX_CALENDAR_LIMIT.
+        cursor (Optional[str]): The 'next_cursor' of the previous page.
+
+    Returns:
+        Dict[str, object]: The 'results' of this page, one dictionary per report with its
+        symbol, name, sector, dates, EPS estimate and the requested metrics, and the
+        'next_cursor' (None on the last page).
+
+    Raises:
+        ValueError: If a field, the limit or the cursor is invalid.
+    """
+    if not 1 <= limit <= MAX_CALENDAR_LIMIT:
+        raise ValueError(f"Invalid limit: {limit}. Must be between 1 and {MAX_CALENDAR_LIMIT}.")
+    fields = DEFAULT_CALENDAR_FIELDS if fields is None else list(fields)
+    for name in fields:
+        if name not in StockOverviewFields.metric_field_names():
+            raise ValueError(f"Unknown overview field: {name}.")
+
+    queryset = EarningsCalendarData.objects.filter(
+        stock__isnull=False,
+        report_date__gte=start or datetime.date.today(),
+    )
+    if end:
+        queryset = queryset.filter(report_date__lte=end)
+    if sp500_only:
+        queryset = queryset.filter(stock__is_sp500=True)
+    if cursor:
+        report_date, symbol, row_id = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(report_date__gt=report_date)
+            | Q(report_date=report_date, stock_id__gt=symbol)
+            | Q(report_date=report_date, stock_id=symbol, id__gt=row_id)
+        )
+
+    rows = list(
+        queryset
+        .order_by('report_date', 'stock_id', 'id')
+        .values(
+            'id',
+            'stock_id',
+            'stock__name',
+            'stock__sector',
+            'report_date',
+            'fiscal_date_ending',
+            'estimate',
+            *[f'stock__latest_overview__{name}' for name in fields],
+        )[:limit + 1]
+    )
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]['report_date'], rows[-1]['stock_id'], rows[-1]['id'])
+
+    results = []
+    for row in rows:
+        del row['id']
+        result = {
+            'symbol': row.pop('stock_id'),
+            'name': row.pop('stock__name'),
+            'sector': row.pop('stock__sector'),
+        }
+        result.update(
+            (key.replace('stock__latest_overview__', ''), value) for key, value in row.items()
+        )
+        results.append(result)
+    return {'results': results, 'next_cursor': next_cursor}
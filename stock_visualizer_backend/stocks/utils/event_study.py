@@ -0,0 +1,270 @@
+import logging
+import re
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from django.core.cache import cache
+from django.db import transaction
+
+from stocks.models import BaseStockData, EarningsData, EarningsEventData
+from stocks.utils import metrics, returns, versions
+
+logger = logging.getLogger(__name__)
+
+# Windows of trading days relative to the first trading day on or after the report date.
+# (-1, 1) captures the announcement reaction and (2, 60) the post-earnings drift.
+DEFAULT_EVENT_WINDOWS: List[Tuple[int, int]] = [(-1, 1), (0, 1), (2, 20), (2, 60)]
+
+# Events whose first trading day on or after the report date is further away than this
+# (e.g. reported before the price history starts) are skipped
+MAX_EVENT_LAG_DAYS = 5
+
+WINDOW_PATTERN = re.compile(r'^\s*(-?\d+)\s*:\s*(-?\d+)\s*$')
+
+# SyncVersion key bumped after each event study run
+EVENTS_KEY = 'earnings_events'
+
+EVENT_STATS_CACHE_SECONDS = 24 * 60 * 60
+
+
+def parse_window(text: str) -> Tuple[int, int]:
+    """
+    Parses a window like '-1:1' or '2:60' into (start, end) trading day offsets.
+
+    Raises:
+        ValueError: If the text is not two integers separated by ':' with start <= end.
+    """
+    match = WINDOW_PATTERN.match(text)
+    if not match or int(match.group(1)) > int(match.group(2)):
+        raise ValueError(f"Invalid window: {text}. Expected start:end, e.g. -1:1.")
+    return int(match.group(1)), int(match.group(2))
+
+
+def market_returns(log_returns: pd.DataFrame, members: Iterable[str]) -> pd.Series:
+    """
+    The market proxy: the equal-weighted mean daily log return of the given members.
+    """
+    members = [symbol for symbol in members if symbol in log_returns.columns]
+    return log_returns[members or list(log_returns.columns)].mean(axis=1)
+
+
+def compute_event_returns(
+    log_returns: pd.DataFrame,
+    market: pd.Series,
+    events: pd.DataFrame,
+    windows: Iterable[Tuple[int, int]] = DEFAULT_EVENT_WINDOWS,
+) -> pd.DataFrame:
+    """
+    Computes market-adjusted cumulative abnormal returns for every event and window.
+
+    Cumulative sums of the stock, market and abnormal returns are taken once over the
+    whole date x symbol matrix, so each window of each event is the difference of two
+    cumulative sums, gathered for all events with one fancy-indexing step.
+
+    Args:
+        log_returns (pd.DataFrame): Date x symbol daily log returns (NaN if missing).
+        market (pd.Series): Daily market log returns on the same dates.
+        events (pd.DataFrame): One row per event with 'symbol' and 'reported_date'
+            columns; other columns are carried through.
+        windows (Iterable[Tuple[int, int]]): Inclusive (start, end) trading day offsets.
+
+    Returns:
+        pd.DataFrame: One row per event and window with 'event_date', 'window_start',
+        'window_end', 'stock_return', 'market_return' and 'abnormal_return'. Windows
+        that leave the data or miss a stock return, and events without a trading day
+        within MAX_EVENT_LAG_DAYS of the report, are dropped.
+    """
+    dates = np.array(log_returns.index, dtype='datetime64[D]')
+    stock = log_returns.to_numpy(dtype=float)
+    observed = ~np.isnan(stock)
+    market_values = market.to_numpy(dtype=float)[:, None]
+
+    def cumulative(values: np.ndarray) -> np.ndarray:
+        return np.vstack([np.zeros((1, values.shape[1])), np.cumsum(values, axis=0)])
+
+    stock_sums = cumulative(np.where(observed, stock, 0.0))
+    market_sums = cumulative(np.nan_to_num(market_values, nan=0.0))
+    counts = cumulative(observed.astype(float))
+
+    columns = {symbol: position for position, symbol in enumerate(log_returns.columns)}
+    events = events[events['symbol'].isin(columns)].reset_index(drop=True)
+    column = events['symbol'].map(columns).to_numpy(dtype=int)
+    reported = np.array(events['reported_date'], dtype='datetime64[D]')
+    day = np.searchsorted(dates, reported)
+    event_dates = dates[np.minimum(day, len(dates) - 1)] if len(dates) else reported
+    on_time = (day < len(dates)) & (event_dates - reported <= np.timedelta64(MAX_EVENT_LAG_DAYS, 'D'))
+
+    frames = []
+    for start, end in windows:
+        low, high = day + start, day + end + 1
+        valid = on_time & (low >= 0) & (high <= len(dates))
+        low, high, columns_valid = low[valid], high[valid], column[valid]
+        complete = counts[high, columns_valid] - counts[low, columns_valid] == end - start + 1
+
+        stock_return = stock_sums[high, columns_valid] - stock_sums[low, columns_valid]
+        market_return = market_sums[high, 0] - market_sums[low, 0]
+        frame = events[valid].assign(
+            event_date=log_returns.index[day[valid]],
+            window_start=start,
+            window_end=end,
+            stock_return=stock_return,
+            market_return=market_return,
+            abnormal_return=stock_return - market_return,
+        )
+        frames.append(frame[complete])
+    if not frames:
+        return events.iloc[:0]
+    return pd.concat(frames, ignore_index=True)
+
+
+def first_reports(events: pd.DataFrame) -> pd.DataFrame:
+    """
+    Keeps the earliest report of each symbol and fiscal quarter.
+
+    EarningsData can hold several reports of one quarter (e.g. a later restatement),
+    but the market reacts to the first announcement, and each quarter is one event.
+
+    Args:
+        events (pd.DataFrame): Rows with 'symbol', 'fiscal_date_ending' and
+            'reported_date' columns.
+
+    Returns:
+        pd.DataFrame: The events with one row per symbol and fiscal quarter.
+    """
+    return (
+        events.sort_values('reported_date', kind='stable')
+        .drop_duplicates(['symbol', 'fiscal_date_ending'])
+        .reset_index(drop=True)
+    )
+
+
+def run_event_study(windows: Iterable[Tuple[int, int]] = DEFAULT_EVENT_WINDOWS) -> int:
+    """
+    Runs the earnings event study over every quarterly earnings report and replaces the
+    stored EarningsEventData rows.
+
+    The daily returns of all symbols and all events are loaded with one query each, and
+    the market proxy is the equal-weighted S&P 500 return (every stock if there are no
+    members). A quarter reported more than once counts as one event (see first_reports).
+
+    Args:
+        windows (Iterable[Tuple[int, int]]): Inclusive (start, end) trading day offsets.
+
+    Returns:
+        int: The number of event windows stored.
+    """
+    windows = list(windows)
+    events = pd.DataFrame.from_records(
+        list(
+            EarningsData.objects
+            .filter(report_type='quarterly', reported_date__isnull=False)
+            .values_list('stock_id', 'fiscal_date_ending', 'reported_date', 'surprise_percentage')
+        ),
+        columns=['symbol', 'fiscal_date_ending', 'reported_date', 'surprise_percentage'],
+    )
+    events['surprise_percentage'] = events['surprise_percentage'].astype(float)
+    events = first_reports(events)
+
+    symbols = sorted(events['symbol'].unique())
+    members = BaseStockData.objects.filter(is_sp500=True).values_list('symbol', flat=True)
+    log_returns = returns.load_return_matrix(sorted(set(symbols) | set(members)))
+    results = compute_event_returns(log_returns, market_returns(log_returns, members), events, windows)
+    results = results.astype(object).where(results.notna(), None)
+
+    with transaction.atomic():
+        EarningsEventData.objects.all().delete()
+        EarningsEventData.objects.bulk_create(
+            [
+                EarningsEventData(
+                    stock_id=row['symbol'],
+                    fiscal_date_ending=row['fiscal_date_ending'],
+                    reported_date=row['reported_date'],
+                    event_date=row['event_date'],
+                    surprise_percentage=row['surprise_percentage'],
+                    window_start=row['window_start'],
+                    window_end=row['window_end'],
+                    stock_return=row['stock_return'],
+                    market_return=row['market_return'],
+                    abnormal_return=row['abnormal_return'],
+                )
+                for row in results.to_dict(orient='records')
+            ],
+            batch_size=5000,
+        )
+    versions.bump_version(EVENTS_KEY)
+    logger.info(f"Stored {len(results)} earnings event windows for {len(symbols)} symbols")
+    return len(results)
+
+
+def summarize_events(events: pd.DataFrame) -> List[dict]:
+    """
+    Aggregates cumulative abnormal returns per window.
+
+    Args:
+        events (pd.DataFrame): Rows with 'window_start', 'window_end',
+            'abnormal_return' and 'surprise_percentage'.
+
+    Returns:
+        List[dict]: Per window the number of events, mean and median abnormal return,
+        its t-statistic, the share of positive abnormal returns, and the mean abnormal
+        return after positive and negative surprises (the drift spread is their
+        difference).
+    """
+    if events.empty:
+        return []
+    events = events.assign(
+        beat=events['abnormal_return'].where(events['surprise_percentage'] > 0),
+        miss=events['abnormal_return'].where(events['surprise_percentage'] < 0),
+        positive=(events['abnormal_return'] > 0).astype(float),
+    )
+    grouped = events.groupby(['window_start', 'window_end'])
+    stats = pd.DataFrame({
+        'events': grouped.size(),
+        'mean_abnormal_return': grouped['abnormal_return'].mean(),
+        'median_abnormal_return': grouped['abnormal_return'].median(),
+        'std_abnormal_return': grouped['abnormal_return'].std(),
+        'positive_rate': grouped['positive'].mean(),
+        'beat_mean_abnormal_return': grouped['beat'].mean(),
+        'miss_mean_abnormal_return': grouped['miss'].mean(),
+    })
+    stats['t_stat'] = stats['mean_abnormal_return'] / (stats['std_abnormal_return'] / np.sqrt(stats['events']))
+    stats['drift_spread'] = stats['beat_mean_abnormal_return'] - stats['miss_mean_abnormal_return']
+    stats = stats.replace([np.inf, -np.inf], np.nan).reset_index()
+    return stats.astype(object).where(stats.notna(), None).to_dict(orient='records')
+
+
+def load_events(symbol: Optional[str] = None) -> pd.DataFrame:
+    """
+    Loads stored event windows, for one symbol or the whole universe, in one query.
+    """
+    fields = [
+        'stock_id',
+        'fiscal_date_ending',
+        'reported_date',
+        'event_date',
+        'surprise_percentage',
+        'window_start',
+        'window_end',
+        'stock_return',
+        'market_return',
+        'abnormal_return',
+    ]
+    queryset = EarningsEventData.objects.all()
+    if symbol:
+        queryset = queryset.filter(stock_id=symbol)
+    rows = queryset.order_by('reported_date', 'window_start', 'window_end').values_list(*fields)
+    return pd.DataFrame.from_records(list(rows), columns=fields).rename(columns={'stock_id': 'symbol'})
+
+
+def get_universe_statistics() -> List[dict]:
+    """
+    Returns summarize_events over every stored event, computed at most once per run of
+    the event study.
+    """
+    cache_key = f"earnings_events:{versions.get_version(EVENTS_KEY)}"
+    stats = metrics.cache_lookup('earnings_events', cache_key)
+    if stats is None:
+        stats = summarize_events(load_events())
+        cache.set(cache_key, stats, EVENT_STATS_CACHE_SECONDS)
+    return stats
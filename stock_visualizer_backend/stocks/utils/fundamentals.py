@@ -0,0 +1,184 @@
+import logging
+from typing import Dict, Iterable, List, Type
+
+import numpy as np
+import pandas as pd
+from django.db import models, transaction
+from django.db.models import Model
+
+from stocks.models import (
+    BalanceSheetData,
+    BaseStockData,
+    CashFlowData,
+    FundamentalMetricsData,
+    IncomeStatementData,
+)
+
+logger = logging.getLogger(__name__)
+
+# Quarterly statement fields that feed the derived metrics
+STATEMENT_FIELDS: Dict[Type[Model], List[str]] = {
+    IncomeStatementData: ['total_revenue', 'gross_profit', 'operating_income', 'ebitda', 'net_income'],
+    CashFlowData: ['operating_cashflow', 'capital_expenditures'],
+    BalanceSheetData: [
+        'total_assets',
+        'total_current_assets',
+        'total_liabilities',
+        'total_current_liabilities',
+        'short_long_term_debt_total',
+        'total_shareholder_equity',
+    ],
+}
+
+# Flow fields summed over the trailing four quarters, mapped to their TTM column
+TTM_FIELDS = {
+    'total_revenue': 'revenue_ttm',
+    'gross_profit': 'gross_profit_ttm',
+    'operating_income': 'operating_income_ttm',
+    'ebitda': 'ebitda_ttm',
+    'net_income': 'net_income_ttm',
+    'operating_cashflow': 'operating_cashflow_ttm',
+    'capital_expenditures': 'capital_expenditures_ttm',
+}
+
+# Four consecutive fiscal quarters end within about 9 months of each other. Windows that
+# span more than this have a missing quarter and get no TTM value.
+MAX_TTM_SPAN_DAYS = 300
+
+
+def _load_statements(stock: BaseStockData) -> Dict[Type[Model], pd.DataFrame]:
+    """
+    Loads the quarterly statement fields of a stock, one date indexed frame per statement.
+    """
+    statements = {}
+    for model_class, fields in STATEMENT_FIELDS.items():
+        rows = (
+            model_class.objects
+            .filter(stock=stock, report_type='quarterly')
+            .values_list('date', *fields)
+        )
+        frame = pd.DataFrame.from_records(list(rows), columns=['date', *fields])
+        statements[model_class] = frame.set_index('date').astype(float).sort_index()
+    return statements
+
+
+def _ratio(numerator: pd.Series, denominator: pd.Series) -> pd.Series:
+    """
+    Divides two series, leaving NaN wherever the denominator is zero or missing.
+    """
+    return numerator / denominator.where(denominator != 0)
+
+
+def trailing_sum(values: pd.DataFrame) -> pd.DataFrame:
+    """
+    Sums quarterly values over the trailing four quarters.
+
+    The frame must hold the quarters of a single statement, so that four rows are four
+    of its own reports. Windows spanning more than MAX_TTM_SPAN_DAYS are missing a
+    quarter and get no value.
+
+    Args:
+        values (pd.DataFrame): Quarterly values indexed by fiscal date, sorted.
+
+    Returns:
+        pd.DataFrame: The trailing sums, NaN for incomplete windows.
+    """
+    dates = pd.Series(pd.to_datetime(values.index), index=values.index)
+    complete = (dates - dates.shift(3)).dt.days <= MAX_TTM_SPAN_DAYS
+    return values.rolling(4, min_periods=4).sum().where(complete, axis=0)
+
+
+def compute_fundamental_metrics(statements: Dict[Type[Model], pd.DataFrame]) -> pd.DataFrame:
+    """
+    Computes TTM sums and cross-statement ratios from quarterly statements.
+
+    All quarters of a stock are processed at once: the TTM values are a rolling
+    four-quarter sum over each statement's own reports, and the ratios are element-wise
+    operations over the statements joined on their fiscal dates.
+
+    Args:
+        statements (Dict[Type[Model], pd.DataFrame]): Per statement model, its date
+            indexed quarterly values with one column per field in STATEMENT_FIELDS.
+
+    Returns:
+        pd.DataFrame: Date indexed metrics, one column per FundamentalMetricsData field.
+    """
+    ttm = pd.concat(
+        [
+            trailing_sum(frame[[field for field in frame.columns if field in TTM_FIELDS]])
+            for frame in statements.values()
+        ],
+        axis=1,
+        join='outer',
+    )
+    joined = pd.concat(list(statements.values()), axis=1, join='outer').sort_index()
+    ttm = ttm.reindex(joined.index)
+
+    metrics = pd.DataFrame(index=joined.index)
+    for field, ttm_field in TTM_FIELDS.items():
+        metrics[ttm_field] = ttm[field]
+
+    metrics['free_cash_flow_ttm'] = metrics['operating_cashflow_ttm'] - metrics['capital_expenditures_ttm']
+
+    metrics['gross_margin_ttm'] = _ratio(metrics['gross_profit_ttm'], metrics['revenue_ttm'])
+    metrics['operating_margin_ttm'] = _ratio(metrics['operating_income_ttm'], metrics['revenue_ttm'])
+    metrics['net_margin_ttm'] = _ratio(metrics['net_income_ttm'], metrics['revenue_ttm'])
+    metrics['free_cash_flow_margin_ttm'] = _ratio(metrics['free_cash_flow_ttm'], metrics['revenue_ttm'])
+    metrics['return_on_equity_ttm'] = _ratio(metrics['net_income_ttm'], joined['total_shareholder_equity'])
+    metrics['return_on_assets_ttm'] = _ratio(metrics['net_income_ttm'], joined['total_assets'])
+    metrics['debt_to_equity'] = _ratio(
+        joined['short_long_term_debt_total'], joined['total_shareholder_equity']
+    )
+    metrics['liabilities_to_assets'] = _ratio(joined['total_liabilities'], joined['total_assets'])
+    metrics['current_ratio'] = _ratio(
+        joined['total_current_assets'], joined['total_current_liabilities']
+    )
+    return metrics.replace([np.inf, -np.inf], np.nan)
+
+
+def update_fundamental_metrics(stock: BaseStockData) -> int:
+    """
+    Recomputes and stores the derived fundamental metrics of a stock.
+
+    Args:
+        stock (BaseStockData): The stock whose statements were synced.
+
+    Returns:
+        int: The number of metric rows written.
+    """
+    metrics = compute_fundamental_metrics(_load_statements(stock))
+    integer_fields = {
+        field.name for field in FundamentalMetricsData._meta.get_fields()
+        if isinstance(field, models.BigIntegerField)
+    }
+    records = metrics.astype(object).where(metrics.notna(), None).to_dict(orient='index')
+
+    with transaction.atomic():
+        FundamentalMetricsData.objects.filter(stock=stock).delete()
+        FundamentalMetricsData.objects.bulk_create(
+            [
+                FundamentalMetricsData(
+                    stock=stock,
+                    date=date,
+                    **{
+                        name: round(value) if value is not None and name in integer_fields else value
+                        for name, value in values.items()
+                    },
+                )
+                for date, values in records.items()
+            ],
+            batch_size=1000,
+        )
+    return len(records)
+
+
+def rebuild_fundamental_metrics(stocks: Iterable[BaseStockData]) -> None:
+    """
+    Recomputes the derived fundamental metrics of every given stock.
+
+    Args:
+        stocks (Iterable[BaseStockData]): The stocks to rebuild.
+    """
+    for stock in stocks:
+        count = update_fundamental_metrics(stock)
+        logger.info(f"Computed {count} quarters of fundamental metrics for {stock.symbol}")
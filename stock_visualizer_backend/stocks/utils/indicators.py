@@ -0,0 +1,236 @@
+from typing import Callable, Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+from django.core.cache import cache
+
+from stocks.utils import metrics, price_matrix, versions
+
+# Trading days per year, used to annualize volatility
+TRADING_DAYS_PER_YEAR = 252
+
+# How long computed indicators stay cached. Entries are keyed by the price sync version,
+# so a sync invalidates them immediately and this only bounds the cache size.
+INDICATOR_CACHE_SECONDS = 24 * 60 * 60
+
+
+def rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Computes a trailing rolling sum in O(n) from a single cumulative sum.
+
+    Missing (NaN or infinite) values are summed as 0 and counted separately, so they only
+    blank the windows that contain them rather than every later window, like
+    pandas.Series.rolling(window).sum().
+
+    Args:
+        values (np.ndarray): The input series.
+        window (int): The number of observations per window.
+
+    Returns:
+        np.ndarray: The rolling sums, NaN until the first full window and for windows
+        with a missing value.
+    """
+    values = np.asarray(values, dtype=float)
+    result = np.full(len(values), np.nan)
+    if window <= len(values):
+        missing = ~np.isfinite(values)
+        cumulative = np.concatenate([[0.0], np.cumsum(np.where(missing, 0.0, values))])
+        gaps = np.concatenate([[0], np.cumsum(missing)])
+        sums = cumulative[window:] - cumulative[:-window]
+        result[window - 1:] = np.where(gaps[window:] - gaps[:-window] > 0, np.nan, sums)
+    return result
+
+
+def sma(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Simple moving average.
+    """
+    return rolling_sum(values, window) / window
+
+
+def rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Rolling sample standard deviation in O(n) from cumulative sums of x and x^2.
+
+    The series is centred on its overall mean first, which keeps the difference of the
+    two sums well conditioned for price-like data.
+    """
+    values = np.asarray(values, dtype=float)
+    values = np.where(np.isfinite(values), values, np.nan)
+    centred = values - np.nanmean(values) if np.isfinite(values).any() else values
+    sums = rolling_sum(centred, window)
+    squares = rolling_sum(centred ** 2, window)
+    variance = (squares - sums ** 2 / window) / (window - 1)
+    return np.sqrt(np.clip(variance, 0.0, None))
+
+
+def ema(values: np.ndarray, span: int) -> np.ndarray:
+    """
+    Exponential moving average with smoothing factor 2 / (span + 1).
+    """
+    return pd.Series(values, dtype=float).ewm(span=span, adjust=False).mean().to_numpy(copy=True)
+
+
+def wilder_average(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Wilder's smoothed moving average (an EMA with smoothing factor 1 / window), as used by
+    RSI and ATR.
+    """
+    return pd.Series(values, dtype=float).ewm(alpha=1 / window, adjust=False).mean().to_numpy(copy=True)
+
+
+def rsi(close: np.ndarray, window: int = 14) -> np.ndarray:
+    """
+    Relative strength index on a 0-100 scale.
+    """
+    change = np.diff(np.asarray(close, dtype=float), prepend=np.nan)
+    # Missing changes stay NaN, which the Wilder average skips
+    gain = wilder_average(np.clip(change, 0.0, None)[1:], window)
+    loss = wilder_average(np.clip(-change, 0.0, None)[1:], window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        strength = 100 - 100 / (1 + gain / loss)
+    strength[: window - 1] = np.nan
+    return np.concatenate([[np.nan], strength])
+
+
+def macd(close: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9) -> Dict[str, np.ndarray]:
+    """
+    Moving average convergence divergence: the MACD line, its signal line and the
+    histogram (their difference).
+    """
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(line, signal)
+    return {'macd': line, 'macd_signal': signal_line, 'macd_hist': line - signal_line}
+
+
+def bollinger(close: np.ndarray, window: int = 20, num_std: float = 2.0) -> Dict[str, np.ndarray]:
+    """
+    Bollinger bands: the simple moving average plus and minus num_std rolling standard
+    deviations.
+    """
+    middle = sma(close, window)
+    width = num_std * rolling_std(close, window)
+    return {
+        'bollinger_upper': middle + width,
+        'bollinger_middle': middle,
+        'bollinger_lower': middle - width,
+    }
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int = 14) -> np.ndarray:
+    """
+    Average true range, using Wilder's smoothing of the true range.
+    """
+    previous_close = np.concatenate([[np.nan], close[:-1]])
+    true_range = np.fmax(
+        high - low,
+        np.fmax(np.abs(high - previous_close), np.abs(low - previous_close)),
+    )
+    result = wilder_average(true_range, window)
+    result[: window - 1] = np.nan
+    return result
+
+
+def volatility(close: np.ndarray, window: int = 20) -> np.ndarray:
+    """
+    Annualized rolling volatility of daily log returns.
+    """
+    close = np.asarray(close, dtype=float)
+    # Non-positive closes cannot be logged and are treated as missing
+    log_returns = np.diff(np.log(np.where(close > 0, close, np.nan)), prepend=np.nan)
+    result = np.full(len(close), np.nan)
+    result[1:] = rolling_std(log_returns[1:], window) * np.sqrt(TRADING_DAYS_PER_YEAR)
+    return result
+
+
+def _adjusted_bars(bars: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    Scales high and low by adj_close / close so that range based indicators line up with
+    the dividend and split adjusted closes.
+    """
+    close = bars['adj_close'].to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        factor = close / bars['close'].to_numpy()
+    return {
+        'close': close,
+        'high': bars['high'].to_numpy() * factor,
+        'low': bars['low'].to_numpy() * factor,
+    }
+
+
+# Each indicator takes the adjusted bars and a window (None for the default) and returns
+# its output series keyed by column name.
+INDICATORS: Dict[str, Callable[[Dict[str, np.ndarray], Optional[int]], Dict[str, np.ndarray]]] = {
+    'sma': lambda bars, window: {'sma': sma(bars['close'], window or 20)},
+    'ema': lambda bars, window: {'ema': ema(bars['close'], window or 20)},
+    'rsi': lambda bars, window: {'rsi': rsi(bars['close'], window or 14)},
+    'macd': lambda bars, window: macd(bars['close']),
+    'bollinger': lambda bars, window: bollinger(bars['close'], window or 20),
+    'atr': lambda bars, window: {'atr': atr(bars['high'], bars['low'], bars['close'], window or 14)},
+    'volatility': lambda bars, window: {'volatility': volatility(bars['close'], window or 20)},
+}
+
+
+def compute_indicators(
+    bars: pd.DataFrame,
+    names: Iterable[str],
+    window: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Computes the requested indicators over a date indexed frame of price bars.
+
+    Args:
+        bars (pd.DataFrame): Float columns 'high', 'low', 'close' and 'adj_close'.
+        names (Iterable[str]): Indicator names, keys of INDICATORS.
+        window (Optional[int]): Window length for the windowed indicators (each indicator
+            has its own default). MACD always uses 12/26/9.
+
+    Returns:
+        pd.DataFrame: One column per indicator output, indexed like the bars.
+
+    Raises:
+        ValueError: If an indicator name is unknown.
+    """
+    unknown = [name for name in names if name not in INDICATORS]
+    if unknown:
+        raise ValueError(f"Unknown indicators: {', '.join(unknown)}. Must be among {', '.join(INDICATORS)}.")
+
+    adjusted = _adjusted_bars(bars)
+    columns = {}
+    for name in names:
+        columns.update(INDICATORS[name](adjusted, window))
+    return pd.DataFrame(columns, index=bars.index)
+
+
+def get_indicators(
+    symbol: str,
+    names: Iterable[str],
+    window: Optional[int] = None,
+    interval: str = 'daily',
+) -> pd.DataFrame:
+    """
+    Returns the requested indicators for a symbol, computing them at most once per
+    price sync.
+
+    Results are cached under the symbol's price SyncVersion, so a sync that changes the
+    bars makes later requests recompute them.
+
+    Args:
+        symbol (str): The stock symbol.
+        names (Iterable[str]): Indicator names, keys of INDICATORS.
+        window (Optional[int]): Window length for the windowed indicators.
+        interval (str): The bar interval ('daily', 'weekly' or 'monthly').
+
+    Returns:
+        pd.DataFrame: One column per indicator output, indexed by date.
+    """
+    names = list(dict.fromkeys(names))
+    version = versions.get_version(versions.prices_key(symbol))
+    cache_key = f"indicators:{symbol}:{interval}:{version}:{','.join(names)}:{window}"
+
+    result = metrics.cache_lookup('indicators', cache_key)
+    if result is None:
+        bars = price_matrix.load_price_series(symbol, ['high', 'low', 'close', 'adj_close'], interval)
+        result = compute_indicators(bars, names, window)
+        cache.set(cache_key, result, INDICATOR_CACHE_SECONDS)
+    return result
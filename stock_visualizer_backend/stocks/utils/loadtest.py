@@ -0,0 +1,196 @@
+import asyncio
+import io
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence
+from urllib.parse import urlsplit
+from wsgiref.util import setup_testing_defaults
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+
+TARGETS = ('wsgi', 'asgi')
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, float]:
+    """
+    Latency percentiles (in milliseconds) and throughput of a load test run.
+    """
+    if not latencies:
+        return {'requests': 0, 'errors': errors}
+    ordered = sorted(latencies)
+
+    def percentile(fraction: float) -> float:
+        return 1000 * ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'p50_ms': percentile(0.50),
+        'p90_ms': percentile(0.90),
+        'p99_ms': percentile(0.99),
+        'mean_ms': 1000 * statistics.mean(latencies),
+        'throughput_rps': len(latencies) / elapsed,
+    }
+
+
+def _run_threads(request: Callable[[str], bool], paths: Sequence[str], clients: int, requests: int) -> Dict:
+    """
+    Issues `requests` requests from `clients` threads, cycling through the paths.
+    """
+    latencies, errors = [], 0
+    counter = iter(range(requests))
+    lock = threading.Lock()
+
+    def client():
+        nonlocal errors
+        while True:
+            with lock:
+                number = next(counter, None)
+            if number is None:
+                return
+            start = time.perf_counter()
+            ok = request(paths[number % len(paths)])
+            latency = time.perf_counter() - start
+            with lock:
+                latencies.append(latency)
+                errors += not ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        for _ in range(clients):
+            pool.submit(client)
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+
+def wsgi_get(handler: WSGIHandler, path: str) -> bool:
+    """
+    Serves a GET request through a WSGI handler the way a WSGI server does, including
+    closing the response (which fires request_finished and so closes or keeps the
+    database connection per CONN_MAX_AGE). Returns whether the status was 2xx.
+    """
+    url = urlsplit(path)
+    environ = {'PATH_INFO': url.path, 'QUERY_STRING': url.query, 'wsgi.input': io.BytesIO()}
+    setup_testing_defaults(environ)
+    status = []
+    body = handler(environ, lambda code, headers, exc_info=None: status.append(code))
+    for _ in body:
+        pass
+    body.close()
+    return status[0].startswith('2')
+
+
+def run_wsgi(paths: Sequence[str], clients: int, requests: int) -> Dict:
+    """
+    Load tests the WSGI application in-process, one thread per concurrent client, like a
+    threaded WSGI server (e.g. gunicorn --threads).
+    """
+    handler = WSGIHandler()
+    return _run_threads(lambda path: wsgi_get(handler, path), paths, clients, requests)
+
+
+def run_asgi(paths: Sequence[str], clients: int, requests: int) -> Dict:
+    """
+    Load tests the ASGI application in-process, one task per concurrent client on a single
+    event loop, like a single ASGI server worker (e.g. uvicorn).
+    """
+    handler = ASGIHandler()
+
+    async def request(path: str) -> bool:
+        url = urlsplit(path)
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': url.path,
+            'raw_path': url.path.encode(),
+            'query_string': url.query.encode(),
+            'headers': [(b'host', b'testserver')],
+            'server': ('testserver', 80),
+            'client': ('127.0.0.1', 0),
+        }
+        received = False
+        status = []
+
+        async def receive():
+            nonlocal received
+            if received:
+                # Django waits for the disconnect while the response is produced
+                await asyncio.Event().wait()
+            received = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                status.append(message['status'])
+
+        await handler(scope, receive, send)
+        return 200 <= status[0] < 300
+
+    async def run() -> Dict:
+        latencies, errors = [], 0
+        counter = iter(range(requests))
+
+        async def client():
+            nonlocal errors
+            for number in counter:
+                start = time.perf_counter()
+                ok = await request(paths[number % len(paths)])
+                latencies.append(time.perf_counter() - start)
+                errors += not ok
+
+        start = time.perf_counter()
+        await asyncio.gather(*[client() for _ in range(clients)])
+        return summarize(latencies, errors, time.perf_counter() - start)
+
+    return asyncio.run(run())
+
+
+def run_http(base_url: str, paths: Sequence[str], clients: int, requests: int, timeout: float = 30) -> Dict:
+    """
+    Load tests a running server over HTTP, one thread per concurrent client. Start the
+    server under test with e.g. `gunicorn stock_visualizer_backend.wsgi` or
+    `uvicorn stock_visualizer_backend.asgi:application`.
+    """
+    def request(path: str) -> bool:
+        try:
+            with urllib.request.urlopen(base_url.rstrip('/') + path, timeout=timeout) as response:
+                response.read()
+                return 200 <= response.status < 300
+        except (urllib.error.URLError, OSError):
+            return False
+
+    return _run_threads(request, paths, clients, requests)
+
+
+def load_test(
+    paths: Sequence[str],
+    clients: int = 16,
+    requests: int = 500,
+    targets: Sequence[str] = TARGETS,
+    url: Optional[str] = None,
+) -> Dict[str, Dict]:
+    """
+    Compares p50/p99 latency and throughput of the WSGI and ASGI applications under
+    concurrent clients.
+
+    Args:
+        paths (Sequence[str]): Request paths (with query strings), cycled through.
+        clients (int): The number of concurrent clients.
+        requests (int): The total number of requests per target.
+        targets (Sequence[str]): The in-process applications to test, from TARGETS.
+        url (Optional[str]): Test the server running at this base URL instead.
+
+    Returns:
+        Dict[str, Dict]: The summary of each target, or of 'http' with a URL.
+    """
+    if url:
+        return {'http': run_http(url, paths, clients, requests)}
+    runners = {'wsgi': run_wsgi, 'asgi': run_asgi}
+    return {target: runners[target](paths, clients, requests) for target in targets}
@@ -0,0 +1,143 @@
+from typing import Dict, Iterable, Optional, Tuple, Type
+
+import pandas as pd
+from django.core.cache import cache
+from django.db.models import Model
+
+from stocks.models import (
+    CPIData,
+    DurablesData,
+    FFRData,
+    GDPData,
+    InflationData,
+    NonfarmPayrollData,
+    RetailSalesData,
+    TreasuryYieldData,
+    UnemploymentData,
+)
+from stocks.utils import metrics, versions
+from stocks.utils.asof import asof_join
+
+# Every series the macro panel can include: its model and the filter selecting the series
+# from that model's table.
+MACRO_SERIES: Dict[str, Tuple[Type[Model], dict]] = {
+    'fed_funds_rate': (FFRData, {}),
+    'cpi': (CPIData, {}),
+    'inflation': (InflationData, {}),
+    'retail_sales': (RetailSalesData, {}),
+    'durables': (DurablesData, {}),
+    'unemployment': (UnemploymentData, {}),
+    'nonfarm_payroll': (NonfarmPayrollData, {}),
+    'real_gdp': (GDPData, {'interval': 'quarterly', 'per_capita': False}),
+    'real_gdp_per_capita': (GDPData, {'interval': 'quarterly', 'per_capita': True}),
+    'treasury_3m': (TreasuryYieldData, {'maturity_months': 3}),
+    'treasury_2y': (TreasuryYieldData, {'maturity_months': 24}),
+    'treasury_5y': (TreasuryYieldData, {'maturity_months': 60}),
+    'treasury_7y': (TreasuryYieldData, {'maturity_months': 84}),
+    'treasury_10y': (TreasuryYieldData, {'maturity_months': 120}),
+    'treasury_30y': (TreasuryYieldData, {'maturity_months': 360}),
+}
+
+# Panel frequencies and the pandas period each row covers
+MACRO_FREQUENCIES = {
+    'daily': 'D',
+    'weekly': 'W-FRI',
+    'monthly': 'M',
+    'quarterly': 'Q',
+    'annual': 'Y',
+}
+
+# 'ffill' carries the last known value of each series onto every period end, while
+# 'period_end' takes the last observation within each period (None if there was none).
+MACRO_METHODS = ('ffill', 'period_end')
+
+# Panels are keyed by the economic SyncVersion, so this only bounds the cache size.
+MACRO_CACHE_SECONDS = 24 * 60 * 60
+
+
+def load_series(name: str) -> pd.Series:
+    """
+    Loads a single macro series as floats indexed by date, in one query.
+
+    Raises:
+        ValueError: If the series name is unknown.
+    """
+    if name not in MACRO_SERIES:
+        raise ValueError(f"Unknown macro series: {name}. Must be among {', '.join(MACRO_SERIES)}.")
+    model_class, filters = MACRO_SERIES[name]
+    rows = (
+        model_class.objects
+        .filter(value__isnull=False, **filters)
+        .order_by('date')
+        .values_list('date', 'value')
+    )
+    frame = pd.DataFrame.from_records(list(rows), columns=['date', name])
+    return frame.set_index('date')[name].astype(float)
+
+
+def build_panel(
+    names: Iterable[str],
+    frequency: str = 'monthly',
+    method: str = 'ffill',
+) -> pd.DataFrame:
+    """
+    Aligns several macro series of different native frequencies into one panel.
+
+    Args:
+        names (Iterable[str]): Series names, keys of MACRO_SERIES.
+        frequency (str): One of MACRO_FREQUENCIES. Rows are dated on the last day of each
+            period (every calendar day for 'daily').
+        method (str): One of MACRO_METHODS.
+
+    Returns:
+        pd.DataFrame: One column per series, indexed by period end date.
+
+    Raises:
+        ValueError: If a series, the frequency or the method is invalid.
+    """
+    if frequency not in MACRO_FREQUENCIES:
+        raise ValueError(f"Invalid frequency: {frequency}. Must be one of {', '.join(MACRO_FREQUENCIES)}.")
+    if method not in MACRO_METHODS:
+        raise ValueError(f"Invalid method: {method}. Must be one of {', '.join(MACRO_METHODS)}.")
+
+    names = list(names)
+    raw = pd.concat([load_series(name) for name in names], axis=1, join='outer').sort_index()
+    if raw.empty:
+        return raw
+
+    periods = pd.PeriodIndex(pd.to_datetime(raw.index), freq=MACRO_FREQUENCIES[frequency])
+    if method == 'period_end':
+        panel = raw.groupby(periods).last()
+        index = panel.index
+    else:
+        index = pd.period_range(periods.min(), periods.max(), freq=periods.freq)
+        grid = pd.DataFrame(index=index.end_time.normalize())
+        panel = asof_join(grid, raw.ffill())
+    return panel.set_axis(pd.Index(index.end_time.date, name='date'))
+
+
+def get_panel(
+    names: Optional[Iterable[str]] = None,
+    frequency: str = 'monthly',
+    method: str = 'ffill',
+) -> pd.DataFrame:
+    """
+    Returns a macro panel, building it at most once per economic indicator sync.
+
+    Args:
+        names (Optional[Iterable[str]]): Series names (default: all of MACRO_SERIES).
+        frequency (str): One of MACRO_FREQUENCIES.
+        method (str): One of MACRO_METHODS.
+
+    Returns:
+        pd.DataFrame: One column per series, indexed by period end date.
+    """
+    names = list(dict.fromkeys(names)) if names else list(MACRO_SERIES)
+    version = versions.get_version(versions.ECONOMIC_KEY)
+    cache_key = f"macro:{version}:{frequency}:{method}:{','.join(names)}"
+
+    panel = metrics.cache_lookup('macro', cache_key)
+    if panel is None:
+        panel = build_panel(names, frequency, method)
+        cache.set(cache_key, panel, MACRO_CACHE_SECONDS)
+    return panel
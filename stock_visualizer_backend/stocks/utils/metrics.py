@@ -0,0 +1,238 @@
+import contextvars
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from django.core.cache import cache
+
+# Upper bounds of the request latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Upper bounds of the queries per request histogram buckets
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 500)
+
+METRIC_PREFIX = 'stocks'
+
+
+@dataclass
+class RequestStats:
+    """
+    What one request did, collected while it is served.
+    """
+    view: str = ''
+    method: str = ''
+    status: int = 0
+    seconds: float = 0.0
+    queries: int = 0
+    query_seconds: float = 0.0
+    response_bytes: int = 0
+    cache: Dict[Tuple[str, str], int] = field(default_factory=lambda: defaultdict(int))
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+
+_current: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar('request_stats', default=None)
+
+# Lists that capture() blocks collect finished requests into
+_listeners: List[List[RequestStats]] = []
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    A connection.execute_wrapper that counts the query and its time against the current
+    request (if any). install_query_recorder() adds it to every database connection.
+    """
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - start
+        # Concurrent queries of one request (see async_queries) update the same stats
+        with stats.lock:
+            stats.queries += 1
+            stats.query_seconds += elapsed
+
+
+def install_query_recorder(sender, connection, **kwargs) -> None:
+    """
+    A connection_created receiver that adds record_query to every new connection.
+
+    The request stats are found through a context variable, which sync_to_async carries
+    into its worker threads, so the queries of async views are counted even though they
+    run on another thread's connection.
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def cache_lookup(name: str, key: str) -> Any:
+    """
+    cache.get(key), recording a hit or a miss of the named cache against the current
+    request. A miss returns None.
+    """
+    value = cache.get(key)
+    stats = _current.get()
+    if stats is not None:
+        with stats.lock:
+            stats.cache[(name, 'miss' if value is None else 'hit')] += 1
+    return value
+
+
+class Histogram:
+    """
+    Cumulative bucket counts, sum and count of observations, in Prometheus style.
+    """
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        for position, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[position] += 1
+        self.count += 1
+        self.sum += value
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels: Any) -> str:
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def _format(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    """
+    Per-process request metrics, aggregated by URL name.
+
+    Each server worker process keeps its own registry, so scrape every worker (or run a
+    single one) to see all traffic.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self.lock:
+            self.requests = defaultdict(int)
+            self.latency = defaultdict(lambda: Histogram(LATENCY_BUCKETS))
+            self.query_counts = defaultdict(lambda: Histogram(QUERY_COUNT_BUCKETS))
+            self.queries = defaultdict(int)
+            self.query_seconds = defaultdict(float)
+            self.response_bytes = defaultdict(int)
+            self.cache = defaultdict(int)
+
+    def record(self, stats: RequestStats) -> None:
+        """
+        Adds a finished request to the aggregates.
+        """
+        with self.lock:
+            self.requests[(stats.view, stats.method, stats.status)] += 1
+            self.latency[stats.view].observe(stats.seconds)
+            self.query_counts[stats.view].observe(stats.queries)
+            self.queries[stats.view] += stats.queries
+            self.query_seconds[stats.view] += stats.query_seconds
+            self.response_bytes[stats.view] += stats.response_bytes
+            for (name, result), count in stats.cache.items():
+                self.cache[(stats.view, name, result)] += count
+        for listener in list(_listeners):
+            listener.append(stats)
+
+    def render(self) -> str:
+        """
+        The metrics in the Prometheus text exposition format (version 0.0.4).
+        """
+        lines: List[str] = []
+
+        def family(name: str, kind: str, help_text: str) -> str:
+            full_name = f'{METRIC_PREFIX}_{name}'
+            lines.append(f'# HELP {full_name} {help_text}')
+            lines.append(f'# TYPE {full_name} {kind}')
+            return full_name
+
+        def histograms(name: str, help_text: str, values: Dict[str, Histogram]) -> None:
+            full_name = family(name, 'histogram', help_text)
+            for view, histogram in sorted(values.items()):
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    lines.append(f'{full_name}_bucket{_labels(view=view, le=_format(bound))} {count}')
+                lines.append(f'{full_name}_bucket{_labels(view=view, le="+Inf")} {histogram.count}')
+                lines.append(f'{full_name}_sum{_labels(view=view)} {_format(histogram.sum)}')
+                lines.append(f'{full_name}_count{_labels(view=view)} {histogram.count}')
+
+        def counters(name: str, help_text: str, values: Dict, label_names: Sequence[str]) -> None:
+            full_name = family(name, 'counter', help_text)
+            for key, value in sorted(values.items()):
+                key = key if isinstance(key, tuple) else (key,)
+                lines.append(f'{full_name}{_labels(**dict(zip(label_names, key)))} {_format(value)}')
+
+        with self.lock:
+            counters('http_requests_total', 'Requests served.', self.requests, ('view', 'method', 'status'))
+            histograms('http_request_duration_seconds', 'Request latency in seconds.', self.latency)
+            counters('http_response_bytes_total', 'Response body bytes sent.', self.response_bytes, ('view',))
+            counters('db_queries_total', 'Database queries executed.', self.queries, ('view',))
+            counters('db_query_seconds_total', 'Time spent in database queries.', self.query_seconds, ('view',))
+            histograms('db_queries_per_request', 'Database queries per request.', self.query_counts)
+            counters('cache_requests_total', 'Cache lookups by result.', self.cache, ('view', 'cache', 'result'))
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+@contextmanager
+def capture() -> Iterator[List[RequestStats]]:
+    """
+    Collects the RequestStats of every request finished inside the block, e.g. to assert
+    on the queries a test request made.
+    """
+    captured: List[RequestStats] = []
+    _listeners.append(captured)
+    try:
+        yield captured
+    finally:
+        _listeners.remove(captured)
+
+
+@contextmanager
+def query_budget(max_queries: int, max_query_seconds: Optional[float] = None) -> Iterator[List[RequestStats]]:
+    """
+    Fails if any request finished inside the block ran more than `max_queries` database
+    queries (or spent more than `max_query_seconds` in them).
+
+    Raises:
+        AssertionError: If a request exceeded the budget.
+    """
+    with capture() as captured:
+        yield captured
+    for stats in captured:
+        if stats.queries > max_queries:
+            raise AssertionError(f"{stats.view} ran {stats.queries} queries, over the budget of {max_queries}.")
+        if max_query_seconds is not None and stats.query_seconds > max_query_seconds:
+            raise AssertionError(
+                f"{stats.view} spent {stats.query_seconds:.3f}s in queries, over the budget of {max_query_seconds}s."
+            )
+
+
+@contextmanager
+def collect(stats: RequestStats) -> Iterator[RequestStats]:
+    """
+    Makes `stats` the current request's stats inside the block.
+    """
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
@@ -0,0 +1,259 @@
+import csv
+import io
+import json
+import logging
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Deque, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from stocks.utils import synthetic
+from stocks.utils.parse_alpha_vantage import AV_SYMBOL_FUNCTIONS, ECONOMIC_INDICATOR_FUNCTIONS
+
+logger = logging.getLogger(__name__)
+
+# Functions served as CSV rather than JSON
+CSV_FUNCTIONS = ('EARNINGS_CALENDAR',)
+SUPPORTED_FUNCTIONS = tuple(AV_SYMBOL_FUNCTIONS) + tuple(ECONOMIC_INDICATOR_FUNCTIONS) + CSV_FUNCTIONS
+
+# Query parameters that make a recording more specific than the function alone, in file name order
+RECORDING_PARAMETERS = ('symbol', 'interval', 'maturity', 'horizon')
+
+
+class MockAlphaVantage:
+    """
+    A stand-in for the Alpha Vantage API that answers /query requests with recorded or
+    synthetic payloads, with configurable latency, rate limits and injected 429s.
+
+    A recording is a file in the `recordings` directory named after the function and
+    its parameters, most specific first: e.g. OVERVIEW_AAPL.json,
+    TREASURY_YIELD_daily_10year.json or EARNINGS_CALENDAR_3month.csv, falling back to
+    OVERVIEW.json. Without one, a synthetic payload is generated.
+
+    Args:
+        latency (float): Seconds every response is delayed by.
+        jitter (float): Up to this many seconds are added to the latency at random.
+        error_rate (float): The share of requests answered with an injected 429.
+        rate_limit (Optional[int]): Requests allowed per API key per `rate_window`
+            seconds; further requests get a 429 until the window frees up.
+        rate_window (float): The length of the rate limit window in seconds.
+        recordings (Optional[str]): The directory of recorded payloads.
+        size (str): The size of synthetic payloads, from synthetic.SIZES.
+        seed (int): The seed of the synthetic payloads and injected errors.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit: Optional[int] = None,
+        rate_window: float = 60.0,
+        recordings: Optional[str] = None,
+        size: str = synthetic.DEFAULT_SIZE,
+        seed: int = 0,
+    ):
+        if size not in synthetic.SIZES:
+            raise ValueError(f"Invalid size: {size}. Must be one of {', '.join(synthetic.SIZES)}.")
+        if not 0 <= error_rate <= 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.recordings = Path(recordings) if recordings else None
+        self.size = size
+        self.seed = seed
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests: Dict[str, Deque[float]] = defaultdict(deque)
+        self.in_flight = 0
+        self.stats = {
+            'requests': 0,
+            'served': 0,
+            'recorded': 0,
+            'rate_limited': 0,
+            'injected_errors': 0,
+            'errors': 0,
+            'peak_concurrency': 0,
+            'bytes_sent': 0,
+        }
+
+    def _admit(self, api_key: str) -> Tuple[Optional[str], float]:
+        """
+        Counts a request against its key's rate limit, and decides whether it is refused.
+
+        Returns:
+            Tuple[Optional[str], float]: Why the request is refused ('rate_limited' or
+                'injected_errors', None to serve it) and the seconds until a retry can
+                succeed.
+        """
+        now = time.monotonic()
+        with self.lock:
+            self.stats['requests'] += 1
+            if self.error_rate and self.random.random() < self.error_rate:
+                return 'injected_errors', 1.0
+            if self.rate_limit is not None:
+                window = self.requests[api_key]
+                while window and now - window[0] >= self.rate_window:
+                    window.popleft()
+                if len(window) >= self.rate_limit:
+                    return 'rate_limited', self.rate_window - (now - window[0])
+                window.append(now)
+        return None, 0.0
+
+    def _recording(self, function: str, params: Dict[str, str]) -> Optional[Tuple[str, bytes]]:
+        if self.recordings is None:
+            return None
+        extension = 'csv' if function in CSV_FUNCTIONS else 'json'
+        parts = [params[name] for name in RECORDING_PARAMETERS if params.get(name)]
+        for count in range(len(parts), -1, -1):
+            path = self.recordings / f"{'_'.join([function, *parts[:count]])}.{extension}"
+            if path.is_file():
+                return extension, path.read_bytes()
+        return None
+
+    def _synthetic(self, function: str, params: Dict[str, str]) -> Tuple[str, bytes]:
+        if function == 'EARNINGS_CALENDAR':
+            output = io.StringIO()
+            csv.writer(output, lineterminator='\n').writerows(
+                synthetic.earnings_calendar(params.get('horizon') or '3month', seed=self.seed)
+            )
+            return 'csv', output.getvalue().encode()
+        options = {name: value for name, value in params.items() if name not in ('function', 'symbol')}
+        data = synthetic.payload(function, params.get('symbol'), size=self.size, seed=self.seed, **options)
+        return 'json', json.dumps(data).encode()
+
+    def respond(self, params: Dict[str, str], api_key: Optional[str]) -> Tuple[int, Dict[str, str], bytes]:
+        """
+        Answers one /query request.
+
+        Args:
+            params (Dict[str, str]): The query parameters.
+            api_key (Optional[str]): The key from the X-RapidAPI-Key header or the
+                apikey parameter.
+
+        Returns:
+            Tuple[int, Dict[str, str], bytes]: The status, headers and body.
+        """
+        if not api_key:
+            return self._error(401, 'Invalid API key. Go to https://docs.rapidapi.com/docs/keys for more info.')
+
+        refusal, retry_after = self._admit(api_key)
+        with self.lock:
+            self.in_flight += 1
+            self.stats['peak_concurrency'] = max(self.stats['peak_concurrency'], self.in_flight)
+        try:
+            delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0.0)
+            if delay:
+                time.sleep(delay)
+            if refusal:
+                with self.lock:
+                    self.stats[refusal] += 1
+                status, headers, body = self._error(
+                    429, 'You have exceeded the rate limit per minute for your plan.'
+                )
+                headers['Retry-After'] = str(max(int(retry_after + 0.999), 1))
+                return status, headers, body
+
+            function = (params.get('function') or '').upper()
+            try:
+                recorded = self._recording(function, params)
+                kind, body = recorded or self._synthetic(function, params)
+            except (ValueError, KeyError) as e:
+                # Alpha Vantage reports invalid calls in a 200 response
+                with self.lock:
+                    self.stats['errors'] += 1
+                return self._payload('json', json.dumps({
+                    'Error Message': f'Invalid API call for function {function or "(none)"}: {e}'
+                }).encode())
+
+            with self.lock:
+                self.stats['served'] += 1
+                self.stats['recorded'] += recorded is not None
+            return self._payload(kind, body)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+    def _payload(self, kind: str, body: bytes) -> Tuple[int, Dict[str, str], bytes]:
+        content_type = 'application/x-download' if kind == 'csv' else 'application/json'
+        with self.lock:
+            self.stats['bytes_sent'] += len(body)
+        return 200, {'Content-Type': content_type}, body
+
+    @staticmethod
+    def _error(status: int, message: str) -> Tuple[int, Dict[str, str], bytes]:
+        return status, {'Content-Type': 'application/json'}, json.dumps({'message': message}).encode()
+
+
+class MockAlphaVantageHandler(BaseHTTPRequestHandler):
+    """
+    Serves GET /query from the server's MockAlphaVantage, and its counters at GET /stats.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        mock: MockAlphaVantage = self.server.mock
+        if url.path.rstrip('/') == '/query':
+            params = dict(parse_qsl(url.query))
+            api_key = self.headers.get('X-RapidAPI-Key') or params.pop('apikey', None)
+            status, headers, body = mock.respond(params, api_key)
+        elif url.path.rstrip('/') == '/stats':
+            with mock.lock:
+                status, headers, body = 200, {'Content-Type': 'application/json'}, json.dumps(mock.stats).encode()
+        else:
+            status, headers, body = MockAlphaVantage._error(404, f'Not found: {url.path}')
+
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+
+def make_server(host: str = '127.0.0.1', port: int = 8765, **options) -> ThreadingHTTPServer:
+    """
+    A threaded HTTP server for a MockAlphaVantage, so concurrent clients are served
+    concurrently. Port 0 picks a free port (see server.server_address).
+
+    Args:
+        host (str): The address to listen on.
+        port (int): The port to listen on.
+        **options: The MockAlphaVantage options.
+
+    Returns:
+        ThreadingHTTPServer: The server, not yet serving.
+    """
+    server = ThreadingHTTPServer((host, port), MockAlphaVantageHandler)
+    server.daemon_threads = True
+    server.mock = MockAlphaVantage(**options)
+    return server
+
+
+def start_server(host: str = '127.0.0.1', port: int = 0, **options) -> ThreadingHTTPServer:
+    """
+    Starts a mock server in a background thread, e.g. for tests. Stop it with
+    server.shutdown() and server.server_close().
+    """
+    server = make_server(host, port, **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def query_url(server: ThreadingHTTPServer) -> str:
+    """
+    The URL to set ALPHA_VANTAGE_URL and ALPHA_VANTAGE_CSV_URL to for a running server.
+    """
+    host, port = server.server_address[:2]
+    return f'http://{host}:{port}/query'
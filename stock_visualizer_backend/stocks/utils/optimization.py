@@ -0,0 +1,270 @@
+import datetime
+from typing import Callable, Dict, Iterable, Optional
+
+import numpy as np
+from django.core.cache import cache
+
+from stocks.utils import metrics, risk
+
+TRADING_DAYS_PER_YEAR = 252
+
+OPTIMIZATION_METHODS = ('min_variance', 'max_sharpe', 'risk_parity')
+
+MAX_ITERATIONS = 5000
+TOLERANCE = 1e-9
+# The projected gradient only has to identify which weights are zero; the weights
+# themselves are then solved exactly on that support.
+SUPPORT_TOLERANCE = 1e-6
+
+
+def project_to_simplex(values: np.ndarray) -> np.ndarray:
+    """
+    Euclidean projection onto {w : w >= 0, sum(w) = 1} (Duchi et al., 2008).
+    """
+    ordered = np.sort(values)[::-1]
+    cumulative = np.cumsum(ordered) - 1
+    ranks = np.arange(1, len(values) + 1)
+    last = ranks[ordered - cumulative / ranks > 0][-1]
+    return np.maximum(values - cumulative[last - 1] / last, 0.0)
+
+
+def project_to_budget(values: np.ndarray, budget: np.ndarray) -> np.ndarray:
+    """
+    Euclidean projection onto {y : y >= 0, budget . y = 1}.
+
+    The projection is max(values + t * budget, 0) for the multiplier t at which the
+    constraint holds. budget . y is piecewise linear and non-decreasing in t, with a
+    breakpoint where each coordinate becomes zero, so t is found exactly by evaluating it
+    at the sorted breakpoints with cumulative sums.
+    """
+    nonzero = budget != 0
+    breakpoints = -values[nonzero] / budget[nonzero]
+    order = np.argsort(breakpoints)
+    breakpoints = breakpoints[order]
+    intercepts = (budget * values)[nonzero][order]
+    slopes = (budget ** 2)[nonzero][order]
+    positive = (budget[nonzero] > 0)[order]
+
+    # Coordinates with a positive budget are active above their breakpoint and those with
+    # a negative budget below it. Index k holds the coefficients just above breakpoint k.
+    intercept = np.cumsum(np.where(positive, intercepts, 0.0))
+    slope = np.cumsum(np.where(positive, slopes, 0.0))
+    intercept += np.where(positive, 0.0, intercepts).sum() - np.cumsum(np.where(positive, 0.0, intercepts))
+    slope += np.where(positive, 0.0, slopes).sum() - np.cumsum(np.where(positive, 0.0, slopes))
+    totals = intercept + breakpoints * slope
+
+    crossing = np.searchsorted(totals, 1.0)
+    if crossing == 0:
+        segment_intercept = np.where(positive, 0.0, intercepts).sum()
+        segment_slope = np.where(positive, 0.0, slopes).sum()
+    else:
+        segment_intercept, segment_slope = intercept[crossing - 1], slope[crossing - 1]
+    t = (1 - segment_intercept) / segment_slope
+    return np.maximum(values + t * budget, 0.0)
+
+
+def _minimize_quadratic(
+    covariance: np.ndarray,
+    project: Callable[[np.ndarray], np.ndarray],
+    start: np.ndarray,
+) -> np.ndarray:
+    """
+    Minimizes x' C x over a convex set with accelerated projected gradient (FISTA).
+
+    The momentum is reset whenever a step moves against the gradient (adaptive restart,
+    O'Donoghue & Candes 2015), which keeps convergence fast on ill-conditioned
+    covariances.
+    """
+    step = 1 / (2 * np.linalg.eigvalsh(covariance)[-1])
+    current = project(start)
+    momentum, t = current, 1.0
+    for _ in range(MAX_ITERATIONS):
+        gradient = 2 * covariance @ momentum
+        following = project(momentum - step * gradient)
+        change = following - current
+        if np.max(np.abs(change)) <= SUPPORT_TOLERANCE * max(1.0, np.max(np.abs(following))):
+            return following
+        if gradient @ (following - momentum) > 0:
+            t = 1.0
+        t_next = (1 + np.sqrt(1 + 4 * t ** 2)) / 2
+        momentum = following + (t - 1) / t_next * change
+        current, t = following, t_next
+    return current
+
+
+def _solve(covariance: np.ndarray, vector: np.ndarray) -> np.ndarray:
+    try:
+        return np.linalg.solve(covariance, vector)
+    except np.linalg.LinAlgError:
+        return np.linalg.lstsq(covariance, vector, rcond=None)[0]
+
+
+def _solve_long_only(
+    covariance: np.ndarray,
+    budget: np.ndarray,
+    project: Callable[[np.ndarray], np.ndarray],
+    start: np.ndarray,
+) -> np.ndarray:
+    """
+    Minimizes y' C y subject to budget . y = 1 and y >= 0.
+
+    The projected gradient finds the support of the solution, where the problem reduces to
+    the linear system C_SS y_S = k * budget_S. The exact solution on the support is kept
+    if it satisfies the optimality conditions, otherwise the iterate is returned.
+    """
+    approximate = _minimize_quadratic(covariance, project, start)
+    support = approximate > 0
+    exact = _solve(covariance[np.ix_(support, support)], budget[support])
+    exact = exact / (budget[support] @ exact)
+    if (exact <= 0).any():
+        return approximate
+
+    solution = np.zeros_like(approximate)
+    solution[support] = exact
+    marginal = covariance @ solution
+    multiplier = marginal[support][0] / budget[support][0]
+    if (marginal - multiplier * budget < -TOLERANCE * np.abs(marginal).max()).any():
+        return approximate
+    return solution
+
+
+def min_variance(covariance: np.ndarray, long_only: bool = True) -> np.ndarray:
+    """
+    Weights of the minimum variance portfolio (fully invested).
+    """
+    count = len(covariance)
+    if not long_only:
+        weights = _solve(covariance, np.ones(count))
+        return weights / weights.sum()
+    return _solve_long_only(covariance, np.ones(count), project_to_simplex, np.full(count, 1 / count))
+
+
+def max_sharpe(covariance: np.ndarray, excess: np.ndarray, long_only: bool = True) -> np.ndarray:
+    """
+    Weights of the maximum Sharpe ratio (tangency) portfolio.
+
+    The long-only problem is solved as min y' C y subject to excess . y = 1 and y >= 0,
+    and y is then rescaled to sum to 1.
+
+    Raises:
+        ValueError: If no portfolio has a positive expected excess return.
+    """
+    if not long_only:
+        weights = _solve(covariance, excess)
+        if weights.sum() <= 0:
+            raise ValueError("No portfolio has a positive expected excess return.")
+        return weights / weights.sum()
+
+    if not (excess > 0).any():
+        raise ValueError("No symbol has a positive expected excess return.")
+    start = np.where(excess > 0, excess, 0.0)
+    scaled = _solve_long_only(
+        covariance, excess, lambda y: project_to_budget(y, excess), start / (start @ excess)
+    )
+    return scaled / scaled.sum()
+
+
+def risk_parity(covariance: np.ndarray) -> np.ndarray:
+    """
+    Weights at which every symbol contributes equally to portfolio variance.
+
+    Uses Newton's method on the convex formulation of Spinu (2013),
+    min 1/2 y' C y - sum(log y), whose solution normalized to sum to 1 is the equal risk
+    contribution portfolio.
+
+    Raises:
+        ValueError: If a symbol has no variance, as it can contribute no risk at any
+            weight.
+    """
+    count = len(covariance)
+    riskless = ~(np.diag(covariance) > 0)
+    if riskless.any():
+        raise ValueError(
+            f"Risk parity needs a positive variance for every symbol, but {riskless.sum()} have none."
+        )
+    scaled = np.ones(count) / np.sqrt(np.diag(covariance))
+    for _ in range(100):
+        gradient = covariance @ scaled - 1 / scaled
+        hessian = covariance + np.diag(1 / scaled ** 2)
+        direction = _solve(hessian, gradient)
+        # Damp the step so that every weight stays positive
+        ratio = np.max(direction / scaled)
+        step = 1.0 if ratio < 0.9 else 0.9 / ratio
+        scaled = scaled - step * direction
+        if np.max(np.abs(direction)) <= TOLERANCE * np.max(scaled):
+            break
+    return scaled / scaled.sum()
+
+
+def optimize(
+    symbols: Iterable[str],
+    method: str = 'min_variance',
+    window: int = risk.DEFAULT_RISK_WINDOW,
+    end: Optional[datetime.date] = None,
+    shrinkage: str = 'ledoit_wolf',
+    risk_free_rate: float = 0.0,
+    long_only: bool = True,
+) -> Dict[str, object]:
+    """
+    Computes optimal portfolio weights from the trailing covariance of daily returns.
+
+    The covariance and mean returns come from risk.get_risk_matrix and are cached per
+    symbol set, window and end date, and the optimized weights are cached as well.
+
+    Args:
+        symbols (Iterable[str]): The candidate symbols.
+        method (str): One of OPTIMIZATION_METHODS.
+        window (int): The number of daily returns to estimate from.
+        end (Optional[datetime.date]): Last date of the window (default: latest).
+        shrinkage (str): Covariance shrinkage, one of risk.SHRINKAGE_METHODS.
+        risk_free_rate (float): Annual risk-free rate, used by max_sharpe and the
+            reported Sharpe ratio.
+        long_only (bool): Whether weights must be non-negative (risk parity always is).
+
+    Returns:
+        Dict[str, object]: The 'weights' by symbol, the annualized 'expected_return',
+        'volatility' and 'sharpe' of the portfolio, and the 'symbols', 'excluded',
+        'start' and 'end' of the underlying risk matrix.
+
+    Raises:
+        ValueError: If the method is unknown, or any argument of risk.get_risk_matrix
+            is invalid.
+    """
+    if method not in OPTIMIZATION_METHODS:
+        raise ValueError(f"Invalid method: {method}. Must be one of {', '.join(OPTIMIZATION_METHODS)}.")
+
+    symbols = list(symbols)
+    cache_key = risk.risk_cache_key(
+        'optimize', symbols, method, window, end, shrinkage, risk_free_rate, long_only
+    )
+    result = metrics.cache_lookup('optimize', cache_key)
+    if result is not None:
+        return result
+
+    matrix = risk.get_risk_matrix(symbols, window=window, end=end, shrinkage=shrinkage)
+    covariance = matrix['covariance'] * TRADING_DAYS_PER_YEAR
+    expected = matrix['mean'] * TRADING_DAYS_PER_YEAR
+
+    if not len(covariance):
+        weights = np.empty(0)
+    elif method == 'min_variance':
+        weights = min_variance(covariance, long_only)
+    elif method == 'max_sharpe':
+        weights = max_sharpe(covariance, expected - risk_free_rate, long_only)
+    else:
+        weights = risk_parity(covariance)
+
+    portfolio_return = float(weights @ expected) if len(weights) else None
+    volatility = float(np.sqrt(weights @ covariance @ weights)) if len(weights) else None
+    result = {
+        'weights': dict(zip(matrix['symbols'], weights.tolist())),
+        'expected_return': portfolio_return,
+        'volatility': volatility,
+        'sharpe': (portfolio_return - risk_free_rate) / volatility if volatility else None,
+        'symbols': matrix['symbols'],
+        'excluded': matrix['excluded'],
+        'start': matrix['start'],
+        'end': matrix['end'],
+    }
+    cache.set(cache_key, result, risk.RISK_CACHE_SECONDS)
+    return result
@@ -0,0 +1,129 @@
+import base64
+import binascii
+import json
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q, QuerySet
+
+DEFAULT_PAGE_LIMIT = 500
+MAX_PAGE_LIMIT = 5000
+
+# Rows fetched from the database cursor at a time when streaming
+STREAM_CHUNK_SIZE = 2000
+
+
+def encode_cursor(values: Sequence[str]) -> str:
+    """
+    Encodes the keyset position of a row as an opaque, URL-safe cursor.
+    """
+    return base64.urlsafe_b64encode(json.dumps(list(values)).encode()).decode()
+
+
+def decode_cursor(cursor: str, size: int) -> List[str]:
+    """
+    Decodes a cursor produced by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed or does not hold `size` values.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError(f"Invalid cursor: {cursor}.")
+    return values
+
+
+def keyset_page(
+    queryset: QuerySet,
+    keys: Sequence[str],
+    limit: int = DEFAULT_PAGE_LIMIT,
+    cursor: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Returns one page of a values() queryset in ascending `keys` order.
+
+    The page starts strictly after the cursor row, so the database seeks straight to it
+    instead of counting past an offset, and each page costs the same however deep it is.
+    The last key must be unique for the order to be total.
+
+    Args:
+        queryset (QuerySet): A values() or values_list() queryset selecting every key.
+        keys (Sequence[str]): The fields to order and seek by.
+        limit (int): The page size, at most MAX_PAGE_LIMIT.
+        cursor (Optional[str]): The 'next_cursor' of the previous page.
+
+    Returns:
+        Dict[str, Any]: The 'results' of this page and the 'next_cursor' (None on the
+        last page).
+
+    Raises:
+        ValueError: If the limit or the cursor is invalid.
+    """
+    if not 1 <= limit <= MAX_PAGE_LIMIT:
+        raise ValueError(f"Invalid limit: {limit}. Must be between 1 and {MAX_PAGE_LIMIT}.")
+    if cursor:
+        values = decode_cursor(cursor, len(keys))
+        # (k1, k2, ...) > (v1, v2, ...) expanded for backends without row comparisons
+        condition = Q()
+        for position in range(len(keys)):
+            condition |= Q(
+                **{key: value for key, value in zip(keys[:position], values)},
+                **{f'{keys[position]}__gt': values[position]},
+            )
+        queryset = queryset.filter(condition)
+
+    rows = list(queryset.order_by(*keys)[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        if isinstance(last, dict):
+            next_cursor = encode_cursor([last[key] for key in keys])
+        else:
+            next_cursor = encode_cursor([last] if len(keys) == 1 else list(last))
+    return {'results': rows, 'next_cursor': next_cursor}
+
+
+def stream_json_array(rows: Iterable[Any], chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Serializes rows as a JSON array piece by piece, yielding one string per chunk of rows.
+
+    Paired with QuerySet.iterator(chunk_size=...) and a StreamingHttpResponse, only one
+    chunk of rows is ever held in memory, however many rows there are.
+    """
+    encoder = DjangoJSONEncoder()
+    yield '['
+    buffer = []
+    separator = ''
+    for row in rows:
+        buffer.append(encoder.encode(row))
+        if len(buffer) >= chunk_size:
+            yield separator + ','.join(buffer)
+            buffer, separator = [], ','
+    if buffer:
+        yield separator + ','.join(buffer)
+    yield ']'
+
+
+async def astream_json_array(rows: AsyncIterable[Any], chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[str]:
+    """
+    stream_json_array for an async row iterator, e.g. QuerySet.aiterator().
+
+    Under ASGI, Django buffers the whole of a sync iterator before sending it, so only an
+    async iterator keeps memory flat there.
+    """
+    encoder = DjangoJSONEncoder()
+    yield '['
+    buffer = []
+    separator = ''
+    async for row in rows:
+        buffer.append(encoder.encode(row))
+        if len(buffer) >= chunk_size:
+            yield separator + ','.join(buffer)
+            buffer, separator = [], ','
+    if buffer:
+        yield separator + ','.join(buffer)
+    yield ']'
@@ -4,12 +4,15 @@ import datetime
 from stocks.models import BaseStockData, StockPriceData, IncomeStatementData, BalanceSheetData, EarningsData, CashFlowData, QuarterlyStockOverview, EarningsCalendarData, GDPData, TreasuryYieldData, FFRData, CPIData, InflationData, RetailSalesData, DurablesData, UnemploymentData, NonfarmPayrollData
 from django.conf import settings
 import logging
-from typing import Dict, Optional, Union, List, Type
+from typing import Dict, Optional, Union, List, Tuple, Type
 import re
 import csv
+from urllib.parse import urlsplit
 from decimal import Decimal, InvalidOperation
-from django.db import transaction
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
 from django.db.models import Model
+from stocks.utils import aggregation, fundamentals, price_store, returns, snapshots, telemetry, versions
 
 logger = logging.getLogger(__name__)
 
@@ -205,6 +208,78 @@ def safe_date(value: str, default: Optional[datetime.date] = None) -> Optional[d
         return default
 
 
+def _stored_value(model: Type[Model], name: str, value):
+    """
+    The value as it reads back from the database, so that it can be compared with a
+    loaded one (e.g. decimals are rounded to the field's decimal places and truncated
+    for integer fields).
+    """
+    field = model._meta.get_field(name)
+    try:
+        value = field.to_python(value)
+        if isinstance(value, Decimal) and getattr(field, 'decimal_places', None) is not None:
+            value = value.quantize(Decimal(1).scaleb(-field.decimal_places))
+    except (ValidationError, InvalidOperation):
+        pass
+    return value
+
+
+def upsert(model: Type[Model], defaults: Dict, **lookup) -> Tuple[Model, str]:
+    """
+    Like Model.objects.update_or_create(), but an existing row is only written when one
+    of its values actually changed, which is the common case when re-syncing a history.
+    As with update_or_create(), a row another sync inserts between the lookup and the
+    insert is updated instead.
+
+    The outcome is counted in the sync telemetry of the symbol being synced.
+
+    Args:
+        model (Type[Model]): The model to write.
+        defaults (Dict): The values to set, by field name.
+        **lookup: The field values identifying the row.
+
+    Returns:
+        Tuple[Model, str]: The row and whether it was telemetry.INSERTED, UPDATED or
+            UNCHANGED.
+    """
+    try:
+        instance = model.objects.get(**lookup)
+    except model.DoesNotExist:
+        try:
+            # In a savepoint, so that a row inserted concurrently since the get above
+            # leaves the surrounding transaction usable
+            with transaction.atomic():
+                instance = model.objects.create(**{**lookup, **defaults})
+        except IntegrityError:
+            try:
+                instance = model.objects.get(**lookup)
+            except model.DoesNotExist:
+                pass
+            else:
+                return _update(instance, model, defaults)
+            raise
+        telemetry.record_row(telemetry.INSERTED)
+        return instance, telemetry.INSERTED
+    return _update(instance, model, defaults)
+
+
+def _update(instance: Model, model: Type[Model], defaults: Dict) -> Tuple[Model, str]:
+    """
+    The update half of upsert(): writes the values of `defaults` that changed.
+    """
+    changed = [
+        name for name, value in defaults.items()
+        if getattr(instance, name) != _stored_value(model, name, value)
+    ]
+    for name in changed:
+        setattr(instance, name, defaults[name])
+    if changed:
+        instance.save(update_fields=changed)
+    outcome = telemetry.UPDATED if changed else telemetry.UNCHANGED
+    telemetry.record_row(outcome)
+    return instance, outcome
+
+
 def camel_to_snake(name: Union[str, List[str]]) -> Union[str, List[str]]:
     """
     Converts a string or a list of strings from camel case to snake case.
@@ -271,7 +346,7 @@ def fetch_data(
     # Filter out None values from kwargs, to allow for safe passing of them
     kwargs = {k: v for k, v in kwargs.items() if v is not None}
     
-    url = "https://alpha-vantage.p.rapidapi.com/query"
+    url = settings.ALPHA_VANTAGE_URL
     if stock_symbol:
         querystring = {"symbol": stock_symbol, "function": function, "datatype": "json", **kwargs}
     else:
@@ -283,24 +358,29 @@ def fetch_data(
         if not api_key:
             raise ValueError('API key not provided')
     
-    headers = {"X-RapidAPI-Key": api_key, "X-RapidAPI-Host": "alpha-vantage.p.rapidapi.com"}
+    headers = {"X-RapidAPI-Key": api_key, "X-RapidAPI-Host": urlsplit(url).netloc}
 
     retry_count = 0
 
     while retry_count < max_retries:
+        start = time.perf_counter()
         try:
             response = requests.get(url, headers=headers, params=querystring)
+            telemetry.record_fetch(time.perf_counter() - start, len(response.content))
             if response.status_code == 200:
                 return response.json()
             elif response.status_code == 429:  # Rate limit exceeded
                 print(f"Rate limit exceeded. Retrying in {backoff_seconds} seconds...")
+                telemetry.record_backoff(backoff_seconds)
                 time.sleep(backoff_seconds)
                 backoff_seconds *= 2  # Double the backoff time for the next retry
                 retry_count += 1
             else:
                 raise ValueError(f"Error fetching data: {response.status_code} - {response.text}")
         except requests.exceptions.RequestException as e:
+            telemetry.record_fetch(time.perf_counter() - start)
             print(f"Request failed: {e}")
+            telemetry.record_backoff(backoff_seconds)
             time.sleep(backoff_seconds)
             backoff_seconds *= 2
             retry_count += 1
@@ -340,26 +420,31 @@ def fetch_csv_data(
         if not api_key:
             raise ValueError('API key not provided')
 
-    url = "https://www.alphavantage.co/query"
+    url = settings.ALPHA_VANTAGE_CSV_URL
     params = {"function": function, "apikey": api_key, **kwargs}
     
     retry_count = 0
     while retry_count < max_retries:
+        start = time.perf_counter()
         try:
             response = requests.get(url, params=params)
+            telemetry.record_fetch(time.perf_counter() - start, len(response.content))
             if response.status_code == 200:
                 decoded_content = response.content.decode('utf-8')
                 cr = csv.reader(decoded_content.splitlines(), delimiter=',')
                 return list(cr)
             elif response.status_code == 429:  # Rate limit exceeded
                 print(f"Rate limit exceeded. Retrying in {backoff_seconds} seconds...")
+                telemetry.record_backoff(backoff_seconds)
                 time.sleep(backoff_seconds)
                 backoff_seconds *= 2  # Double the backoff time for the next retry
                 retry_count += 1
             else:
                 raise ValueError(f"Error fetching data: {response.status_code} - {response.text}")
         except requests.exceptions.RequestException as e:
+            telemetry.record_fetch(time.perf_counter() - start)
             print(f"Request failed: {e}")
+            telemetry.record_backoff(backoff_seconds)
             time.sleep(backoff_seconds)
             backoff_seconds *= 2
             retry_count += 1
@@ -388,6 +473,13 @@ def sync_stock_price_data(data: dict, interval: str):
     else:
         time_series_key = f'{interval.capitalize()} Adjusted Time Series' 
     
+    existing_adj_close = dict(
+        StockPriceData.objects
+        .filter(stock=base_stock, interval=interval)
+        .values_list('date', 'adj_close')
+    )
+    incoming_adj_close = {}
+
     for date_str, values in data[time_series_key].items():
         date = safe_date(date_str)
         
@@ -402,13 +494,24 @@ def sync_stock_price_data(data: dict, interval: str):
             'interval': interval,
             'split_coefficient': safe_decimal(values.get('8. split coefficient', None)),
         }
+        incoming_adj_close[date] = defaults['adj_close']
         
-        StockPriceData.objects.update_or_create(
-            stock=base_stock,
-            date=date,
-            interval=interval,
-            defaults=defaults
-        )
+        upsert(StockPriceData, defaults, stock=base_stock, date=date, interval=interval)
+
+    # Only the returns from the first new or re-adjusted bar onwards need recomputing
+    changed_from = returns.first_changed_date(existing_adj_close, incoming_adj_close)
+    if changed_from is not None:
+        returns.update_returns(base_stock, interval, since=changed_from)
+        if price_store.is_enabled():
+            price_store.update_symbol(base_stock.symbol, interval, since=changed_from)
+        versions.bump_version(versions.prices_key(base_stock.symbol))
+
+        # Weekly and monthly bars are derived from the daily ones rather than fetched
+        if interval == 'daily':
+            for aggregated_interval in aggregation.AGGREGATED_INTERVALS:
+                aggregation.update_aggregated_bars(
+                    base_stock, aggregated_interval, since=changed_from
+                )
 
 
 # 
@@ -477,12 +580,9 @@ def sync_income_statement(data: Dict) -> None:
             
             defaults = {key: value for key, value in defaults.items() if value is not None}
             
-            IncomeStatementData.objects.update_or_create(
-                stock=base_stock,
-                report_type=report_type,
-                date=date,
-                defaults=defaults
-            )
+            upsert(IncomeStatementData, defaults, stock=base_stock, report_type=report_type, date=date)
+
+    fundamentals.update_fundamental_metrics(base_stock)
             
 def sync_balance_sheet(data: Dict) -> None:
     """
@@ -554,12 +654,9 @@ def sync_balance_sheet(data: Dict) -> None:
             
             defaults = {key: value for key, value in defaults.items() if value is not None}
             
-            BalanceSheetData.objects.update_or_create(
-                stock=base_stock,
-                report_type=report_type,
-                date=date,
-                defaults=defaults
-            )
+            upsert(BalanceSheetData, defaults, stock=base_stock, report_type=report_type, date=date)
+
+    fundamentals.update_fundamental_metrics(base_stock)
 
 
 def sync_cash_flow(data: Dict) -> None:
@@ -621,12 +718,9 @@ def sync_cash_flow(data: Dict) -> None:
             }     
             defaults = {k: v for k, v in defaults.items() if v is not None}
             
-            CashFlowData.objects.update_or_create(
-                stock=base_stock,
-                report_type=report_type,
-                date=date,
-                defaults=defaults
-            )
+            upsert(CashFlowData, defaults, stock=base_stock, report_type=report_type, date=date)
+
+    fundamentals.update_fundamental_metrics(base_stock)
 
 
 def sync_earnings(data: Dict) -> None:
@@ -656,11 +750,12 @@ def sync_earnings(data: Dict) -> None:
             'reported_eps': safe_decimal(annual_earning.get('reportedEPS')),
         }
 
-        EarningsData.objects.update_or_create(
+        upsert(
+            EarningsData,
+            defaults,
             stock=base_stock,
             report_type='annual',
             fiscal_date_ending=fiscal_date_ending,
-            defaults=defaults
         )
 
     # Process quarterly earnings
@@ -680,12 +775,13 @@ def sync_earnings(data: Dict) -> None:
             'surprise_percentage': safe_decimal(quarterly_earning.get('surprisePercentage')),
         }
 
-        EarningsData.objects.update_or_create(
+        upsert(
+            EarningsData,
+            defaults,
             stock=base_stock,
             report_type='quarterly',
             fiscal_date_ending=fiscal_date_ending,
             reported_date=reported_date,
-            defaults=defaults
         )
 
 
@@ -717,9 +813,7 @@ def sync_base_and_quarterly_overview(data: Dict) -> None:
     
     base_stock_defaults = {key: value for key, value in base_stock_defaults.items() if value is not None}
     
-    base_stock, _ = BaseStockData.objects.update_or_create(
-        symbol=stock_symbol, defaults=base_stock_defaults
-    )
+    base_stock, _ = upsert(BaseStockData, base_stock_defaults, symbol=stock_symbol)
 
     quarter_end_date = datetime.datetime.strptime(data['LatestQuarter'], '%Y-%m-%d').date()
     overview_defaults = {
@@ -764,12 +858,17 @@ def sync_base_and_quarterly_overview(data: Dict) -> None:
     }
     overview_defaults = {key: value for key, value in overview_defaults.items() if value is not None}
 
-    # Using get_or_create to avoid creating duplicates
-    QuarterlyStockOverview.objects.update_or_create(
+    # Using upsert to avoid creating duplicates
+    overview, _ = upsert(
+        QuarterlyStockOverview,
+        overview_defaults,
         stock=base_stock,
         quarter_end_date=quarter_end_date,
-        defaults=overview_defaults
     )
+    # Keep the latest-overview snapshot used by the screener and latest_overview view current
+    snapshots.update_latest_overview(overview)
+    # Let the symbol search indexes of running processes pick up new or renamed stocks
+    versions.bump_version(versions.STOCKS_KEY)
     
     
 def sync_earnings_calendar(api_key: str = 'demo', horizon: str = '3month'):
@@ -788,18 +887,12 @@ def sync_earnings_calendar(api_key: str = 'demo', horizon: str = '3month'):
         api_key (str): The API key for Alpha Vantage.
         horizon (str): The horizon parameter for the API call, e.g., "3month".
     """
-    CSV_URL = f'https://www.alphavantage.co/query?function=EARNINGS_CALENDAR&horizon={horizon}&apikey={api_key}'
     # current_date = datetime.date.today()
 
-    with requests.Session() as s:
-        download = s.get(CSV_URL)
-        decoded_content = download.content.decode('utf-8')
-
-        cr = csv.reader(decoded_content.splitlines(), delimiter=',')
-        next(cr)  # Skip header row
-
+    rows = fetch_csv_data('EARNINGS_CALENDAR', api_key=api_key, horizon=horizon)
+    if rows:
         with transaction.atomic():
-            for row in cr:
+            for row in rows[1:]:  # Skip header row
                 symbol, name, report_date, fiscal_date_ending, estimate, currency = row
                 
                 
@@ -814,15 +907,13 @@ def sync_earnings_calendar(api_key: str = 'demo', horizon: str = '3month'):
                     defaults={'name': name, 'currency': currency}
                 )
 
-                # Create or update EarningsCalendarData
-                horizon_months = int(horizon.replace('month', ''))
+                # Create or update EarningsCalendarData, one row per stock and fiscal quarter
                 EarningsCalendarData.objects.update_or_create(
                     stock=stock,
                     # current_date=current_date,
-                    report_date=safe_date(report_date),
+                    fiscal_date_ending=safe_date(fiscal_date_ending),
                     defaults={
-                        'horizon_months': horizon_months,
-                        'fiscal_date_ending': safe_date(fiscal_date_ending),
+                        'report_date': safe_date(report_date),
                         'estimate': estimate,
                     }
                 )
@@ -956,6 +1047,27 @@ def sync_data(
     except Exception as e:
         raise ValueError(f"Failed to fetch data: {e}")
 
+    store_indicator_data(data, model_class, value_field_name, value_transform_func)
+
+
+def store_indicator_data(
+    data: Dict,
+    model_class: Type[Model],
+    value_field_name: str = 'value',
+    value_transform_func=lambda x: x,
+):
+    """
+    Writes the dated values of an economic indicator payload to the local database.
+
+    Parameters:
+    - data (Dict): The API response, with a 'data' list of {'date', 'value'} items.
+    - model_class (Type[Model]): The Django model class to which the data will be synced.
+    - value_field_name (str): The name of the field in the model where the value will be stored.
+    - value_transform_func (callable): A function to transform the value if necessary.
+
+    Raises:
+    - ValueError: If the payload is missing the 'data' key.
+    """
     if 'data' not in data:
         raise ValueError("The API response is missing the 'data' key.")
 
@@ -997,21 +1109,26 @@ def sync_economic_indicators(data_sync_config: None | Dict[str, Dict] = None):
     """
     if data_sync_config is None:
         data_sync_config = ECONOMIC_INDICATORS_CONFIG
-        
-    for function, config in data_sync_config.items():
-        try:
-            sync_data(
-                function=function,
-                model_class=config['model_class'],
-                value_transform_func=config.get('value_transform_func', lambda x: x),
-                interval=config.get('interval', None)  # Example of how you can pass additional kwargs
-            )
-            logger.info(f"Successfully synced data for {function}")
-        except ValueError as e:
-            logger.error(f"Error syncing data for {function}: {e}")
-    
-    sync_gdp()
-    sync_treasury_yield()
+
+    # A failed series (sync_treasury_yield raises) may follow others that already wrote
+    # rows, so the macro and yield curve caches are invalidated whatever happens
+    try:
+        for function, config in data_sync_config.items():
+            try:
+                sync_data(
+                    function=function,
+                    model_class=config['model_class'],
+                    value_transform_func=config.get('value_transform_func', lambda x: x),
+                    interval=config.get('interval', None)  # Example of how you can pass additional kwargs
+                )
+                logger.info(f"Successfully synced data for {function}")
+            except ValueError as e:
+                logger.error(f"Error syncing data for {function}: {e}")
+
+        sync_gdp()
+        sync_treasury_yield()
+    finally:
+        versions.bump_version(versions.ECONOMIC_KEY)
 
 
 # def sync_monthly_adjusted(data: dict):
@@ -0,0 +1,147 @@
+import datetime
+from typing import Iterable, List, Optional
+
+import pandas as pd
+
+from stocks.models import StockPriceData
+from stocks.utils import price_store
+
+# Columns of StockPriceData that can be pivoted into a date x symbol matrix
+PRICE_MATRIX_FIELDS = (
+    'open',
+    'high',
+    'low',
+    'close',
+    'adj_close',
+    'volume',
+    'dividend',
+)
+
+# Upper bound on the number of symbols in a single batch request
+MAX_PRICE_MATRIX_SYMBOLS = 50
+
+
+def parse_symbols(raw: Optional[str]) -> List[str]:
+    """
+    Parses a comma separated list of ticker symbols from a query string.
+
+    Symbols are stripped, upper-cased and de-duplicated while keeping the order in which
+    they were requested, so the columns of the resulting matrix follow the request.
+
+    Args:
+        raw (Optional[str]): The raw query string value, e.g. "aapl, MSFT,GOOG".
+
+    Returns:
+        List[str]: The cleaned list of symbols.
+    """
+    if not raw:
+        return []
+    symbols = [symbol.strip().upper() for symbol in raw.split(',')]
+    return list(dict.fromkeys(symbol for symbol in symbols if symbol))
+
+
+def load_price_matrix(
+    symbols: Iterable[str],
+    field: str = 'adj_close',
+    start: Optional[datetime.date] = None,
+    end: Optional[datetime.date] = None,
+    interval: str = 'daily',
+) -> pd.DataFrame:
+    """
+    Loads a single price field for several symbols as a date-aligned matrix.
+
+    The prices are pulled with one ordered query on StockPriceData and pivoted in a
+    single vectorized step, so the cost does not grow with the number of requests the
+    frontend would otherwise have to make. When the columnar price store is enabled the
+    matrix is read from it instead of the database.
+
+    Args:
+        symbols (Iterable[str]): The symbols to load. They become the matrix columns.
+        field (str): The StockPriceData field to load. Must be one of PRICE_MATRIX_FIELDS.
+        start (Optional[datetime.date]): First date to include (inclusive).
+        end (Optional[datetime.date]): Last date to include (inclusive).
+        interval (str): The bar interval ('daily', 'weekly' or 'monthly').
+
+    Returns:
+        pd.DataFrame: A float frame indexed by date with one column per symbol. Dates on
+        which a symbol has no bar are NaN.
+
+    Raises:
+        ValueError: If the field is not one of PRICE_MATRIX_FIELDS.
+    """
+    if field not in PRICE_MATRIX_FIELDS:
+        raise ValueError(f"Invalid field: {field}. Must be one of {', '.join(PRICE_MATRIX_FIELDS)}.")
+
+    symbols = list(symbols)
+    if price_store.is_enabled():
+        return price_store.load_price_matrix(symbols, field=field, start=start, end=end, interval=interval)
+
+    queryset = StockPriceData.objects.filter(stock_id__in=symbols, interval=interval)
+    if start:
+        queryset = queryset.filter(date__gte=start)
+    if end:
+        queryset = queryset.filter(date__lte=end)
+
+    rows = queryset.order_by('date', 'stock_id').values_list('date', 'stock_id', field)
+    frame = pd.DataFrame.from_records(list(rows), columns=['date', 'symbol', 'value'])
+
+    matrix = frame.pivot(index='date', columns='symbol', values='value')
+    matrix = matrix.reindex(columns=symbols).astype(float)
+    matrix.columns.name = None
+    return matrix
+
+
+def load_price_series(
+    symbol: str,
+    fields: Iterable[str] = PRICE_MATRIX_FIELDS,
+    interval: str = 'daily',
+) -> pd.DataFrame:
+    """
+    Loads several price fields of a single symbol as float columns indexed by date.
+
+    Reads from the columnar price store when it is enabled and from StockPriceData
+    otherwise.
+
+    Args:
+        symbol (str): The stock symbol.
+        fields (Iterable[str]): The StockPriceData fields to load.
+        interval (str): The bar interval ('daily', 'weekly' or 'monthly').
+
+    Returns:
+        pd.DataFrame: One float column per field, sorted by date.
+    """
+    fields = list(fields)
+    if price_store.is_enabled():
+        columns = price_store.load_columns(symbol, interval, ['date', *fields])
+        index = pd.Index(columns.pop('date').astype(object), name='date')
+        return pd.DataFrame(columns, index=index).astype(float)
+
+    rows = (
+        StockPriceData.objects
+        .filter(stock_id=symbol, interval=interval)
+        .order_by('date')
+        .values_list('date', *fields)
+    )
+    frame = pd.DataFrame.from_records(list(rows), columns=['date', *fields])
+    return frame.set_index('date').astype(float)
+
+
+def matrix_to_json(matrix: pd.DataFrame) -> dict:
+    """
+    Converts a date indexed matrix into a JSON serializable dictionary.
+
+    The layout is one row per date, with the date in the first position followed by one
+    value per column. Missing values are emitted as null.
+
+    Args:
+        matrix (pd.DataFrame): A frame indexed by date, as returned by load_price_matrix.
+
+    Returns:
+        dict: A dictionary with 'columns' (['date', *symbols]) and 'data' (the rows).
+    """
+    values = matrix.astype(object).where(matrix.notna(), None).to_numpy().tolist()
+    dates = [date.isoformat() for date in matrix.index]
+    return {
+        'columns': ['date', *matrix.columns],
+        'data': [[date, *row] for date, row in zip(dates, values)],
+    }
@@ -0,0 +1,240 @@
+"""
+Optional columnar mirror of StockPriceData.
+
+Each symbol and interval is stored as one raw binary file per column under
+settings.PRICE_STORE_DIR:
+
+    <PRICE_STORE_DIR>/<interval>/<symbol>/meta.json
+    <PRICE_STORE_DIR>/<interval>/<symbol>/<column>.<generation>.bin
+
+meta.json records the number of rows and the current generation. Syncs that only add new
+bars append to the current generation's files, past the rows meta.json counts; syncs that
+change older bars (e.g. after a dividend re-adjustment) write a new generation and then
+switch meta.json over to it, so a reader never sees a half written column. The previous
+generation is kept until the next switch, for readers that loaded meta.json just before
+it. Readers memory-map the files, so loading a series is zero-copy.
+"""
+import datetime
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+from stocks.models import StockPriceData
+
+logger = logging.getLogger(__name__)
+
+STORE_COLUMNS = {
+    'date': 'datetime64[D]',
+    'open': 'float64',
+    'high': 'float64',
+    'low': 'float64',
+    'close': 'float64',
+    'adj_close': 'float64',
+    'volume': 'int64',
+    'dividend': 'float64',
+    'split_coefficient': 'float64',
+}
+
+
+def is_enabled() -> bool:
+    """
+    Returns whether the columnar store is enabled (settings.PRICE_STORE_ENABLED).
+    """
+    return getattr(settings, 'PRICE_STORE_ENABLED', False)
+
+
+def _symbol_dir(symbol: str, interval: str) -> Path:
+    return Path(settings.PRICE_STORE_DIR) / interval / symbol
+
+
+def _column_path(path: Path, column: str, generation: int) -> Path:
+    return path / f'{column}.{generation}.bin'
+
+
+def _read_meta(path: Path) -> Optional[dict]:
+    try:
+        with open(path / 'meta.json') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _write_meta(path: Path, meta: dict) -> None:
+    tmp_path = path / 'meta.json.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, path / 'meta.json')
+
+
+def _fetch_bars(symbol: str, interval: str, since: Optional[datetime.date] = None) -> Dict[str, np.ndarray]:
+    """
+    Loads the bars of a symbol from the database as one array per store column.
+    """
+    queryset = StockPriceData.objects.filter(stock_id=symbol, interval=interval)
+    if since is not None:
+        queryset = queryset.filter(date__gte=since)
+    rows = queryset.order_by('date').values_list(*STORE_COLUMNS)
+    frame = pd.DataFrame.from_records(list(rows), columns=list(STORE_COLUMNS))
+
+    bars = {'date': pd.to_datetime(frame['date']).to_numpy().astype('datetime64[D]')}
+    for column, dtype in STORE_COLUMNS.items():
+        if column != 'date':
+            bars[column] = frame[column].astype(dtype).to_numpy()
+    return bars
+
+
+def load_columns(
+    symbol: str,
+    interval: str = 'daily',
+    columns: Optional[Iterable[str]] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Memory-maps the stored columns of a symbol.
+
+    The returned arrays are read-only views onto the store files, so nothing is copied
+    until the caller computes with them.
+
+    Args:
+        symbol (str): The stock symbol.
+        interval (str): The bar interval ('daily', 'weekly' or 'monthly').
+        columns (Optional[Iterable[str]]): The columns to load (default: all).
+
+    Returns:
+        Dict[str, np.ndarray]: One array per column, sorted by date. Symbols that are not
+        in the store yield empty arrays.
+    """
+    columns = list(columns or STORE_COLUMNS)
+    path = _symbol_dir(symbol, interval)
+    meta = _read_meta(path)
+    if meta is None or meta['length'] == 0:
+        return {column: np.empty(0, dtype=STORE_COLUMNS[column]) for column in columns}
+    return {
+        column: np.memmap(
+            _column_path(path, column, meta['generation']),
+            dtype=STORE_COLUMNS[column],
+            mode='r',
+            shape=(meta['length'],),
+        )
+        for column in columns
+    }
+
+
+def update_symbol(symbol: str, interval: str, since: Optional[datetime.date] = None) -> int:
+    """
+    Brings the stored columns of a symbol up to date with the database.
+
+    If every stored bar is older than `since`, the bars from `since` onwards are appended
+    to the current files. Otherwise the stored history is kept up to `since` and the rest
+    is rewritten as a new generation. since=None rebuilds the symbol from scratch.
+
+    Args:
+        symbol (str): The stock symbol.
+        interval (str): The bar interval ('daily', 'weekly' or 'monthly').
+        since (Optional[datetime.date]): The earliest bar that changed in the database.
+
+    Returns:
+        int: The number of rows written.
+    """
+    path = _symbol_dir(symbol, interval)
+    path.mkdir(parents=True, exist_ok=True)
+    meta = _read_meta(path)
+
+    keep = 0
+    if meta is not None and meta['length'] > 0 and since is not None:
+        stored_dates = load_columns(symbol, interval, ['date'])['date']
+        keep = int(np.searchsorted(stored_dates, np.datetime64(since, 'D'), side='left'))
+
+    if meta is not None and keep > 0 and keep == meta['length']:
+        new_bars = _fetch_bars(symbol, interval, since=since)
+        for column, values in new_bars.items():
+            column_path = _column_path(path, column, meta['generation'])
+            # Drop whatever an interrupted append left past the rows meta.json counts
+            os.truncate(column_path, meta['length'] * values.itemsize)
+            with open(column_path, 'ab') as f:
+                f.write(values.tobytes())
+        meta['length'] += len(new_bars['date'])
+        _write_meta(path, meta)
+        return len(new_bars['date'])
+
+    if keep > 0:
+        stored = load_columns(symbol, interval)
+        new_bars = _fetch_bars(symbol, interval, since=since)
+        bars = {
+            column: np.concatenate([stored[column][:keep], new_bars[column]])
+            for column in STORE_COLUMNS
+        }
+    else:
+        bars = _fetch_bars(symbol, interval)
+
+    generation = meta['generation'] + 1 if meta is not None else 0
+    for column, values in bars.items():
+        values.tofile(_column_path(path, column, generation))
+    _write_meta(path, {'generation': generation, 'length': len(bars['date'])})
+
+    # Readers may have loaded the previous meta.json without mapping its files yet, so
+    # the previous generation stays until the next switch
+    kept = {generation, meta['generation']} if meta is not None else {generation}
+    for column_path in path.glob('*.bin'):
+        if int(column_path.suffixes[0][1:]) not in kept:
+            column_path.unlink(missing_ok=True)
+    return len(bars['date'])
+
+
+def rebuild(symbols: Iterable[str], intervals: Iterable[str]) -> None:
+    """
+    Rebuilds the stored columns of every given symbol and interval from the database.
+
+    Args:
+        symbols (Iterable[str]): The stock symbols.
+        intervals (Iterable[str]): The bar intervals.
+    """
+    intervals = list(intervals)
+    for symbol in symbols:
+        for interval in intervals:
+            count = update_symbol(symbol, interval)
+            logger.info(f"Stored {count} {interval} bars for {symbol} in the price store")
+
+
+def load_price_matrix(
+    symbols: List[str],
+    field: str = 'adj_close',
+    start: Optional[datetime.date] = None,
+    end: Optional[datetime.date] = None,
+    interval: str = 'daily',
+) -> pd.DataFrame:
+    """
+    Builds the same date x symbol matrix as price_matrix.load_price_matrix from the store.
+
+    Each symbol's series is sliced out of its memory-mapped columns with a binary search
+    on the dates and scattered into the matrix, without any database access.
+
+    Args:
+        symbols (List[str]): The symbols to load. They become the matrix columns.
+        field (str): The column to load.
+        start (Optional[datetime.date]): First date to include (inclusive).
+        end (Optional[datetime.date]): Last date to include (inclusive).
+        interval (str): The bar interval ('daily', 'weekly' or 'monthly').
+
+    Returns:
+        pd.DataFrame: A float frame indexed by date with one column per symbol.
+    """
+    series = []
+    for symbol in symbols:
+        columns = load_columns(symbol, interval, ['date', field])
+        dates = columns['date']
+        low = np.searchsorted(dates, np.datetime64(start, 'D')) if start else 0
+        high = np.searchsorted(dates, np.datetime64(end, 'D'), side='right') if end else len(dates)
+        series.append((dates[low:high], columns[field][low:high]))
+
+    index = np.unique(np.concatenate([dates for dates, _ in series] or [np.empty(0, 'datetime64[D]')]))
+    matrix = np.full((len(index), len(symbols)), np.nan)
+    for position, (dates, values) in enumerate(series):
+        matrix[np.searchsorted(index, dates), position] = values
+
+    return pd.DataFrame(matrix, index=pd.Index(index.astype(object), name='date'), columns=symbols)
@@ -0,0 +1,208 @@
+import datetime
+import logging
+from decimal import Decimal
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+from django.db import transaction
+
+from stocks.models import BaseStockData, StockPriceData, StockReturnData
+
+logger = logging.getLogger(__name__)
+
+# Precision StockPriceData.adj_close is stored with, used to compare incoming bars
+ADJ_CLOSE_QUANTUM = Decimal(1).scaleb(-StockPriceData._meta.get_field('adj_close').decimal_places)
+
+
+def first_changed_date(
+    existing: Dict[datetime.date, Decimal],
+    incoming: Dict[datetime.date, Optional[Decimal]],
+) -> Optional[datetime.date]:
+    """
+    Finds the earliest date whose adjusted close is new or differs from what is stored.
+
+    When Alpha Vantage re-adjusts a history after a dividend or split, every bar before
+    the event changes, so the earliest changed date is where the return series has to
+    be recomputed from. For a plain incremental sync it is the first new bar.
+
+    Args:
+        existing (Dict[datetime.date, Decimal]): Stored adj_close values keyed by date.
+        incoming (Dict[datetime.date, Optional[Decimal]]): Freshly parsed adj_close values.
+
+    Returns:
+        Optional[datetime.date]: The earliest changed date, or None if nothing changed.
+    """
+    changed = [
+        date for date, adj_close in incoming.items()
+        if adj_close is not None
+        and existing.get(date) != adj_close.quantize(ADJ_CLOSE_QUANTUM)
+    ]
+    return min(changed, default=None)
+
+
+def compute_log_returns(adj_close: pd.Series) -> pd.Series:
+    """
+    Computes log returns from a date indexed adjusted close series.
+
+    Non-positive prices cannot be logged and are treated as missing, and the first bar
+    (which has no predecessor) is dropped.
+
+    Args:
+        adj_close (pd.Series): Adjusted close prices sorted by date.
+
+    Returns:
+        pd.Series: Log returns indexed by the date of the later bar.
+    """
+    prices = adj_close.astype(float)
+    prices = prices.where(prices > 0)
+    return np.log(prices).diff().iloc[1:].dropna()
+
+
+def update_returns(
+    stock: BaseStockData,
+    interval: str,
+    since: Optional[datetime.date] = None,
+) -> int:
+    """
+    Recomputes the stored log returns of a stock from a given date onwards.
+
+    Only the bars from `since` onwards (plus the one bar before it, needed for the first
+    return) are loaded, so a sync that appends a few new bars only appends a few returns.
+    Passing since=None rebuilds the full history.
+
+    Args:
+        stock (BaseStockData): The stock whose returns to update.
+        interval (str): The bar interval ('daily', 'weekly' or 'monthly').
+        since (Optional[datetime.date]): The earliest bar whose return may have changed.
+
+    Returns:
+        int: The number of return rows written.
+    """
+    prices = StockPriceData.objects.filter(stock=stock, interval=interval)
+    if since is not None:
+        previous_date = (
+            prices.filter(date__lt=since)
+            .order_by('-date')
+            .values_list('date', flat=True)
+            .first()
+        )
+        if previous_date is not None:
+            prices = prices.filter(date__gte=previous_date)
+
+    rows = prices.order_by('date').values_list('date', 'adj_close')
+    frame = pd.DataFrame.from_records(list(rows), columns=['date', 'adj_close'])
+    log_returns = compute_log_returns(frame.set_index('date')['adj_close'])
+
+    stale = StockReturnData.objects.filter(stock=stock, interval=interval)
+    if since is not None:
+        stale = stale.filter(date__gte=since)
+
+    with transaction.atomic():
+        stale.delete()
+        StockReturnData.objects.bulk_create(
+            [
+                StockReturnData(stock=stock, date=date, interval=interval, log_return=value)
+                for date, value in log_returns.items()
+            ],
+            batch_size=1000,
+        )
+    return len(log_returns)
+
+
+def rebuild_returns(stocks: Iterable[BaseStockData], interval: str) -> None:
+    """
+    Rebuilds the full log return history for every given stock.
+
+    Args:
+        stocks (Iterable[BaseStockData]): The stocks to rebuild.
+        interval (str): The bar interval ('daily', 'weekly' or 'monthly').
+    """
+    for stock in stocks:
+        count = update_returns(stock, interval)
+        logger.info(f"Rebuilt {count} {interval} returns for {stock.symbol}")
+
+
+def load_returns(
+    symbol: str,
+    interval: str = 'daily',
+    start: Optional[datetime.date] = None,
+    end: Optional[datetime.date] = None,
+) -> pd.Series:
+    """
+    Loads the stored log returns of a symbol as a date indexed series.
+
+    Args:
+        symbol (str): The stock symbol.
+        interval (str): The bar interval ('daily', 'weekly' or 'monthly').
+        start (Optional[datetime.date]): First date to include (inclusive).
+        end (Optional[datetime.date]): Last date to include (inclusive).
+
+    Returns:
+        pd.Series: Log returns sorted by date.
+    """
+    queryset = StockReturnData.objects.filter(stock_id=symbol, interval=interval)
+    if start:
+        queryset = queryset.filter(date__gte=start)
+    if end:
+        queryset = queryset.filter(date__lte=end)
+    rows = queryset.order_by('date').values_list('date', 'log_return')
+    frame = pd.DataFrame.from_records(list(rows), columns=['date', 'log_return'])
+    return frame.set_index('date')['log_return'].astype(float)
+
+
+def load_return_matrix(
+    symbols: Iterable[str],
+    interval: str = 'daily',
+    start: Optional[datetime.date] = None,
+    end: Optional[datetime.date] = None,
+) -> pd.DataFrame:
+    """
+    Loads the stored log returns of several symbols as a date x symbol matrix, in one query.
+
+    Args:
+        symbols (Iterable[str]): The symbols to load. They become the matrix columns.
+        interval (str): The bar interval ('daily', 'weekly' or 'monthly').
+        start (Optional[datetime.date]): First date to include (inclusive).
+        end (Optional[datetime.date]): Last date to include (inclusive).
+
+    Returns:
+        pd.DataFrame: A float frame indexed by date. Dates on which a symbol has no return
+        are NaN.
+    """
+    symbols = list(symbols)
+    queryset = StockReturnData.objects.filter(stock_id__in=symbols, interval=interval)
+    if start:
+        queryset = queryset.filter(date__gte=start)
+    if end:
+        queryset = queryset.filter(date__lte=end)
+    rows = queryset.order_by('date', 'stock_id').values_list('date', 'stock_id', 'log_return')
+    frame = pd.DataFrame.from_records(list(rows), columns=['date', 'symbol', 'log_return'])
+
+    matrix = frame.pivot(index='date', columns='symbol', values='log_return')
+    matrix = matrix.reindex(columns=symbols).astype(float)
+    matrix.columns.name = None
+    return matrix
+
+
+def summarize_returns(log_returns: pd.Series, window: Optional[int] = None) -> pd.DataFrame:
+    """
+    Adds cumulative and (optionally) rolling simple returns to a log return series.
+
+    Log returns are additive, so both are computed with a cumulative or rolling sum and a
+    single exponentiation.
+
+    Args:
+        log_returns (pd.Series): Log returns sorted by date.
+        window (Optional[int]): Number of bars in the rolling window. No rolling column is
+            added when None.
+
+    Returns:
+        pd.DataFrame: Columns 'log_return', 'cumulative_return' and, if requested,
+        'rolling_return'.
+    """
+    summary = pd.DataFrame({'log_return': log_returns})
+    summary['cumulative_return'] = np.expm1(log_returns.cumsum())
+    if window:
+        summary['rolling_return'] = np.expm1(log_returns.rolling(window).sum())
+    return summary
@@ -0,0 +1,349 @@
+import datetime
+import hashlib
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from django.core.cache import cache
+from django.db.models import Max
+
+from stocks.models import StockReturnData
+from stocks.utils import metrics, returns, versions
+
+DEFAULT_RISK_WINDOW = 252
+MIN_RISK_WINDOW = 20
+# Fifty years of trading days, far more history than is stored
+MAX_RISK_WINDOW = 50 * 252
+
+SHRINKAGE_METHODS = ('none', 'ledoit_wolf')
+
+# Rolling series hold one N x N covariance and correlation matrix per step, so their
+# total number of values (matrices x N^2) is bounded: e.g. 250 matrices of 100 symbols
+MAX_ROLLING_VALUES = 2_500_000
+
+# Symbols missing more than this fraction of the window are left out. Stored log returns
+# span from the previous stored bar, so the few gaps that remain are filled with 0.
+MAX_MISSING_FRACTION = 0.05
+
+# Risk matrices are keyed by the price versions of their symbols, so this only bounds the
+# cache size.
+RISK_CACHE_SECONDS = 24 * 60 * 60
+
+
+def sample_covariance(log_returns: np.ndarray) -> np.ndarray:
+    """
+    Unbiased sample covariance of a T x N return matrix as a single BLAS matrix product.
+    """
+    centred = log_returns - log_returns.mean(axis=0)
+    return centred.T @ centred / (len(log_returns) - 1)
+
+
+def ledoit_wolf(log_returns: np.ndarray) -> Dict[str, object]:
+    """
+    Ledoit-Wolf shrinkage of the sample covariance towards a scaled identity.
+
+    Uses the closed-form optimal shrinkage intensity of Ledoit & Wolf (2004), which stays
+    well conditioned when there are about as many symbols as observations.
+
+    Args:
+        log_returns (np.ndarray): A T x N matrix without missing values.
+
+    Returns:
+        Dict[str, object]: 'covariance' (N x N) and the 'shrinkage' intensity in [0, 1].
+    """
+    observations, count = log_returns.shape
+    centred = log_returns - log_returns.mean(axis=0)
+    covariance = centred.T @ centred / observations
+
+    target = np.trace(covariance) / count
+    distance = ((covariance - target * np.eye(count)) ** 2).sum() / count
+    # Sum over observations of ||x_t x_t' - S||^2, using sum_t x_t x_t' = T * S
+    squared_norms = (centred ** 2).sum(axis=1)
+    variance = ((squared_norms ** 2).sum() / observations - (covariance ** 2).sum()) / (observations * count)
+    shrinkage = min(variance, distance) / distance if distance > 0 else 1.0
+
+    shrunk = shrinkage * target * np.eye(count) + (1 - shrinkage) * covariance
+    return {'covariance': shrunk, 'shrinkage': float(shrinkage)}
+
+
+def covariance_to_correlation(covariance: np.ndarray) -> np.ndarray:
+    """
+    Scales a covariance matrix to unit diagonal.
+    """
+    std = np.sqrt(np.diag(covariance))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        correlation = covariance / np.outer(std, std)
+    np.fill_diagonal(correlation, 1.0)
+    return correlation
+
+
+def load_window(
+    symbols: Iterable[str],
+    window: int = DEFAULT_RISK_WINDOW,
+    end: Optional[datetime.date] = None,
+) -> pd.DataFrame:
+    """
+    Loads the last `window` daily log returns of several symbols ending on or before a date.
+
+    Symbols missing more than MAX_MISSING_FRACTION of the window (e.g. listed within it)
+    are dropped and the remaining gaps are filled with 0, so the result has no missing
+    values. Symbols whose price did not move in the window (e.g. halted) are dropped too,
+    as a zero variance makes their correlations undefined and their optimal weights
+    degenerate.
+
+    Returns:
+        pd.DataFrame: A window x symbol matrix of log returns.
+    """
+    symbols = list(symbols)
+    if end is None:
+        end = (
+            StockReturnData.objects
+            .filter(stock_id__in=symbols, interval='daily')
+            .aggregate(latest=Max('date'))['latest']
+        )
+        if end is None:
+            return pd.DataFrame(columns=[])
+    # Trading days are about 5/7 of calendar days; the margin covers holidays
+    start = end - datetime.timedelta(days=window * 7 // 5 + 30)
+    matrix = returns.load_return_matrix(symbols, start=start, end=end)
+    matrix = matrix.iloc[-window:]
+    if len(matrix) < window:
+        return matrix.iloc[:, :0]
+    matrix = matrix.loc[:, matrix.isna().mean() <= MAX_MISSING_FRACTION].fillna(0.0)
+    return matrix.loc[:, matrix.std() > 0]
+
+
+def estimate_covariance(values: np.ndarray, shrinkage: str = 'none') -> Tuple[np.ndarray, float]:
+    """
+    The covariance of a T x N return matrix without missing values and the shrinkage
+    intensity used (0 for the sample covariance).
+    """
+    if values.shape[1] == 0:
+        return np.empty((0, 0)), 0.0
+    if shrinkage == 'ledoit_wolf':
+        result = ledoit_wolf(values)
+        return result['covariance'], result['shrinkage']
+    return sample_covariance(values), 0.0
+
+
+def _validate(window: int, shrinkage: str) -> None:
+    if not MIN_RISK_WINDOW <= window <= MAX_RISK_WINDOW:
+        raise ValueError(f"Invalid window: {window}. Must be between {MIN_RISK_WINDOW} and {MAX_RISK_WINDOW}.")
+    if shrinkage not in SHRINKAGE_METHODS:
+        raise ValueError(f"Invalid shrinkage: {shrinkage}. Must be one of {', '.join(SHRINKAGE_METHODS)}.")
+
+
+def _validate_rolling_size(matrices: int, count: int) -> None:
+    if matrices * count ** 2 > MAX_ROLLING_VALUES:
+        raise ValueError(
+            f"Too many values: {matrices} matrices of {count} symbols. Use fewer symbols, a larger "
+            f"step or a later start (at most {MAX_ROLLING_VALUES} values, matrices x symbols^2)."
+        )
+
+
+def compute_risk_matrix(
+    symbols: Iterable[str],
+    window: int = DEFAULT_RISK_WINDOW,
+    end: Optional[datetime.date] = None,
+    shrinkage: str = 'none',
+) -> Dict[str, object]:
+    """
+    Computes the covariance and correlation matrices of daily log returns over a
+    trailing window.
+
+    Args:
+        symbols (Iterable[str]): The symbols to include.
+        window (int): The number of daily returns, from MIN_RISK_WINDOW to
+            MAX_RISK_WINDOW.
+        end (Optional[datetime.date]): Last date of the window (default: latest).
+        shrinkage (str): 'none' for the sample covariance or 'ledoit_wolf'.
+
+    Returns:
+        Dict[str, object]: 'symbols' (those load_window keeps), 'excluded', 'start' and
+        'end' dates of the window, the daily 'mean' log returns (N), 'covariance' and
+        'correlation' (N x N arrays) and the 'shrinkage' intensity (0 for the sample
+        covariance).
+
+    Raises:
+        ValueError: If the window or the shrinkage method is invalid.
+    """
+    _validate(window, shrinkage)
+
+    symbols = list(symbols)
+    matrix = load_window(symbols, window, end)
+    values = matrix.to_numpy(dtype=float)
+    covariance, intensity = estimate_covariance(values, shrinkage)
+
+    included = list(matrix.columns)
+    return {
+        'symbols': included,
+        'excluded': [symbol for symbol in symbols if symbol not in set(included)],
+        'start': matrix.index[0] if len(matrix) else None,
+        'end': matrix.index[-1] if len(matrix) else None,
+        'mean': values.mean(axis=0) if len(values) else np.empty(0),
+        'covariance': covariance,
+        'correlation': covariance_to_correlation(covariance),
+        'shrinkage': intensity,
+    }
+
+
+def rolling_risk(
+    log_returns: pd.DataFrame,
+    window: int = DEFAULT_RISK_WINDOW,
+    step: int = 1,
+    start: Optional[datetime.date] = None,
+    shrinkage: str = 'none',
+) -> Dict[str, object]:
+    """
+    Computes covariance and correlation matrices over a trailing window that rolls
+    through a return matrix, every `step` trading days back from its last date.
+
+    Each window applies the same rules as load_window: a symbol missing more than
+    MAX_MISSING_FRACTION of it or without variance in it gets NaN rows and columns in
+    that window's matrices, and the remaining gaps are filled with 0.
+
+    Args:
+        log_returns (pd.DataFrame): Date x symbol daily log returns (NaN if missing).
+        window (int): The number of daily returns per matrix, from MIN_RISK_WINDOW to
+            MAX_RISK_WINDOW.
+        step (int): Trading days between consecutive window ends.
+        start (Optional[datetime.date]): The earliest window end to include.
+        shrinkage (str): 'none' for the sample covariance or 'ledoit_wolf'.
+
+    Returns:
+        Dict[str, object]: The 'symbols' (the columns), the window end 'dates' in
+        ascending order, 'covariance' and 'correlation' (dates x N x N arrays) and the
+        'shrinkage' intensity of each window.
+
+    Raises:
+        ValueError: If the window, step or shrinkage method is invalid, or the matrices
+            would hold more than MAX_ROLLING_VALUES values.
+    """
+    _validate(window, shrinkage)
+    if step < 1:
+        raise ValueError(f"Invalid step: {step}. Must be at least 1.")
+    _validate_rolling_size(1, log_returns.shape[1])
+
+    values = log_returns.to_numpy(dtype=float)
+    ends = np.arange(len(values) - 1, window - 2, -step)[::-1]
+    if start is not None:
+        ends = ends[np.array(log_returns.index[ends] >= start, dtype=bool)]
+    count = values.shape[1]
+    _validate_rolling_size(len(ends), count)
+
+    covariance = np.full((len(ends), count, count), np.nan)
+    intensities = np.zeros(len(ends))
+    for position, end in enumerate(ends):
+        window_values = values[end - window + 1:end + 1]
+        missing = np.isnan(window_values)
+        filled = np.where(missing, 0.0, window_values)
+        included = np.flatnonzero((missing.mean(axis=0) <= MAX_MISSING_FRACTION) & (filled.std(axis=0) > 0))
+        block, intensities[position] = estimate_covariance(filled[:, included], shrinkage)
+        covariance[position][np.ix_(included, included)] = block
+
+    std = np.sqrt(np.diagonal(covariance, axis1=1, axis2=2))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        correlation = covariance / (std[:, :, None] * std[:, None, :])
+    diagonal = np.arange(count)
+    correlation[:, diagonal, diagonal] = np.where(np.isnan(std), np.nan, 1.0)
+    return {
+        'symbols': list(log_returns.columns),
+        'dates': list(log_returns.index[ends]),
+        'covariance': covariance,
+        'correlation': correlation,
+        'shrinkage': intensities,
+    }
+
+
+def compute_rolling_risk(
+    symbols: Iterable[str],
+    window: int = DEFAULT_RISK_WINDOW,
+    step: int = 1,
+    start: Optional[datetime.date] = None,
+    end: Optional[datetime.date] = None,
+    shrinkage: str = 'none',
+) -> Dict[str, object]:
+    """
+    Loads the daily log returns of several symbols, with `window` trading days of
+    history before `start`, in one query and computes rolling_risk over them.
+
+    Args:
+        symbols (Iterable[str]): The symbols to include.
+        window (int): The number of daily returns per matrix, from MIN_RISK_WINDOW to
+            MAX_RISK_WINDOW.
+        step (int): Trading days between consecutive window ends.
+        start (Optional[datetime.date]): The earliest window end (default: as many
+            windows as the stored history allows).
+        end (Optional[datetime.date]): The last window end (default: latest).
+        shrinkage (str): 'none' for the sample covariance or 'ledoit_wolf'.
+
+    Returns:
+        Dict[str, object]: See rolling_risk.
+
+    Raises:
+        ValueError: See rolling_risk. Too many symbols for even one matrix are rejected
+            before any returns are loaded.
+    """
+    _validate(window, shrinkage)
+    symbols = list(symbols)
+    _validate_rolling_size(1, len(symbols))
+    # Trading days are about 5/7 of calendar days; the margin covers holidays
+    history_start = start - datetime.timedelta(days=window * 7 // 5 + 30) if start else None
+    log_returns = returns.load_return_matrix(symbols, start=history_start, end=end)
+    return rolling_risk(log_returns, window, step, start, shrinkage)
+
+
+def risk_cache_key(prefix: str, symbols: Iterable[str], *parts) -> str:
+    """
+    Builds a cache key for a result derived from the returns of a symbol set.
+
+    The symbols are hashed to keep the key short for large universes, and the key
+    includes their total price version so a sync of any of them invalidates it.
+    """
+    symbols = list(symbols)
+    version = versions.get_total_version(versions.prices_key(symbol) for symbol in symbols)
+    digest = hashlib.md5(','.join(symbols).encode()).hexdigest()
+    return ':'.join([prefix, digest, str(version), *map(str, parts)])
+
+
+def get_risk_matrix(
+    symbols: Iterable[str],
+    window: int = DEFAULT_RISK_WINDOW,
+    end: Optional[datetime.date] = None,
+    shrinkage: str = 'none',
+) -> Dict[str, object]:
+    """
+    Returns compute_risk_matrix, cached by symbol set, window, end date and shrinkage.
+
+    The cache key includes the total price version of the symbols, so a sync of any of
+    them invalidates the entry.
+    """
+    symbols = list(symbols)
+    cache_key = risk_cache_key('risk', symbols, window, end, shrinkage)
+
+    result = metrics.cache_lookup('risk', cache_key)
+    if result is None:
+        result = compute_risk_matrix(symbols, window, end, shrinkage)
+        cache.set(cache_key, result, RISK_CACHE_SECONDS)
+    return result
+
+
+def get_rolling_risk(
+    symbols: Iterable[str],
+    window: int = DEFAULT_RISK_WINDOW,
+    step: int = 1,
+    start: Optional[datetime.date] = None,
+    end: Optional[datetime.date] = None,
+    shrinkage: str = 'none',
+) -> Dict[str, object]:
+    """
+    Returns compute_rolling_risk, cached like get_risk_matrix.
+    """
+    symbols = list(symbols)
+    cache_key = risk_cache_key('rolling_risk', symbols, window, step, start, end, shrinkage)
+
+    result = metrics.cache_lookup('rolling_risk', cache_key)
+    if result is None:
+        result = compute_rolling_risk(symbols, window, step, start, end, shrinkage)
+        cache.set(cache_key, result, RISK_CACHE_SECONDS)
+    return result
@@ -0,0 +1,136 @@
+import re
+from typing import Iterable, List, Optional
+
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.db.models import F
+
+from stocks.models import BaseStockData, LatestStockOverview, StockOverviewFields
+
+# Attributes of the stock itself that can be screened on, mapped to their lookups
+STOCK_FIELDS = {
+    'name': 'stock__name',
+    'sector': 'stock__sector',
+    'industry': 'stock__industry',
+    'exchange': 'stock__exchange',
+    'is_sp500': 'stock__is_sp500',
+}
+
+OPERATORS = {
+    '<=': 'lte',
+    '>=': 'gte',
+    '!=': 'exact',
+    '=': 'exact',
+    '<': 'lt',
+    '>': 'gt',
+}
+
+DEFAULT_SCREEN_LIMIT = 100
+MAX_SCREEN_LIMIT = 1000
+
+FILTER_PATTERN = re.compile(r'^\s*(\w+)\s*(<=|>=|!=|=|<|>)\s*(.+?)\s*$')
+
+
+def _lookup(name: str) -> str:
+    """
+    Maps a screen field name onto its ORM lookup path.
+
+    Raises:
+        ValueError: If the field cannot be screened on.
+    """
+    if name in STOCK_FIELDS:
+        return STOCK_FIELDS[name]
+    if name in StockOverviewFields.metric_field_names():
+        return name
+    raise ValueError(f"Unknown screen field: {name}.")
+
+
+def _to_python(lookup: str, value: str):
+    """
+    Converts a filter value from the query string into the type of its model field.
+    """
+    if lookup.startswith('stock__'):
+        field = BaseStockData._meta.get_field(lookup[len('stock__'):])
+    else:
+        field = LatestStockOverview._meta.get_field(lookup)
+    if isinstance(field, models.BooleanField):
+        value = value.capitalize()
+    try:
+        return field.to_python(value)
+    except ValidationError:
+        raise ValueError(f"Invalid value for {field.name}: {value}.")
+
+
+def screen(
+    filters: Iterable[str] = (),
+    sort: Optional[str] = None,
+    fields: Optional[Iterable[str]] = None,
+    limit: int = DEFAULT_SCREEN_LIMIT,
+) -> List[dict]:
+    """
+    Screens the latest overview of every stock with filter expressions.
+
+    Runs as a single query against the LatestStockOverview snapshot (joined to its stock),
+    so a full-universe screen never has to find each stock's latest quarter.
+
+    Args:
+        filters (Iterable[str]): Expressions like "pe_ratio<20" or "sector=Technology".
+            Supported operators are <, <=, >, >=, = and !=. All filters must match.
+        sort (Optional[str]): Comma separated sort fields, with a leading '-' for
+            descending order. Missing values sort last.
+        fields (Optional[Iterable[str]]): The metrics to return (default: all).
+        limit (int): The maximum number of rows, at most MAX_SCREEN_LIMIT.
+
+    Returns:
+        List[dict]: One dictionary per matching stock with its symbol, name, sector and
+        the requested metrics.
+
+    Raises:
+        ValueError: If a filter, sort key, field or the limit is invalid.
+    """
+    if not 1 <= limit <= MAX_SCREEN_LIMIT:
+        raise ValueError(f"Invalid limit: {limit}. Must be between 1 and {MAX_SCREEN_LIMIT}.")
+
+    queryset = LatestStockOverview.objects.all()
+    for expression in filters:
+        match = FILTER_PATTERN.match(expression)
+        if not match:
+            raise ValueError(f"Invalid filter: {expression}. Expected e.g. pe_ratio<20.")
+        name, operator, raw_value = match.groups()
+        lookup = _lookup(name)
+        condition = {f'{lookup}__{OPERATORS[operator]}': _to_python(lookup, raw_value)}
+        if operator == '!=':
+            queryset = queryset.exclude(**condition)
+        else:
+            queryset = queryset.filter(**condition)
+
+    ordering = []
+    for key in (sort or 'symbol').split(','):
+        key = key.strip()
+        descending = key.startswith('-')
+        name = key.lstrip('-')
+        expression = F('stock_id') if name == 'symbol' else F(_lookup(name))
+        ordering.append(expression.desc(nulls_last=True) if descending else expression.asc(nulls_last=True))
+
+    if fields is None:
+        fields = StockOverviewFields.metric_field_names()
+    else:
+        fields = list(fields)
+        for name in fields:
+            if name not in StockOverviewFields.metric_field_names():
+                raise ValueError(f"Unknown screen field: {name}.")
+
+    rows = (
+        queryset
+        .order_by(*ordering)
+        .values('stock_id', 'stock__name', 'stock__sector', *fields)[:limit]
+    )
+    return [
+        {
+            'symbol': row.pop('stock_id'),
+            'name': row.pop('stock__name'),
+            'sector': row.pop('stock__sector'),
+            **row,
+        }
+        for row in rows
+    ]
@@ -0,0 +1,270 @@
+import bisect
+import re
+import threading
+import time
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from stocks.models import BaseStockData
+from stocks.utils import versions
+
+DEFAULT_SEARCH_LIMIT = 10
+MAX_SEARCH_LIMIT = 100
+
+# How often a process checks whether the stock directory changed since its index was built
+SEARCH_INDEX_CHECK_SECONDS = 30
+
+# Substrings are matched through n-gram posting lists; shorter queries only match prefixes
+NGRAM_SIZE = 3
+MIN_SUBSTRING_LENGTH = 2
+# One more than the largest code point, so that n-gram codes are unique (and fit in int64)
+CODE_BASE = 0x110000
+# Substring candidates checked per step
+SUBSTRING_CHUNK_SIZE = 256
+
+WORD_PATTERN = re.compile(r'\w+')
+
+# Match kinds, from the best to the weakest match
+MATCH_KINDS = ['symbol', 'symbol_prefix', 'name_prefix', 'word_prefix', 'substring']
+
+
+def normalize(text: str) -> str:
+    """
+    Upper-cases text and collapses runs of whitespace, the form queries and keys are
+    compared in.
+    """
+    return ' '.join(text.upper().split())
+
+
+def _prefix_range(keys: List[str], prefix: str) -> Tuple[int, int]:
+    """
+    The [start, end) range of the sorted keys that start with the prefix.
+    """
+    return bisect.bisect_left(keys, prefix), bisect.bisect_left(keys, prefix + '\uffff')
+
+
+class SymbolIndex:
+    """
+    An in-memory search index over the symbols and names of every stock.
+
+    Stocks are numbered in static rank order (S&P 500 members first, then shorter
+    symbols, then alphabetically), so within a kind of match the best results are simply
+    the smallest ids. Prefix matches are ranges of sorted key arrays found by binary
+    search, and substring matches intersect the posting lists of the query's n-grams.
+    """
+
+    def __init__(self, stocks: Iterable[Tuple[str, str, bool]], version: int = 0):
+        """
+        Args:
+            stocks (Iterable[Tuple[str, str, bool]]): (symbol, name, is_sp500) rows.
+            version (int): The stock directory version the rows were read at.
+        """
+        stocks = sorted(stocks, key=lambda row: (not row[2], len(row[0]), row[0]))
+        self.version = version
+        self.symbols = [symbol for symbol, _, _ in stocks]
+        self.names = [name for _, name, _ in stocks]
+        self.is_sp500 = [is_sp500 for _, _, is_sp500 in stocks]
+        symbol_keys = [normalize(symbol) for symbol in self.symbols]
+        name_keys = [normalize(name) for name in self.names]
+        self._exact = {key: position for position, key in enumerate(symbol_keys)}
+
+        def sorted_keys(pairs: List[Tuple[str, int]]) -> Tuple[List[str], np.ndarray]:
+            pairs.sort()
+            return [key for key, _ in pairs], np.array([position for _, position in pairs], dtype=np.int64)
+
+        self._symbol_keys, self._symbol_ids = sorted_keys([(key, i) for i, key in enumerate(symbol_keys)])
+        self._name_keys, self._name_ids = sorted_keys([(key, i) for i, key in enumerate(name_keys)])
+        self._word_keys, self._word_ids = sorted_keys([
+            (word, i) for i, key in enumerate(name_keys) for word in set(WORD_PATTERN.findall(key))
+        ])
+
+        self._texts = [f'{symbol}\n{name}' for symbol, name in zip(symbol_keys, name_keys)]
+        self._build_postings()
+
+    def _build_postings(self) -> None:
+        """
+        Builds the n-gram posting lists of the symbol and name texts with array operations.
+
+        Every n-gram is encoded as an integer in base CODE_BASE, the (code, stock) pairs of
+        all texts are sorted and deduplicated, and each posting list is a contiguous slice
+        of the resulting stock ids. Texts are joined with newlines, which queries never
+        contain, so n-grams spanning two texts are never looked up.
+        """
+        joined = '\n'.join(self._texts)
+        characters = np.frombuffer(joined.encode('utf-32-le'), dtype=np.uint32).astype(np.int64)
+        owners = np.repeat(np.arange(len(self._texts)), [len(text) + 1 for text in self._texts])
+        codes, ids = [], []
+        for size in range(MIN_SUBSTRING_LENGTH, NGRAM_SIZE + 1):
+            count = len(characters) - size + 1
+            if count <= 0:
+                continue
+            code = np.zeros(count, dtype=np.int64)
+            for offset in range(size):
+                code = code * CODE_BASE + characters[offset:offset + count]
+            codes.append(code)
+            ids.append(owners[:count])
+        codes = np.concatenate(codes) if codes else np.empty(0, dtype=np.int64)
+        ids = np.concatenate(ids) if ids else np.empty(0, dtype=np.int64)
+
+        # Ids ascend within each n-gram size, so a stable sort by code leaves them sorted
+        order = np.argsort(codes, kind='stable')
+        codes, ids = codes[order], ids[order]
+        new_code = np.ones(len(codes), dtype=bool)
+        new_code[1:] = codes[1:] != codes[:-1]
+        keep = new_code.copy()
+        keep[1:] |= ids[1:] != ids[:-1]
+        codes, ids, new_code = codes[keep], ids[keep], new_code[keep]
+        self._gram_codes = codes[new_code]
+        self._gram_starts = np.append(np.flatnonzero(new_code), len(codes))
+        self._gram_ids = ids
+
+    def _posting(self, gram: str) -> np.ndarray:
+        """
+        The sorted ids of the stocks whose symbol or name contains the n-gram.
+        """
+        code = 0
+        for character in gram:
+            code = code * CODE_BASE + ord(character)
+        position = np.searchsorted(self._gram_codes, code)
+        if position == len(self._gram_codes) or self._gram_codes[position] != code:
+            return np.empty(0, dtype=np.int64)
+        return self._gram_ids[self._gram_starts[position]:self._gram_starts[position + 1]]
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def _prefix_ids(self, keys: List[str], ids: np.ndarray, query: str) -> np.ndarray:
+        start, end = _prefix_range(keys, query)
+        return ids[start:end]
+
+    def _substring_ids(self, query: str, limit: int) -> np.ndarray:
+        """
+        The best `limit` stocks whose symbol or name contains the query.
+
+        Candidates must contain every n-gram of the query. The rarest n-gram's posting
+        list is walked in id (rank) order a chunk at a time, so a common query stops after
+        its first chunk instead of intersecting whole posting lists.
+        """
+        size = min(NGRAM_SIZE, len(query))
+        grams = {query[start:start + size] for start in range(len(query) - size + 1)}
+        rarest, *others = sorted((self._posting(gram) for gram in grams), key=len)
+        matches = []
+        for offset in range(0, len(rarest), SUBSTRING_CHUNK_SIZE):
+            candidates = rarest[offset:offset + SUBSTRING_CHUNK_SIZE]
+            for posting in others:
+                # Both lists are sorted, so each candidate is looked up by binary search
+                found = np.minimum(np.searchsorted(posting, candidates), len(posting) - 1)
+                candidates = candidates[posting[found] == candidates]
+            for position in candidates.tolist():
+                if size == len(query) or query in self._texts[position]:
+                    matches.append(position)
+                    if len(matches) == limit:
+                        return np.array(matches, dtype=np.int64)
+        return np.array(matches, dtype=np.int64)
+
+    def search(self, query: str, limit: int = DEFAULT_SEARCH_LIMIT) -> List[dict]:
+        """
+        Finds the best matching stocks for a query.
+
+        Results are ranked by kind of match (see MATCH_KINDS): an exact symbol, a symbol
+        prefix, a name prefix, a prefix of a word in the name, then a substring of the
+        symbol or name. Within a kind, S&P 500 members rank first, then shorter symbols.
+
+        Args:
+            query (str): The text typed so far (case-insensitive).
+            limit (int): The maximum number of results.
+
+        Returns:
+            List[dict]: Up to `limit` matches with their symbol, name, is_sp500 flag and
+            kind of match.
+        """
+        query = normalize(query)
+        if not query or not len(self):
+            return []
+
+        matches = []
+        taken = set()
+
+        def take(ids: np.ndarray, kind: str) -> None:
+            if not len(ids):
+                return
+            # A stock matches a word prefix once per matching word, so the ids are
+            # deduplicated first. At most len(matches) of the `limit` smallest ids are
+            # already taken, which leaves enough new ones to fill the results
+            for position in np.unique(ids)[:limit].tolist():
+                if len(matches) == limit:
+                    return
+                if position not in taken:
+                    taken.add(position)
+                    matches.append((position, kind))
+
+        exact = self._exact.get(query)
+        if exact is not None:
+            take(np.array([exact]), 'symbol')
+        take(self._prefix_ids(self._symbol_keys, self._symbol_ids, query), 'symbol_prefix')
+        if len(matches) < limit:
+            take(self._prefix_ids(self._name_keys, self._name_ids, query), 'name_prefix')
+        if len(matches) < limit:
+            take(self._prefix_ids(self._word_keys, self._word_ids, query), 'word_prefix')
+        if len(matches) < limit and len(query) >= MIN_SUBSTRING_LENGTH:
+            take(self._substring_ids(query, limit), 'substring')
+
+        return [
+            {
+                'symbol': self.symbols[position],
+                'name': self.names[position],
+                'is_sp500': self.is_sp500[position],
+                'match': kind,
+            }
+            for position, kind in matches
+        ]
+
+
+_index: Optional[SymbolIndex] = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def build_index() -> SymbolIndex:
+    """
+    Builds a SymbolIndex over every stock with one query.
+    """
+    version = versions.get_version(versions.STOCKS_KEY)
+    return SymbolIndex(BaseStockData.objects.values_list('symbol', 'name', 'is_sp500'), version)
+
+
+def get_index() -> SymbolIndex:
+    """
+    Returns this process's index, building it on first use.
+
+    At most every SEARCH_INDEX_CHECK_SECONDS the stock directory version is compared with
+    the version the index was built at, and the index is rebuilt if an overview sync has
+    changed the stocks since. Concurrent requests keep using the previous index while a
+    rebuild runs.
+    """
+    global _index, _checked_at
+    if _index is not None and time.monotonic() - _checked_at < SEARCH_INDEX_CHECK_SECONDS:
+        return _index
+    if not _lock.acquire(blocking=_index is None):
+        return _index
+    try:
+        if _index is None or time.monotonic() - _checked_at >= SEARCH_INDEX_CHECK_SECONDS:
+            if _index is None or versions.get_version(versions.STOCKS_KEY) != _index.version:
+                _index = build_index()
+            _checked_at = time.monotonic()
+    finally:
+        _lock.release()
+    return _index
+
+
+def search(query: str, limit: int = DEFAULT_SEARCH_LIMIT) -> List[dict]:
+    """
+    Searches every stock by symbol and name (see SymbolIndex.search).
+
+    Raises:
+        ValueError: If the limit is invalid.
+    """
+    if not 1 <= limit <= MAX_SEARCH_LIMIT:
+        raise ValueError(f"Invalid limit: {limit}. Must be between 1 and {MAX_SEARCH_LIMIT}.")
+    return get_index().search(query, limit)
@@ -0,0 +1,205 @@
+import logging
+from typing import Dict, List, Type
+
+import numpy as np
+import pandas as pd
+from django.db import models, transaction
+
+from stocks.models import (
+    BaseStockData,
+    EarningsData,
+    LatestStockOverview,
+    QuarterlyStockOverview,
+    SectorEarningsData,
+    SectorIndexData,
+    SectorValuationData,
+)
+from stocks.utils import price_matrix
+
+logger = logging.getLogger(__name__)
+
+# BaseStockData fields stocks are grouped by, one aggregate level each
+LEVELS = ('sector', 'industry')
+
+INDEX_BASE_LEVEL = 100.0
+
+VALUATION_FIELDS = [
+    'pe_ratio',
+    'forward_pe',
+    'peg_ratio',
+    'price_to_book_ratio',
+    'price_to_sales_ratio_ttm',
+    'ev_to_revenue',
+    'ev_to_ebitda',
+    'dividend_yield',
+]
+
+
+def _groups(stocks: pd.DataFrame, level: str) -> pd.DataFrame:
+    """
+    One-hot membership matrix (symbol x group) of the stocks with a known group.
+    """
+    names = stocks[level].replace('', np.nan).dropna()
+    return pd.get_dummies(names).astype(float)
+
+
+def compute_index_levels(
+    adj_close: pd.DataFrame,
+    caps: pd.DataFrame,
+    membership: pd.DataFrame,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Computes equal-weighted and cap-weighted index levels for every group at once.
+
+    Group returns are matrix products of the date x symbol return matrix with the
+    symbol x group membership matrix: the equal-weighted return is the mean member return
+    and the cap-weighted return weights each member by its previous day's market cap.
+
+    Args:
+        adj_close (pd.DataFrame): Date x symbol adjusted closes.
+        caps (pd.DataFrame): Date x symbol market capitalizations (same shape).
+        membership (pd.DataFrame): Symbol x group 0/1 matrix.
+
+    Returns:
+        Dict[str, pd.DataFrame]: Date x group 'equal_weight_level', 'cap_weight_level'
+        and 'constituents' (members with a return on each day).
+    """
+    symbols = membership.index
+    prices = adj_close.reindex(columns=symbols).to_numpy(dtype=float)
+    weights = membership.to_numpy()
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        daily = prices[1:] / prices[:-1] - 1
+    valid = np.isfinite(daily)
+    daily = np.where(valid, daily, 0.0)
+
+    counts = valid.astype(float) @ weights
+    with np.errstate(divide='ignore', invalid='ignore'):
+        equal = np.where(counts > 0, (daily @ weights) / counts, 0.0)
+
+    previous_caps = np.nan_to_num(caps.reindex(columns=symbols).to_numpy(dtype=float)[:-1], nan=0.0)
+    previous_caps = np.where(valid, previous_caps, 0.0)
+    cap_totals = previous_caps @ weights
+    with np.errstate(divide='ignore', invalid='ignore'):
+        capped = np.where(cap_totals > 0, ((daily * previous_caps) @ weights) / cap_totals, 0.0)
+
+    def levels(group_returns: np.ndarray) -> pd.DataFrame:
+        values = INDEX_BASE_LEVEL * np.cumprod(np.vstack([np.zeros(weights.shape[1]), group_returns]) + 1, axis=0)
+        return pd.DataFrame(values, index=adj_close.index, columns=membership.columns)
+
+    constituents = np.vstack([np.isfinite(prices[:1]).astype(float) @ weights, counts])
+    cap_levels = levels(capped)
+    # Groups without any market cap have no cap-weighted index
+    cap_levels.loc[:, cap_totals.sum(axis=0) == 0] = np.nan
+    return {
+        'equal_weight_level': levels(equal),
+        'cap_weight_level': cap_levels,
+        'constituents': pd.DataFrame(constituents, index=adj_close.index, columns=membership.columns),
+    }
+
+
+def _group_records(
+    model_class: Type[models.Model],
+    level: str,
+    frame: pd.DataFrame,
+    date_field: str,
+) -> List[models.Model]:
+    """
+    Converts a frame indexed by (group name, date) into unsaved aggregate rows.
+    """
+    values = frame.astype(object).where(frame.notna(), None)
+    return [
+        model_class(level=level, name=name, **{date_field: date}, **row)
+        for (name, date), row in zip(values.index, values.to_dict(orient='records'))
+    ]
+
+
+def rebuild_sector_aggregates() -> Dict[str, int]:
+    """
+    Recomputes every sector and industry aggregate table over the full universe.
+
+    Each input (adjusted and raw closes, latest shares outstanding, quarterly overviews,
+    quarterly earnings) is loaded with a single query and aggregated in vectorized
+    passes, then the aggregate tables are replaced in one transaction. Meant to run
+    nightly after the syncs, via the rebuild_sector_aggregates command.
+
+    Cap weights use the latest shares outstanding times each day's close.
+
+    Returns:
+        Dict[str, int]: The number of rows written per table.
+    """
+    stocks = pd.DataFrame.from_records(
+        list(BaseStockData.objects.values_list('symbol', *LEVELS)), columns=['symbol', *LEVELS]
+    ).set_index('symbol')
+    symbols = list(stocks.index)
+
+    adj_close = price_matrix.load_price_matrix(symbols, 'adj_close')
+    closes = price_matrix.load_price_matrix(symbols, 'close').reindex(adj_close.index)
+    shares = pd.Series(dict(
+        LatestStockOverview.objects
+        .filter(shares_outstanding__isnull=False)
+        .values_list('stock_id', 'shares_outstanding')
+    ), dtype=float)
+    caps = closes * shares.reindex(closes.columns).to_numpy()
+
+    overviews = pd.DataFrame.from_records(
+        list(QuarterlyStockOverview.objects.values_list('stock_id', 'quarter_end_date', *VALUATION_FIELDS)),
+        columns=['symbol', 'quarter_end_date', *VALUATION_FIELDS],
+    )
+    overviews[VALUATION_FIELDS] = overviews[VALUATION_FIELDS].astype(float)
+    earnings = pd.DataFrame.from_records(
+        list(
+            EarningsData.objects
+            .filter(report_type='quarterly', surprise_percentage__isnull=False)
+            .values_list('stock_id', 'fiscal_date_ending', 'surprise_percentage')
+        ),
+        columns=['symbol', 'fiscal_date_ending', 'surprise_percentage'],
+    )
+    earnings['surprise_percentage'] = earnings['surprise_percentage'].astype(float)
+
+    index_rows, valuation_rows, earnings_rows = [], [], []
+    for level in LEVELS:
+        membership = _groups(stocks, level)
+        if not membership.empty and not adj_close.empty:
+            series = compute_index_levels(adj_close, caps, membership)
+            stacked = pd.DataFrame({
+                name: frame.unstack() for name, frame in series.items()
+            })
+            stacked = stacked[stacked['constituents'] > 0]
+            stacked['constituents'] = stacked['constituents'].astype(int)
+            index_rows += _group_records(SectorIndexData, level, stacked, 'date')
+
+        groups = stocks[level].replace('', np.nan)
+        valuations = overviews.assign(name=overviews['symbol'].map(groups)).dropna(subset=['name'])
+        grouped = valuations.groupby(['name', 'quarter_end_date'])
+        valuation = grouped[VALUATION_FIELDS].median()
+        valuation['constituents'] = grouped.size()
+        valuation_rows += _group_records(SectorValuationData, level, valuation, 'quarter_end_date')
+
+        surprises = earnings.assign(name=earnings['symbol'].map(groups)).dropna(subset=['name'])
+        surprises['beat'] = (surprises['surprise_percentage'] > 0).astype(float)
+        grouped = surprises.groupby(['name', 'fiscal_date_ending'])
+        surprise = pd.DataFrame({
+            'mean_surprise_percentage': grouped['surprise_percentage'].mean(),
+            'median_surprise_percentage': grouped['surprise_percentage'].median(),
+            'beat_rate': grouped['beat'].mean(),
+            'constituents': grouped.size(),
+        })
+        earnings_rows += _group_records(SectorEarningsData, level, surprise, 'fiscal_date_ending')
+
+    with transaction.atomic():
+        for model_class, rows in [
+            (SectorIndexData, index_rows),
+            (SectorValuationData, valuation_rows),
+            (SectorEarningsData, earnings_rows),
+        ]:
+            model_class.objects.all().delete()
+            model_class.objects.bulk_create(rows, batch_size=5000)
+
+    counts = {
+        'index': len(index_rows),
+        'valuation': len(valuation_rows),
+        'earnings': len(earnings_rows),
+    }
+    logger.info(f"Rebuilt sector aggregates: {counts}")
+    return counts
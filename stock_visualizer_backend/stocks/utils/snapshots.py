@@ -0,0 +1,77 @@
+import logging
+from typing import Iterable, Optional
+
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+
+from stocks.models import BaseStockData, LatestStockOverview, QuarterlyStockOverview, StockOverviewFields
+
+logger = logging.getLogger(__name__)
+
+
+def refresh_latest_overviews(stocks: Optional[Iterable[BaseStockData]] = None) -> int:
+    """
+    Rebuilds the LatestStockOverview snapshot from QuarterlyStockOverview.
+
+    The latest row of every stock is selected in one query (a correlated max
+    quarter_end_date subquery) and the snapshot rows are replaced in bulk.
+
+    Args:
+        stocks (Optional[Iterable[BaseStockData]]): Only refresh these stocks (default: all).
+
+    Returns:
+        int: The number of snapshot rows written.
+    """
+    latest_date = (
+        QuarterlyStockOverview.objects
+        .filter(stock=OuterRef('stock'))
+        .order_by('-quarter_end_date')
+        .values('quarter_end_date')[:1]
+    )
+    overviews = QuarterlyStockOverview.objects.filter(quarter_end_date=Subquery(latest_date))
+    snapshots = LatestStockOverview.objects.all()
+    if stocks is not None:
+        stocks = list(stocks)
+        overviews = overviews.filter(stock__in=stocks)
+        snapshots = snapshots.filter(stock__in=stocks)
+
+    field_names = StockOverviewFields.metric_field_names()
+    rows = overviews.values('stock_id', *field_names)
+
+    with transaction.atomic():
+        snapshots.delete()
+        created = LatestStockOverview.objects.bulk_create(
+            [LatestStockOverview(**row) for row in rows],
+            batch_size=1000,
+        )
+    logger.info(f"Refreshed {len(created)} latest overview snapshots")
+    return len(created)
+
+
+def update_latest_overview(overview: QuarterlyStockOverview) -> bool:
+    """
+    Copies a freshly synced overview row into the LatestStockOverview snapshot.
+
+    The snapshot is only replaced when the row is at least as recent as the one it
+    holds, so re-syncing an older quarter never rolls the snapshot back.
+
+    Args:
+        overview (QuarterlyStockOverview): The overview row that was just written.
+
+    Returns:
+        bool: Whether the snapshot was updated.
+    """
+    current_date = (
+        LatestStockOverview.objects
+        .filter(pk=overview.stock_id)
+        .values_list('quarter_end_date', flat=True)
+        .first()
+    )
+    if current_date is not None and current_date > overview.quarter_end_date:
+        return False
+
+    LatestStockOverview.objects.update_or_create(
+        stock_id=overview.stock_id,
+        defaults={name: getattr(overview, name) for name in StockOverviewFields.metric_field_names()},
+    )
+    return True
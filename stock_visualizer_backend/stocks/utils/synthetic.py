@@ -0,0 +1,507 @@
+import datetime
+import random
+from typing import Callable, Dict, List, Optional
+
+# Synthetic histories end here rather than today, so payloads are the same on every run
+END_DATE = datetime.date(2024, 12, 31)
+
+# Payload sizes: bars per price series, reports per statement type, points per economic series
+SIZES = {
+    'small': {'bars': 250, 'annual': 5, 'quarterly': 20, 'points': 120},
+    'medium': {'bars': 2500, 'annual': 15, 'quarterly': 60, 'points': 600},
+    'large': {'bars': 6000, 'annual': 25, 'quarterly': 100, 'points': 2500},
+}
+DEFAULT_SIZE = 'small'
+
+# The share of statement and overview values sent as "None", as Alpha Vantage does for
+# items a company does not report
+MISSING_SHARE = 0.05
+
+INCOME_STATEMENT_FIELDS = [
+    'grossProfit', 'totalRevenue', 'costOfRevenue', 'costofGoodsAndServicesSold', 'operatingIncome',
+    'sellingGeneralAndAdministrative', 'researchAndDevelopment', 'operatingExpenses',
+    'investmentIncomeNet', 'netInterestIncome', 'interestIncome', 'interestExpense',
+    'nonInterestIncome', 'otherNonOperatingIncome', 'depreciation', 'depreciationAndAmortization',
+    'incomeBeforeTax', 'incomeTaxExpense', 'interestAndDebtExpense',
+    'netIncomeFromContinuingOperations', 'comprehensiveIncomeNetOfTax', 'ebit', 'ebitda', 'netIncome',
+]
+BALANCE_SHEET_FIELDS = [
+    'totalAssets', 'totalCurrentAssets', 'cashAndCashEquivalentsAtCarryingValue',
+    'cashAndShortTermInvestments', 'inventory', 'currentNetReceivables', 'totalNonCurrentAssets',
+    'propertyPlantEquipment', 'accumulatedDepreciationAmortizationPPE', 'intangibleAssets',
+    'intangibleAssetsExcludingGoodwill', 'goodwill', 'investments', 'longTermInvestments',
+    'shortTermInvestments', 'otherCurrentAssets', 'otherNonCurrentAssets', 'totalLiabilities',
+    'totalCurrentLiabilities', 'currentAccountsPayable', 'deferredRevenue', 'currentDebt',
+    'shortTermDebt', 'totalNonCurrentLiabilities', 'capitalLeaseObligations', 'longTermDebt',
+    'currentLongTermDebt', 'longTermDebtNoncurrent', 'shortLongTermDebtTotal',
+    'otherCurrentLiabilities', 'otherNonCurrentLiabilities', 'totalShareholderEquity',
+    'treasuryStock', 'retainedEarnings', 'commonStock', 'commonStockSharesOutstanding',
+]
+CASH_FLOW_FIELDS = [
+    'operatingCashflow', 'paymentsForOperatingActivities', 'proceedsFromOperatingActivities',
+    'changeInOperatingLiabilities', 'changeInOperatingAssets', 'depreciationDepletionAndAmortization',
+    'capitalExpenditures', 'changeInReceivables', 'changeInInventory', 'profitLoss',
+    'cashflowFromInvestment', 'cashflowFromFinancing', 'proceedsFromRepaymentsOfShortTermDebt',
+    'paymentsForRepurchaseOfCommonStock', 'paymentsForRepurchaseOfEquity',
+    'paymentsForRepurchaseOfPreferredStock', 'dividendPayout', 'dividendPayoutCommonStock',
+    'dividendPayoutPreferredStock', 'proceedsFromIssuanceOfCommonStock',
+    'proceedsFromIssuanceOfLongTermDebtAndCapitalSecuritiesNet',
+    'proceedsFromIssuanceOfPreferredStock', 'proceedsFromRepurchaseOfEquity',
+    'proceedsFromSaleOfTreasuryStock', 'changeInCashAndCashEquivalents', 'changeInExchangeRate',
+    'netIncome',
+]
+# Overview ratios and their typical range
+OVERVIEW_RATIOS = {
+    'PERatio': (5, 60), 'PEGRatio': (0.5, 4), 'BookValue': (2, 150), 'DividendPerShare': (0, 5),
+    'DividendYield': (0, 0.06), 'EPS': (-2, 20), 'RevenuePerShareTTM': (5, 200),
+    'ProfitMargin': (-0.1, 0.4), 'OperatingMarginTTM': (-0.1, 0.5), 'ReturnOnAssetsTTM': (-0.05, 0.25),
+    'ReturnOnEquityTTM': (-0.1, 0.6), 'DilutedEPSTTM': (-2, 20), 'QuarterlyEarningsGrowthYOY': (-0.5, 1),
+    'QuarterlyRevenueGrowthYOY': (-0.3, 0.6), 'TrailingPE': (5, 60), 'ForwardPE': (5, 50),
+    'PriceToSalesRatioTTM': (0.5, 20), 'PriceToBookRatio': (0.5, 30), 'EVToRevenue': (0.5, 20),
+    'EVToEBITDA': (3, 40), 'Beta': (0.3, 2),
+}
+SECTORS = [
+    ('TECHNOLOGY', 'SERVICES-PREPACKAGED SOFTWARE'),
+    ('LIFE SCIENCES', 'PHARMACEUTICAL PREPARATIONS'),
+    ('FINANCE', 'NATIONAL COMMERCIAL BANKS'),
+    ('ENERGY & TRANSPORTATION', 'CRUDE PETROLEUM & NATURAL GAS'),
+    ('TRADE & SERVICES', 'RETAIL-VARIETY STORES'),
+    ('MANUFACTURING', 'MOTOR VEHICLES & PASSENGER CAR BODIES'),
+]
+ECONOMIC_SERIES = {
+    # Function: (name, default interval, unit, typical level)
+    'REAL_GDP': ('Real Gross Domestic Product', 'annual', 'billions of dollars', 20000),
+    'REAL_GDP_PER_CAPITA': ('Real Gross Domestic Product per Capita', 'quarterly', 'chained 2012 dollars', 60000),
+    'TREASURY_YIELD': ('10-Year Treasury Constant Maturity Rate', 'daily', 'percent', 3),
+    'FEDERAL_FUNDS_RATE': ('Effective Federal Funds Rate', 'daily', 'percent', 3),
+    'CPI': ('Consumer Price Index for all Urban Consumers', 'monthly', 'index 1982-1984=100', 250),
+    'INFLATION': ('Inflation - US Consumer Prices', 'annual', 'percent', 3),
+    'RETAIL_SALES': ('Advance Retail Sales: Retail Trade', 'monthly', 'millions of dollars', 600000),
+    'DURABLES': ("Manufacturers' New Orders: Durable Goods", 'monthly', 'millions of dollars', 250000),
+    'UNEMPLOYMENT': ('Unemployment Rate', 'monthly', 'percent', 5),
+    'NONFARM_PAYROLL': ('Total Nonfarm Payroll', 'monthly', 'thousands of persons', 150000),
+}
+
+TIME_SERIES_KEYS = {
+    'daily': 'Time Series (Daily)',
+    'weekly': 'Weekly Adjusted Time Series',
+    'monthly': 'Monthly Adjusted Time Series',
+}
+RAW_TIME_SERIES_KEYS = {
+    'daily': 'Time Series (Daily)',
+    'weekly': 'Weekly Time Series',
+    'monthly': 'Monthly Time Series',
+}
+# Bars Alpha Vantage returns with outputsize=compact
+COMPACT_BARS = 100
+# Typical level of each treasury maturity, in percent
+TREASURY_LEVELS = {'3month': 4.5, '2year': 4.2, '5year': 4.0, '7year': 4.1, '10year': 4.2, '30year': 4.4}
+# Companies listed in a synthetic earnings calendar per month of horizon
+CALENDAR_COMPANIES_PER_MONTH = 500
+
+
+def _rng(*parts) -> random.Random:
+    # String seeds are hashed with SHA-512, so they are stable across processes
+    return random.Random(':'.join(str(part) for part in parts))
+
+
+def _amount(rng: random.Random, scale: float, missing: bool = True) -> str:
+    if missing and rng.random() < MISSING_SHARE:
+        return 'None'
+    return str(int(rng.uniform(-0.2, 1.0) * scale))
+
+
+def synthetic_symbols(count: int) -> List[str]:
+    """
+    Ticker symbols for synthetic stocks, which cannot clash with real ones.
+    """
+    return [f'SYN{number:05d}' for number in range(count)]
+
+
+def _period_ends(count: int, months: int) -> List[datetime.date]:
+    """
+    The last `count` month ends `months` apart, newest first.
+    """
+    dates = []
+    year, month = END_DATE.year, END_DATE.month
+    for _ in range(count):
+        next_month = datetime.date(year + month // 12, month % 12 + 1, 1)
+        dates.append(next_month - datetime.timedelta(days=1))
+        month -= months
+        while month < 1:
+            month += 12
+            year -= 1
+    return dates
+
+
+def _trading_days(count: int) -> List[datetime.date]:
+    """
+    The last `count` weekdays up to END_DATE, newest first.
+    """
+    dates, day = [], END_DATE
+    while len(dates) < count:
+        if day.weekday() < 5:
+            dates.append(day)
+        day -= datetime.timedelta(days=1)
+    return dates
+
+
+def time_series(symbol: str, interval: str = 'daily', bars: int = 250, seed: int = 0) -> Dict:
+    """
+    A TIME_SERIES_{INTERVAL}_ADJUSTED payload: a random walk of OHLCV bars with the
+    occasional dividend, newest first.
+    """
+    rng = _rng(seed, 'time_series', interval, symbol)
+    if interval == 'daily':
+        dates = _trading_days(bars)
+    else:
+        dates = _period_ends(bars, 1) if interval == 'monthly' else [
+            END_DATE - datetime.timedelta(weeks=week) for week in range(bars)
+        ]
+
+    # Walk backwards from today's price so that the newest bars are the same at every size
+    close = rng.uniform(10, 500)
+    series = {}
+    for date in dates:
+        open_ = close * (1 + rng.gauss(0, 0.005))
+        high = max(open_, close) * (1 + abs(rng.gauss(0, 0.01)))
+        low = min(open_, close) * (1 - abs(rng.gauss(0, 0.01)))
+        bar = {
+            '1. open': f'{open_:.4f}',
+            '2. high': f'{high:.4f}',
+            '3. low': f'{low:.4f}',
+            '4. close': f'{close:.4f}',
+            '5. adjusted close': f'{close:.4f}',
+            '6. volume': str(rng.randint(100_000, 50_000_000)),
+            '7. dividend amount': f'{rng.uniform(0.1, 1):.4f}' if rng.random() < 0.01 else '0.0000',
+        }
+        if interval == 'daily':
+            bar['8. split coefficient'] = '1.0'
+        series[date.isoformat()] = bar
+        close = max(close / (1 + rng.gauss(0.0003, 0.02)), 0.01)
+
+    return {
+        'Meta Data': {
+            '1. Information': f'{interval.capitalize()} Time Series with Splits and Dividend Events',
+            '2. Symbol': symbol,
+            '3. Last Refreshed': dates[0].isoformat() if dates else END_DATE.isoformat(),
+            '4. Time Zone': 'US/Eastern',
+        },
+        TIME_SERIES_KEYS[interval]: series,
+    }
+
+
+def raw_time_series(symbol: str, interval: str = 'daily', bars: int = 250, seed: int = 0) -> Dict:
+    """
+    A TIME_SERIES_{INTERVAL} (unadjusted) payload: the adjusted series without the
+    adjusted close, dividend and split columns.
+    """
+    adjusted = time_series(symbol, interval, bars, seed)
+    series = {
+        date: {
+            '1. open': bar['1. open'],
+            '2. high': bar['2. high'],
+            '3. low': bar['3. low'],
+            '4. close': bar['4. close'],
+            '5. volume': bar['6. volume'],
+        }
+        for date, bar in adjusted[TIME_SERIES_KEYS[interval]].items()
+    }
+    meta = {**adjusted['Meta Data'], '1. Information': f'{interval.capitalize()} Prices (open, high, low, close) and Volumes'}
+    return {'Meta Data': meta, RAW_TIME_SERIES_KEYS[interval]: series}
+
+
+def intraday_time_series(symbol: str, interval: str = '5min', bars: int = 250, seed: int = 0) -> Dict:
+    """
+    A TIME_SERIES_INTRADAY payload of `interval` bars during the last trading sessions.
+    """
+    rng = _rng(seed, 'intraday', interval, symbol)
+    minutes = int(interval.replace('min', ''))
+    close = rng.uniform(10, 500)
+    series = {}
+    days = iter(_trading_days(bars * minutes // 390 + 2))
+    day = next(days)
+    timestamp = datetime.datetime.combine(day, datetime.time(16, 0))
+    for _ in range(bars):
+        if timestamp.time() < datetime.time(9, 30):
+            day = next(days)
+            timestamp = datetime.datetime.combine(day, datetime.time(16, 0))
+        open_ = close * (1 + rng.gauss(0, 0.001))
+        series[timestamp.strftime('%Y-%m-%d %H:%M:%S')] = {
+            '1. open': f'{open_:.4f}',
+            '2. high': f'{max(open_, close) * (1 + abs(rng.gauss(0, 0.001))):.4f}',
+            '3. low': f'{min(open_, close) * (1 - abs(rng.gauss(0, 0.001))):.4f}',
+            '4. close': f'{close:.4f}',
+            '5. volume': str(rng.randint(1_000, 500_000)),
+        }
+        close = max(close / (1 + rng.gauss(0, 0.002)), 0.01)
+        timestamp -= datetime.timedelta(minutes=minutes)
+    return {
+        'Meta Data': {
+            '1. Information': f'Intraday ({interval}) open, high, low, close prices and volume',
+            '2. Symbol': symbol,
+            '3. Last Refreshed': next(iter(series), ''),
+            '4. Interval': interval,
+            '5. Output Size': 'Compact',
+            '6. Time Zone': 'US/Eastern',
+        },
+        f'Time Series ({interval})': series,
+    }
+
+
+def global_quote(symbol: str, seed: int = 0) -> Dict:
+    """
+    A GLOBAL_QUOTE payload, consistent with the latest bars of the daily time series.
+    """
+    bars = list(time_series(symbol, 'daily', 2, seed)[TIME_SERIES_KEYS['daily']].items())
+    (date, latest), (_, previous) = bars
+    price, previous_close = float(latest['4. close']), float(previous['4. close'])
+    return {
+        'Global Quote': {
+            '01. symbol': symbol,
+            '02. open': latest['1. open'],
+            '03. high': latest['2. high'],
+            '04. low': latest['3. low'],
+            '05. price': latest['4. close'],
+            '06. volume': latest['6. volume'],
+            '07. latest trading day': date,
+            '08. previous close': previous['4. close'],
+            '09. change': f'{price - previous_close:.4f}',
+            '10. change percent': f'{100 * (price - previous_close) / previous_close:.4f}%',
+        }
+    }
+
+
+def symbol_search(keywords: str, matches: int = 5, seed: int = 0) -> Dict:
+    """
+    A SYMBOL_SEARCH payload of made up tickers starting with the keywords.
+    """
+    rng = _rng(seed, 'symbol_search', keywords)
+    prefix = ''.join(character for character in keywords.upper() if character.isalnum())[:4] or 'SYN'
+    best_matches = []
+    for number in range(matches):
+        symbol = prefix + ('' if number == 0 else chr(ord('A') + number - 1))
+        best_matches.append({
+            '1. symbol': symbol,
+            '2. name': f'Synthetic {symbol} Corp',
+            '3. type': 'Equity',
+            '4. region': 'United States',
+            '5. marketOpen': '09:30',
+            '6. marketClose': '16:00',
+            '7. timezone': 'UTC-04',
+            '8. currency': 'USD',
+            '9. matchScore': f'{max(1 - 0.15 * number - rng.uniform(0, 0.05), 0):.4f}',
+        })
+    return {'bestMatches': best_matches}
+
+
+def earnings_calendar(horizon: str = '3month', seed: int = 0) -> List[List[str]]:
+    """
+    The rows of an EARNINGS_CALENDAR CSV over synthetic stocks, header row first, each
+    with its next report date within the horizon.
+    """
+    months = int(horizon.replace('month', ''))
+    rng = _rng(seed, 'earnings_calendar', horizon)
+    rows = [['symbol', 'name', 'reportDate', 'fiscalDateEnding', 'estimate', 'currency']]
+    for symbol in synthetic_symbols(CALENDAR_COMPANIES_PER_MONTH * months):
+        report_date = END_DATE + datetime.timedelta(days=rng.randint(1, 30 * months))
+        estimate = f'{rng.uniform(-1, 5):.2f}' if rng.random() > MISSING_SHARE else ''
+        rows.append([
+            symbol, f'Synthetic {symbol} Corp', report_date.isoformat(),
+            _period_ends(1, 3)[0].isoformat(), estimate, 'USD',
+        ])
+    return rows
+
+
+def _statement(symbol: str, kind: str, fields: List[str], annual: int, quarterly: int, seed: int) -> Dict:
+    rng = _rng(seed, kind, symbol)
+    scale = 10 ** rng.uniform(8, 11)
+
+    def reports(count: int, months: int) -> List[Dict]:
+        return [
+            {
+                'fiscalDateEnding': date.isoformat(),
+                'reportedCurrency': 'USD',
+                **{name: _amount(rng, scale / (12 // months)) for name in fields},
+            }
+            for date in _period_ends(count, months)
+        ]
+
+    return {'symbol': symbol, 'annualReports': reports(annual, 12), 'quarterlyReports': reports(quarterly, 3)}
+
+
+def income_statement(symbol: str, annual: int = 5, quarterly: int = 20, seed: int = 0) -> Dict:
+    """
+    An INCOME_STATEMENT payload.
+    """
+    return _statement(symbol, 'income_statement', INCOME_STATEMENT_FIELDS, annual, quarterly, seed)
+
+
+def balance_sheet(symbol: str, annual: int = 5, quarterly: int = 20, seed: int = 0) -> Dict:
+    """
+    A BALANCE_SHEET payload.
+    """
+    return _statement(symbol, 'balance_sheet', BALANCE_SHEET_FIELDS, annual, quarterly, seed)
+
+
+def cash_flow(symbol: str, annual: int = 5, quarterly: int = 20, seed: int = 0) -> Dict:
+    """
+    A CASH_FLOW payload.
+    """
+    return _statement(symbol, 'cash_flow', CASH_FLOW_FIELDS, annual, quarterly, seed)
+
+
+def earnings(symbol: str, annual: int = 5, quarterly: int = 20, seed: int = 0) -> Dict:
+    """
+    An EARNINGS payload, with each quarter reported about a month after it ended.
+    """
+    rng = _rng(seed, 'earnings', symbol)
+    base_eps = rng.uniform(0.1, 5)
+
+    quarterly_earnings = []
+    for date in _period_ends(quarterly, 3):
+        estimated = base_eps * rng.uniform(0.8, 1.2)
+        reported = estimated * (1 + rng.gauss(0.02, 0.1))
+        quarterly_earnings.append({
+            'fiscalDateEnding': date.isoformat(),
+            'reportedDate': (date + datetime.timedelta(days=rng.randint(20, 45))).isoformat(),
+            'reportedEPS': f'{reported:.2f}',
+            'estimatedEPS': f'{estimated:.2f}',
+            'surprise': f'{reported - estimated:.2f}',
+            'surprisePercentage': f'{100 * (reported - estimated) / estimated:.4f}',
+        })
+    annual_earnings = [
+        {'fiscalDateEnding': date.isoformat(), 'reportedEPS': f'{4 * base_eps * rng.uniform(0.8, 1.2):.2f}'}
+        for date in _period_ends(annual, 12)
+    ]
+    return {'symbol': symbol, 'annualEarnings': annual_earnings, 'quarterlyEarnings': quarterly_earnings}
+
+
+def overview(symbol: str, seed: int = 0) -> Dict:
+    """
+    An OVERVIEW payload.
+    """
+    rng = _rng(seed, 'overview', symbol)
+    sector, industry = rng.choice(SECTORS)
+    price = rng.uniform(10, 500)
+    shares = int(10 ** rng.uniform(7, 10))
+
+    def ratio(name: str) -> str:
+        if rng.random() < MISSING_SHARE:
+            return 'None'
+        low, high = OVERVIEW_RATIOS[name]
+        return f'{rng.uniform(low, high):.4f}'
+
+    strong_buy, buy, hold, sell, strong_sell = (rng.randint(0, 20) for _ in range(5))
+    return {
+        'Symbol': symbol,
+        'AssetType': 'Common Stock',
+        'Name': f'Synthetic {symbol} Corp',
+        'Description': f'A synthetic company in {industry.lower()}, generated for benchmarks.',
+        'CIK': str(rng.randint(1000, 2_000_000)),
+        'Exchange': rng.choice(['NYSE', 'NASDAQ']),
+        'Currency': 'USD',
+        'Country': 'USA',
+        'Sector': sector,
+        'Industry': industry,
+        'Address': f'{rng.randint(1, 999)} MAIN ST, ANYTOWN, US',
+        'FiscalYearEnd': 'December',
+        'LatestQuarter': _period_ends(1, 3)[0].isoformat(),
+        'MarketCapitalization': str(int(price * shares)),
+        'EBITDA': _amount(rng, price * shares / 10),
+        **{name: ratio(name) for name in OVERVIEW_RATIOS},
+        'RevenueTTM': _amount(rng, price * shares / 2),
+        'GrossProfitTTM': _amount(rng, price * shares / 4),
+        'AnalystTargetPrice': f'{price * rng.uniform(0.8, 1.4):.2f}',
+        'AnalystRatingStrongBuy': str(strong_buy),
+        'AnalystRatingBuy': str(buy),
+        'AnalystRatingHold': str(hold),
+        'AnalystRatingSell': str(sell),
+        'AnalystRatingStrongSell': str(strong_sell),
+        '52WeekHigh': f'{price * rng.uniform(1, 1.5):.2f}',
+        '52WeekLow': f'{price * rng.uniform(0.5, 1):.2f}',
+        '50DayMovingAverage': f'{price * rng.uniform(0.9, 1.1):.2f}',
+        '200DayMovingAverage': f'{price * rng.uniform(0.8, 1.2):.2f}',
+        'SharesOutstanding': str(shares),
+        'DividendDate': (END_DATE - datetime.timedelta(days=rng.randint(0, 90))).isoformat(),
+        'ExDividendDate': (END_DATE - datetime.timedelta(days=rng.randint(90, 120))).isoformat(),
+    }
+
+
+def economic_series(
+    function: str, points: int = 120, interval: Optional[str] = None, seed: int = 0, maturity: Optional[str] = None
+) -> Dict:
+    """
+    A payload of one of the economic indicator functions (REAL_GDP, CPI, ...): a random
+    walk around the indicator's typical level, newest first. TREASURY_YIELD also takes
+    the maturity.
+    """
+    name, default_interval, unit, level = ECONOMIC_SERIES[function]
+    interval = interval or default_interval
+    rng = _rng(seed, 'economic', function, interval, *([maturity] if maturity else []))
+    if maturity:
+        name, level = f'{maturity} Treasury Constant Maturity Rate', TREASURY_LEVELS.get(maturity, level)
+    if interval == 'daily':
+        dates = _trading_days(points)
+    else:
+        dates = _period_ends(points, {'annual': 12, 'quarterly': 3}.get(interval, 1))
+
+    value, data = level, []
+    for date in dates:
+        data.append({'date': date.isoformat(), 'value': f'{value:.3f}'})
+        value = max(value * (1 + rng.gauss(0, 0.01)), 0.01)
+    return {'name': name, 'interval': interval, 'unit': unit, 'data': data}
+
+
+def payload(function: str, symbol: Optional[str] = None, size: str = DEFAULT_SIZE, seed: int = 0, **params) -> Dict:
+    """
+    The synthetic payload Alpha Vantage would return for a function.
+
+    Args:
+        function (str): The Alpha Vantage function, e.g. 'TIME_SERIES_DAILY_ADJUSTED'.
+        symbol (Optional[str]): The stock symbol, for the per-symbol functions.
+        size (str): The payload size, from SIZES.
+        seed (int): Different seeds give different, but again reproducible, payloads.
+        **params: Other query parameters of the function (interval, maturity, keywords
+            and outputsize).
+
+    Returns:
+        Dict: The payload.
+
+    Raises:
+        ValueError: If the function or size is not supported.
+    """
+    if size not in SIZES:
+        raise ValueError(f"Invalid size: {size}. Must be one of {', '.join(SIZES)}.")
+    dimensions = SIZES[size]
+    bars = dimensions['bars']
+    if params.get('outputsize') == 'compact':
+        bars = min(bars, COMPACT_BARS)
+    statements = {'annual': dimensions['annual'], 'quarterly': dimensions['quarterly'], 'seed': seed}
+    generators: Dict[str, Callable[[], Dict]] = {
+        'TIME_SERIES_INTRADAY': lambda: intraday_time_series(symbol, params.get('interval') or '5min', bars, seed),
+        'TIME_SERIES_DAILY': lambda: raw_time_series(symbol, 'daily', bars, seed),
+        'TIME_SERIES_DAILY_ADJUSTED': lambda: time_series(symbol, 'daily', bars, seed),
+        'TIME_SERIES_WEEKLY': lambda: raw_time_series(symbol, 'weekly', bars // 5, seed),
+        'TIME_SERIES_WEEKLY_ADJUSTED': lambda: time_series(symbol, 'weekly', bars // 5, seed),
+        'TIME_SERIES_MONTHLY': lambda: raw_time_series(symbol, 'monthly', bars // 21, seed),
+        'TIME_SERIES_MONTHLY_ADJUSTED': lambda: time_series(symbol, 'monthly', bars // 21, seed),
+        'GLOBAL_QUOTE': lambda: global_quote(symbol, seed),
+        'INCOME_STATEMENT': lambda: income_statement(symbol, **statements),
+        'BALANCE_SHEET': lambda: balance_sheet(symbol, **statements),
+        'CASH_FLOW': lambda: cash_flow(symbol, **statements),
+        'EARNINGS': lambda: earnings(symbol, **statements),
+        'OVERVIEW': lambda: overview(symbol, seed),
+    }
+    if function == 'SYMBOL_SEARCH':
+        return symbol_search(params.get('keywords') or '', seed=seed)
+    if function in ECONOMIC_SERIES:
+        return economic_series(
+            function, dimensions['points'], params.get('interval'), seed,
+            maturity=params.get('maturity') if function == 'TREASURY_YIELD' else None,
+        )
+    if function not in generators:
+        raise ValueError(f"No synthetic payload for function: {function}")
+    if not symbol:
+        raise ValueError(f"{function} requires a symbol")
+    return generators[function]()
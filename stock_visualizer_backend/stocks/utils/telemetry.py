@@ -0,0 +1,263 @@
+import contextvars
+import json
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterator, List, Optional
+
+from django.db import connection
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Outcomes of writing one parsed row
+INSERTED = 'inserted'
+UPDATED = 'updated'
+UNCHANGED = 'unchanged'
+
+# Outcomes of syncing one symbol
+OK = 'ok'
+SKIPPED = 'skipped'
+DERIVED = 'derived'
+FETCH_ERROR = 'fetch_error'
+SYNC_ERROR = 'sync_error'
+
+# The per-symbol timings summarized in the run report
+STAGES = ('fetch_seconds', 'backoff_seconds', 'parse_seconds', 'db_seconds', 'total_seconds')
+# The per-symbol counters summed in the run report
+COUNTERS = ('requests', 'retries', 'bytes_received', 'queries', INSERTED, UPDATED, UNCHANGED)
+
+# The number of slowest symbols listed in the run report
+SLOWEST_COUNT = 10
+
+
+@dataclass
+class SymbolTelemetry:
+    """
+    Where the time went while syncing one symbol.
+
+    `fetch_seconds` is spent waiting on the API (including failed attempts) and
+    `backoff_seconds` sleeping after rate limits or errors. `sync_seconds` is the whole
+    parse and write step, of which `db_seconds` is spent in queries; the rest of it, the
+    Python side of parsing and of deriving returns, aggregates and metrics, is
+    `parse_seconds`.
+    """
+    symbol: str
+    function: str
+    status: str = OK
+    error: str = ''
+    requests: int = 0
+    retries: int = 0
+    bytes_received: int = 0
+    fetch_seconds: float = 0.0
+    backoff_seconds: float = 0.0
+    sync_seconds: float = 0.0
+    db_seconds: float = 0.0
+    queries: int = 0
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    total_seconds: float = 0.0
+
+    @property
+    def parse_seconds(self) -> float:
+        return max(self.sync_seconds - self.db_seconds, 0.0)
+
+    def as_dict(self) -> Dict:
+        return {**asdict(self), 'parse_seconds': self.parse_seconds}
+
+
+_current: contextvars.ContextVar[Optional[SymbolTelemetry]] = contextvars.ContextVar('sync_telemetry', default=None)
+
+
+def record_fetch(seconds: float, size: int = 0) -> None:
+    """
+    Records one API request of the symbol being synced (if any): its wait and body size.
+    """
+    record = _current.get()
+    if record is not None:
+        record.requests += 1
+        record.fetch_seconds += seconds
+        record.bytes_received += size
+
+
+def record_backoff(seconds: float) -> None:
+    """
+    Records a retry of the symbol being synced (if any) and the time slept before it.
+    """
+    record = _current.get()
+    if record is not None:
+        record.retries += 1
+        record.backoff_seconds += seconds
+
+
+def record_row(outcome: str) -> None:
+    """
+    Counts a written row of the symbol being synced (if any) as inserted, updated or
+    unchanged.
+    """
+    record = _current.get()
+    if record is not None:
+        setattr(record, outcome, getattr(record, outcome) + 1)
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    A connection.execute_wrapper that counts the query and its time against the symbol
+    being synced.
+    """
+    record = _current.get()
+    if record is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        record.queries += 1
+        record.db_seconds += time.perf_counter() - start
+
+
+@contextmanager
+def measure_sync() -> Iterator[Optional[SymbolTelemetry]]:
+    """
+    Times the parse and write step of the symbol being synced, separating the time spent
+    in database queries.
+    """
+    record = _current.get()
+    start = time.perf_counter()
+    try:
+        with connection.execute_wrapper(record_query):
+            yield record
+    finally:
+        if record is not None:
+            record.sync_seconds += time.perf_counter() - start
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summarize(records: List[SymbolTelemetry]) -> Dict:
+    """
+    Aggregates per-symbol telemetry into totals, per-stage percentiles and the slowest
+    symbols.
+    """
+    statuses: Dict[str, int] = {}
+    for record in records:
+        statuses[record.status] = statuses.get(record.status, 0) + 1
+
+    # Skipped symbols did no work, so they would only dilute the percentiles
+    worked = [record.as_dict() for record in records if record.status != SKIPPED]
+    stages = {}
+    for stage in STAGES:
+        ordered = sorted(row[stage] for row in worked)
+        stages[stage] = {
+            'total': sum(ordered),
+            'mean': sum(ordered) / len(ordered) if ordered else 0.0,
+            'p50': _percentile(ordered, 0.50) if ordered else 0.0,
+            'p95': _percentile(ordered, 0.95) if ordered else 0.0,
+            'max': ordered[-1] if ordered else 0.0,
+        }
+    slowest = sorted(worked, key=lambda row: row['total_seconds'], reverse=True)[:SLOWEST_COUNT]
+    return {
+        'symbols': len(records),
+        'statuses': statuses,
+        'counters': {counter: sum(row[counter] for row in worked) for counter in COUNTERS},
+        'stages': stages,
+        'slowest': [
+            {key: row[key] for key in ('symbol', 'status') + STAGES}
+            for row in slowest
+        ],
+        'errors': [
+            {'symbol': record.symbol, 'status': record.status, 'error': record.error}
+            for record in records if record.error
+        ],
+    }
+
+
+class SyncRun:
+    """
+    Collects the telemetry of one sync run, symbol by symbol.
+
+    Each finished symbol is logged as one JSON line, and the run's aggregated report can
+    be saved as a SyncRunReport so runs can be compared over time.
+    """
+
+    def __init__(self, function: str):
+        self.function = function
+        self.started_at = timezone.now()
+        self.start = time.perf_counter()
+        self.records: List[SymbolTelemetry] = []
+
+    @contextmanager
+    def track(self, symbol: str) -> Iterator[SymbolTelemetry]:
+        """
+        Makes `symbol` the one being synced inside the block, so that fetch_data, the
+        row writes and the queries record into its telemetry.
+        """
+        record = SymbolTelemetry(symbol=symbol, function=self.function)
+        token = _current.set(record)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.total_seconds = time.perf_counter() - start
+            _current.reset(token)
+            self.records.append(record)
+            logger.info(json.dumps({'event': 'sync_symbol', **record.as_dict()}))
+
+    def report(self) -> Dict:
+        """
+        The aggregated report of the symbols tracked so far.
+        """
+        return {
+            'function': self.function,
+            'wall_seconds': time.perf_counter() - self.start,
+            **summarize(self.records),
+        }
+
+    def save(self):
+        """
+        Stores the run's report.
+
+        Returns:
+            SyncRunReport: The stored report.
+        """
+        from stocks.models import SyncRunReport
+
+        report = self.report()
+        return SyncRunReport.objects.create(
+            function=self.function,
+            started_at=self.started_at,
+            finished_at=timezone.now(),
+            symbols=report['symbols'],
+            errors=len(report['errors']),
+            wall_seconds=report['wall_seconds'],
+            report=report,
+        )
+
+
+def format_report(report: Dict, previous: Optional[Dict] = None) -> List[str]:
+    """
+    Human readable lines of a run report, with the mean per-symbol stage timings of the
+    previous run of the same function alongside for comparison.
+    """
+    statuses = ', '.join(f"{count} {status}" for status, count in sorted(report['statuses'].items()))
+    lines = [
+        f"{report['function']}: {report['symbols']} symbols ({statuses or 'none'}) "
+        f"in {report['wall_seconds']:.1f}s"
+    ]
+    for stage in STAGES:
+        summary = report['stages'][stage]
+        line = (
+            f"  {stage:<16} total {summary['total']:9.3f}s  mean {summary['mean']:.3f}s  "
+            f"p50 {summary['p50']:.3f}s  p95 {summary['p95']:.3f}s  max {summary['max']:.3f}s"
+        )
+        if previous and stage in previous.get('stages', {}):
+            line += f"  (previous mean {previous['stages'][stage]['mean']:.3f}s)"
+        lines.append(line)
+    lines.append('  ' + ', '.join(f"{counter} {value}" for counter, value in report['counters'].items()))
+    for row in report['slowest'][:3]:
+        lines.append(f"  slow: {row['symbol']} {row['total_seconds']:.3f}s ({row['status']})")
+    return lines
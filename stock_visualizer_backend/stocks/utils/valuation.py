@@ -0,0 +1,120 @@
+import datetime
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from stocks.models import BalanceSheetData, EarningsData, FundamentalMetricsData
+from stocks.utils import price_matrix
+from stocks.utils.asof import asof_join
+from stocks.utils.fundamentals import trailing_sum
+
+
+def _availability_dates(symbol: str) -> pd.Series:
+    """
+    Maps each fiscal quarter end of a symbol onto the date its results were reported.
+
+    Statements only carry their fiscal date, so the earnings report date of the same
+    quarter is used as the date the market could first know them. A quarter reported
+    more than once maps onto its first report, as in _ttm_eps.
+    """
+    # Latest first within a quarter, so the dict keeps the earliest report
+    rows = (
+        EarningsData.objects
+        .filter(stock_id=symbol, report_type='quarterly', reported_date__isnull=False)
+        .order_by('fiscal_date_ending', '-reported_date')
+        .values_list('fiscal_date_ending', 'reported_date')
+    )
+    return pd.Series(dict(rows), dtype=object)
+
+
+def _index_by_availability(frame: pd.DataFrame, available: pd.Series) -> pd.DataFrame:
+    """
+    Re-indexes a fiscal-date indexed frame by the date each row became public, falling back
+    to the fiscal date when no report date is known.
+    """
+    dates = [available.get(date, date) for date in frame.index]
+    return frame.set_axis(dates).sort_index()
+
+
+def _ttm_eps(symbol: str) -> pd.DataFrame:
+    """
+    Trailing four-quarter reported EPS, indexed by the report date of the latest quarter.
+
+    Sums spanning a missing quarter are left out, as for the statement TTM values (see
+    fundamentals.trailing_sum).
+    """
+    rows = (
+        EarningsData.objects
+        .filter(stock_id=symbol, report_type='quarterly', reported_date__isnull=False)
+        .order_by('fiscal_date_ending', 'reported_date')
+        .values_list('fiscal_date_ending', 'reported_date', 'reported_eps')
+    )
+    frame = pd.DataFrame.from_records(list(rows), columns=['fiscal_date_ending', 'date', 'reported_eps'])
+    # The first report of a quarter, so each one counts once
+    frame = frame.drop_duplicates('fiscal_date_ending').set_index('fiscal_date_ending')
+    eps = trailing_sum(frame[['reported_eps']].astype(float))['reported_eps']
+    return pd.DataFrame({'eps_ttm': eps.to_numpy()}, index=pd.Index(frame['date'], name='date')).sort_index()
+
+
+def _book_value_and_shares(symbol: str, available: pd.Series) -> pd.DataFrame:
+    rows = (
+        BalanceSheetData.objects
+        .filter(stock_id=symbol, report_type='quarterly')
+        .values_list('date', 'total_shareholder_equity', 'common_stock_shares_outstanding')
+    )
+    frame = pd.DataFrame.from_records(list(rows), columns=['date', 'equity', 'shares']).set_index('date')
+    return _index_by_availability(frame.astype(float), available)
+
+
+def _revenue_ttm(symbol: str, available: pd.Series) -> pd.DataFrame:
+    rows = (
+        FundamentalMetricsData.objects
+        .filter(stock_id=symbol)
+        .values_list('date', 'revenue_ttm')
+    )
+    frame = pd.DataFrame.from_records(list(rows), columns=['date', 'revenue_ttm']).set_index('date')
+    return _index_by_availability(frame.astype(float), available)
+
+
+def valuation_history(
+    symbol: str,
+    start: Optional[datetime.date] = None,
+    end: Optional[datetime.date] = None,
+) -> pd.DataFrame:
+    """
+    Computes daily P/E, P/B and P/S ratios from stored prices and fundamentals.
+
+    Each daily close is as-of joined with the trailing twelve month EPS (from
+    EarningsData), book value per share (from BalanceSheetData) and TTM revenue (from
+    FundamentalMetricsData) that were public on that day, so the series has no
+    look-ahead.
+
+    Args:
+        symbol (str): The stock symbol.
+        start (Optional[datetime.date]): First date to include (inclusive).
+        end (Optional[datetime.date]): Last date to include (inclusive).
+
+    Returns:
+        pd.DataFrame: Date indexed 'close', 'pe_ratio', 'price_to_book' and
+        'price_to_sales' columns. Ratios with a non-positive denominator are NaN.
+    """
+    prices = price_matrix.load_price_series(symbol, ['close'])
+    available = _availability_dates(symbol)
+
+    joined = asof_join(prices, _ttm_eps(symbol))
+    joined = asof_join(joined, _book_value_and_shares(symbol, available))
+    joined = asof_join(joined, _revenue_ttm(symbol, available))
+
+    def positive(series: pd.Series) -> pd.Series:
+        return series.where(series > 0)
+
+    close = joined['close']
+    history = pd.DataFrame({
+        'close': close,
+        'pe_ratio': close / positive(joined['eps_ttm']),
+        'price_to_book': close / positive(joined['equity'] / joined['shares']),
+        'price_to_sales': close * joined['shares'] / positive(joined['revenue_ttm']),
+    }, index=joined.index).replace([np.inf, -np.inf], np.nan)
+
+    return history.loc[start:end] if start or end else history
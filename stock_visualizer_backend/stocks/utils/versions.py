@@ -0,0 +1,53 @@
+from typing import Iterable
+
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from stocks.models import SyncVersion
+
+# SyncVersion key of all economic indicator tables, bumped after each
+# sync_economic_indicators run
+ECONOMIC_KEY = 'economic'
+
+# SyncVersion key of the stock directory (BaseStockData), bumped after each company
+# overview sync
+STOCKS_KEY = 'stocks'
+
+
+def prices_key(symbol: str) -> str:
+    """
+    Returns the SyncVersion key of a symbol's price data (all intervals).
+    """
+    return f'prices:{symbol}'
+
+
+def get_version(key: str) -> int:
+    """
+    Returns the current version of a dataset, or 0 if it has never been synced.
+    """
+    return SyncVersion.objects.filter(key=key).values_list('version', flat=True).first() or 0
+
+
+def get_total_version(keys: Iterable[str]) -> int:
+    """
+    Returns the sum of the versions of several datasets in one query.
+
+    Versions only ever increase, so the sum changes whenever any of the datasets is
+    synced and can key caches that depend on all of them.
+    """
+    total = SyncVersion.objects.filter(key__in=list(keys)).aggregate(total=Sum('version'))['total']
+    return total or 0
+
+
+def bump_version(key: str) -> None:
+    """
+    Increments the version of a dataset, invalidating everything cached under the
+    previous version.
+    """
+    updated = (
+        SyncVersion.objects
+        .filter(key=key)
+        .update(version=F('version') + 1, updated_at=timezone.now())
+    )
+    if not updated:
+        SyncVersion.objects.get_or_create(key=key, defaults={'version': 1})
@@ -0,0 +1,189 @@
+import re
+from typing import Iterable, Tuple
+
+import numpy as np
+import pandas as pd
+from django.core.cache import cache
+
+from stocks.models import TreasuryYieldData
+from stocks.utils import metrics, versions
+
+INTERPOLATION_METHODS = ('linear', 'pchip')
+
+# The curve matrix is keyed by the economic SyncVersion, so this only bounds the cache size.
+YIELD_CURVE_CACHE_SECONDS = 24 * 60 * 60
+
+MATURITY_PATTERN = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([my])\s*$', re.IGNORECASE)
+
+
+def parse_maturity(label: str) -> float:
+    """
+    Converts a maturity label like '3m' or '10y' into months.
+
+    Raises:
+        ValueError: If the label is not a number followed by 'm' or 'y'.
+    """
+    match = MATURITY_PATTERN.match(label)
+    if not match:
+        raise ValueError(f"Invalid maturity: {label}. Expected e.g. 3m or 10y.")
+    value, unit = match.groups()
+    return float(value) * (12 if unit.lower() == 'y' else 1)
+
+
+def parse_pair(pair: str) -> Tuple[float, float]:
+    """
+    Converts a spread label like '10y-2y' into the (long, short) maturities in months.
+
+    Raises:
+        ValueError: If the label is not two maturities separated by '-'.
+    """
+    parts = pair.split('-')
+    if len(parts) != 2:
+        raise ValueError(f"Invalid pair: {pair}. Expected e.g. 10y-2y.")
+    return parse_maturity(parts[0]), parse_maturity(parts[1])
+
+
+def load_curve_matrix() -> pd.DataFrame:
+    """
+    Pivots TreasuryYieldData into a date x maturity matrix in a single query.
+
+    Returns:
+        pd.DataFrame: Yields as decimal floats, indexed by date with one column per
+        stored maturity in months (ascending). Missing observations are NaN.
+    """
+    rows = (
+        TreasuryYieldData.objects
+        .order_by('date', 'maturity_months')
+        .values_list('date', 'maturity_months', 'value')
+    )
+    frame = pd.DataFrame.from_records(list(rows), columns=['date', 'maturity_months', 'value'])
+    matrix = frame.pivot(index='date', columns='maturity_months', values='value').astype(float)
+    return matrix.sort_index(axis=1)
+
+
+def get_curve_matrix() -> pd.DataFrame:
+    """
+    Returns the curve matrix, building it at most once per economic indicator sync.
+    """
+    version = versions.get_version(versions.ECONOMIC_KEY)
+    cache_key = f"yield_curve:{version}"
+
+    matrix = metrics.cache_lookup('yield_curve', cache_key)
+    if matrix is None:
+        matrix = load_curve_matrix()
+        cache.set(cache_key, matrix, YIELD_CURVE_CACHE_SECONDS)
+    return matrix
+
+
+def _pchip_slopes(knots: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """
+    Fritsch-Carlson derivatives of a monotone cubic Hermite interpolant, for every row of
+    `values` at once.
+
+    Interior slopes are the weighted harmonic mean of the neighbouring secants (zero at
+    local extrema) and the end slopes use the one-sided three point formula, limited so
+    the curve never overshoots the data.
+    """
+    widths = np.diff(knots)
+    secants = np.diff(values, axis=1) / widths
+    slopes = np.zeros_like(values)
+    if len(knots) == 2:
+        slopes[:, 0] = slopes[:, 1] = secants[:, 0]
+        return slopes
+
+    left, right = secants[:, :-1], secants[:, 1:]
+    w1 = 2 * widths[1:] + widths[:-1]
+    w2 = widths[1:] + 2 * widths[:-1]
+    same_sign = left * right > 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        harmonic = (w1 + w2) / (w1 / left + w2 / right)
+    slopes[:, 1:-1] = np.where(same_sign, harmonic, 0.0)
+
+    def end_slope(h0, h1, s0, s1):
+        slope = ((2 * h0 + h1) * s0 - h0 * s1) / (h0 + h1)
+        slope = np.where(np.sign(slope) != np.sign(s0), 0.0, slope)
+        overshoot = (np.sign(s0) != np.sign(s1)) & (np.abs(slope) > np.abs(3 * s0))
+        return np.where(overshoot, 3 * s0, slope)
+
+    slopes[:, 0] = end_slope(widths[0], widths[1], secants[:, 0], secants[:, 1])
+    slopes[:, -1] = end_slope(widths[-1], widths[-2], secants[:, -1], secants[:, -2])
+    return slopes
+
+
+def interpolate(
+    matrix: pd.DataFrame,
+    maturities: Iterable[float],
+    method: str = 'linear',
+) -> pd.DataFrame:
+    """
+    Interpolates yields at arbitrary maturities for every date of a curve matrix.
+
+    Gaps within a curve are filled linearly before interpolating, and maturities outside
+    the stored range are NaN (the curve is never extrapolated).
+
+    Args:
+        matrix (pd.DataFrame): A date x maturity matrix as returned by load_curve_matrix.
+        maturities (Iterable[float]): Target maturities in months.
+        method (str): 'linear' or 'pchip' (monotone piecewise cubic).
+
+    Returns:
+        pd.DataFrame: Interpolated yields indexed like `matrix`, one column per maturity.
+
+    Raises:
+        ValueError: If the method is unknown.
+    """
+    if method not in INTERPOLATION_METHODS:
+        raise ValueError(f"Invalid method: {method}. Must be one of {', '.join(INTERPOLATION_METHODS)}.")
+
+    targets = np.asarray(list(maturities), dtype=float)
+    knots = matrix.columns.to_numpy(dtype=float)
+    if len(knots) < 2:
+        return pd.DataFrame(np.nan, index=matrix.index, columns=targets)
+
+    filled = matrix.set_axis(knots, axis=1).interpolate(method='index', axis=1, limit_area='inside')
+    values = filled.to_numpy(dtype=float)
+
+    segment = np.clip(np.searchsorted(knots, targets, side='right') - 1, 0, len(knots) - 2)
+    x0, x1 = knots[segment], knots[segment + 1]
+    y0, y1 = values[:, segment], values[:, segment + 1]
+    width = x1 - x0
+    t = (targets - x0) / width
+
+    if method == 'linear':
+        result = y0 + t * (y1 - y0)
+    else:
+        slopes = _pchip_slopes(knots, values)
+        d0, d1 = slopes[:, segment], slopes[:, segment + 1]
+        t2, t3 = t ** 2, t ** 3
+        result = (
+            (2 * t3 - 3 * t2 + 1) * y0
+            + (t3 - 2 * t2 + t) * width * d0
+            + (-2 * t3 + 3 * t2) * y1
+            + (t3 - t2) * width * d1
+        )
+
+    outside = (targets < knots[0]) | (targets > knots[-1])
+    result[:, outside] = np.nan
+    return pd.DataFrame(result, index=matrix.index, columns=targets)
+
+
+def spreads(matrix: pd.DataFrame, pairs: Iterable[str], method: str = 'linear') -> pd.DataFrame:
+    """
+    Computes yield spreads such as '10y-2y' for every date of a curve matrix.
+
+    Args:
+        matrix (pd.DataFrame): A date x maturity matrix as returned by load_curve_matrix.
+        pairs (Iterable[str]): Spread labels, long maturity first.
+        method (str): Interpolation method for maturities that are not stored.
+
+    Returns:
+        pd.DataFrame: One column per pair (long minus short yield), indexed by date.
+    """
+    pairs = list(dict.fromkeys(pairs))
+    parsed = [parse_pair(pair) for pair in pairs]
+    maturities = sorted({maturity for pair in parsed for maturity in pair})
+    curve = interpolate(matrix, maturities, method)
+    return pd.DataFrame(
+        {label: curve[long] - curve[short] for label, (long, short) in zip(pairs, parsed)},
+        index=matrix.index,
+    )
@@ -1,12 +1,33 @@
 # views.py
 
 import logging
+from django.core.handlers.asgi import ASGIRequest
 from django.shortcuts import render
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.dateparse import parse_date
 # from .models import BaseStockData, StockPriceData 
 # from rest_framework.views import APIView
 # from rest_framework.response import Response
 from . import models 
+from .utils import (
+    async_queries,
+    backtest,
+    earnings_calendar,
+    event_study,
+    indicators,
+    macro,
+    metrics,
+    optimization,
+    pagination,
+    price_matrix,
+    returns,
+    risk,
+    screener,
+    search,
+    sectors,
+    valuation,
+    yield_curve,
+)
 # from .serializers import StockSerializer
 from django.core import serializers
 
@@ -31,37 +52,71 @@ def index(request):
     logger.info("Request hit index")
     return JsonResponse({'status': 'ok'})
 
+# Keyset orders of the stock list; the symbol breaks ties between equal names
+STOCK_LIST_ORDERS = {
+    'name': ('name', 'symbol'),
+    'symbol': ('symbol',),
+}
+
+
+def _list_response(request, queryset, keys):
+    """
+    Serves a values() queryset as a list in one of three modes:
+
+    - by default, the whole list as a JSON array;
+    - with limit= and/or cursor=, one keyset page: {'results': [...], 'next_cursor': ...};
+    - with stream=true, the whole list as a JSON array streamed from a database iterator,
+      so memory stays flat however many rows there are. Under ASGI the iterator is async,
+      as Django would otherwise buffer the whole response.
+    """
+    if request.GET.get('stream', 'false').lower() == 'true':
+        queryset = queryset.order_by(*keys)
+        if isinstance(request, ASGIRequest):
+            content = pagination.astream_json_array(queryset.aiterator(chunk_size=pagination.STREAM_CHUNK_SIZE))
+        else:
+            content = pagination.stream_json_array(queryset.iterator(chunk_size=pagination.STREAM_CHUNK_SIZE))
+        return StreamingHttpResponse(content, content_type='application/json')
+    if 'limit' in request.GET or 'cursor' in request.GET:
+        try:
+            page = pagination.keyset_page(
+                queryset,
+                keys,
+                limit=_parse_int_param(request, 'limit', default=pagination.DEFAULT_PAGE_LIMIT),
+                cursor=request.GET.get('cursor'),
+            )
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+        return JsonResponse(page)
+    return JsonResponse(list(queryset.order_by(*keys)), safe=False)
+
+
+def _list_stocks(request):
+    stocks = models.BaseStockData.objects.all()
+    if request.GET.get('sp500_only', 'true').lower() == 'true':
+        stocks = stocks.filter(is_sp500=True)
+    return stocks
+
+
 def stock_list_view(request):
-    # Assuming you want a unique list based on 'symbol'
-    stocks = (
-        models.BaseStockData.objects
-        .filter(is_sp500=True)
-        .values('symbol', 'name')
-        .distinct()
-        .order_by('name')
-    )
-    # Convert to list to make it serializable as JSON
-    stocks_list = list(stocks)
-    # Return response
-    return JsonResponse(stocks_list, safe=False)
+    logger.info("Request hit stock_list_view")
+    order = request.GET.get('order', 'name')
+    if order not in STOCK_LIST_ORDERS:
+        return JsonResponse(
+            {'error': f"Invalid order: {order}. Must be one of {', '.join(STOCK_LIST_ORDERS)}."},
+            status=400,
+        )
+    # The symbol is the primary key, so every (symbol, name) row is already unique
+    stocks = _list_stocks(request).values('symbol', 'name')
+    return _list_response(request, stocks, STOCK_LIST_ORDERS[order])
 
 
 def get_symbols(request):
     logger.info("Request hit get_symbols")
-    symbols = (
-        models.BaseStockData
-        .objects
-        .filter(is_sp500=True)
-        .values_list('name', flat=True)
-        .distinct()
-        .order_by('name')
-    )
-    return JsonResponse(list(symbols), safe=False)
-    # return JsonResponse({'status': 'ok'})
+    names = _list_stocks(request).values_list('name', flat=True).distinct()
+    return _list_response(request, names, ('name',))
 
-def get_adjusted_stock_price(request, symbol):
-    logger.info("Request hit get_time_series")
-    stock_data = (
+def _daily_prices(symbol):
+    return (
         # MonthlyStockPriceData
         models.StockPriceData
         .objects
@@ -75,10 +130,15 @@ def get_adjusted_stock_price(request, symbol):
         )
         .order_by('date')
     )
-    return JsonResponse(list(stock_data), safe=False)
+
+
+async def get_adjusted_stock_price(request, symbol):
+    logger.info("Request hit get_time_series")
+    stock_data = _daily_prices(symbol)
+    return JsonResponse([row async for row in stock_data], safe=False)
     # return JsonResponse({'status': 'ok'})
     
-def get_quarterly_overview(request, symbol):
+async def get_quarterly_overview(request, symbol):
     logger.info("Request hit get_quarterly_overview")
     stock_data = (
         models.QuarterlyStockOverview
@@ -89,12 +149,35 @@ def get_quarterly_overview(request, symbol):
           'stock__symbol', 
           *{f.name for f in models.QuarterlyStockOverview._meta.get_fields()}
       )
+      # Latest quarter first, so data[0] is the current overview
+      .order_by('-quarter_end_date')
     )
-    return JsonResponse(list(stock_data), safe=False)
+    return JsonResponse([row async for row in stock_data], safe=False)
     # return JsonResponse({'status': 'ok'})
+
+
+def _latest_overview(symbol):
+    return (
+        models.LatestStockOverview
+        .objects
+        .filter(pk=symbol)
+        .values(
+            'stock__name',
+            'stock__symbol',
+            *models.StockOverviewFields.metric_field_names()
+        )
+    )
+
+
+async def get_latest_overview(request, symbol):
+    logger.info("Request hit get_latest_overview")
+    stock_data = await _latest_overview(symbol).afirst()
+    if stock_data is None:
+        return JsonResponse({'error': f'No overview found for {symbol}.'}, status=404)
+    return JsonResponse(stock_data)
     
-def get_earnings(request, symbol):
-    stock_data = (
+def _quarterly_earnings(symbol):
+    return (
         models.EarningsData
         .objects
         .filter(stock__symbol=symbol,
@@ -108,10 +191,16 @@ def get_earnings(request, symbol):
       )
       .order_by('fiscal_date_ending')
     )
-    return JsonResponse(list(stock_data), safe=False)
 
 
-def get_balance_sheet(request, symbol):
+async def get_earnings(request, symbol):
+    logger.info("Request hit get_earnings")
+    stock_data = _quarterly_earnings(symbol)
+    return JsonResponse([row async for row in stock_data], safe=False)
+
+
+async def get_balance_sheet(request, symbol):
+    logger.info("Request hit get_balance_sheet")
     stock_data = (
         models.BalanceSheetData
         .objects
@@ -120,10 +209,11 @@ def get_balance_sheet(request, symbol):
       .values()
       .order_by('date')
     )
-    return JsonResponse(list(stock_data), safe=False)
+    return JsonResponse([row async for row in stock_data], safe=False)
 
 
-def get_income_statement(request, symbol):
+async def get_income_statement(request, symbol):
+    logger.info("Request hit get_income_statement")
     stock_data = (
         models.IncomeStatementData
         .objects
@@ -132,10 +222,10 @@ def get_income_statement(request, symbol):
         .values()
         .order_by('date')
     )
-    return JsonResponse(list(stock_data), safe=False)
+    return JsonResponse([row async for row in stock_data], safe=False)
 
 
-def get_cash_flow(request, symbol):
+async def get_cash_flow(request, symbol):
     logger.info("Request hit get_cash_flow")
     stock_data = (
         models.CashFlowData
@@ -145,15 +235,491 @@ def get_cash_flow(request, symbol):
         .values()
         .order_by('date')
     )
-    return JsonResponse(list(stock_data), safe=False)
+    return JsonResponse([row async for row in stock_data], safe=False)
 
 
-def get_earnings_calendar(request, symbol):
+async def get_fundamental_metrics(request, symbol):
+    logger.info("Request hit get_fundamental_metrics")
     stock_data = (
+        models.FundamentalMetricsData
+        .objects
+        .filter(stock__symbol=symbol)
+        .values()
+        .order_by('date')
+    )
+    return JsonResponse([row async for row in stock_data], safe=False)
+
+
+def get_valuation_history(request, symbol):
+    logger.info("Request hit get_valuation_history")
+    try:
+        start = _parse_date_param(request, 'start')
+        end = _parse_date_param(request, 'end')
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    history = valuation.valuation_history(symbol, start=start, end=end)
+    return JsonResponse(_frame_to_records(history), safe=False)
+
+
+def get_sector(request, name):
+    logger.info("Request hit get_sector")
+    level = request.GET.get('level', 'sector')
+    if level not in dict(models.SectorIndexData.LEVEL_CHOICES):
+        return JsonResponse({'error': f'Invalid level: {level}. Must be sector or industry.'}, status=400)
+    try:
+        start = _parse_date_param(request, 'start')
+        end = _parse_date_param(request, 'end')
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    index = models.SectorIndexData.objects.filter(level=level, name=name)
+    if start:
+        index = index.filter(date__gte=start)
+    if end:
+        index = index.filter(date__lte=end)
+    fields = ['date', 'equal_weight_level', 'cap_weight_level', 'constituents']
+    index = list(index.order_by('date').values(*fields))
+
+    valuation = list(
+        models.SectorValuationData.objects
+        .filter(level=level, name=name)
+        .order_by('quarter_end_date')
+        .values('quarter_end_date', 'constituents', *sectors.VALUATION_FIELDS)
+    )
+    earnings = list(
+        models.SectorEarningsData.objects
+        .filter(level=level, name=name)
+        .order_by('fiscal_date_ending')
+        .values(
+            'fiscal_date_ending',
+            'constituents',
+            'mean_surprise_percentage',
+            'median_surprise_percentage',
+            'beat_rate',
+        )
+    )
+    if not (index or valuation or earnings):
+        return JsonResponse({'error': f'Unknown {level}: {name}.'}, status=404)
+    return JsonResponse({
+        'name': name,
+        'level': level,
+        'index': index,
+        'valuation': valuation,
+        'earnings': earnings,
+    })
+
+
+def get_earnings_events(request, symbol):
+    logger.info("Request hit get_earnings_events")
+    events = event_study.load_events(symbol)
+    return JsonResponse({
+        'symbol': symbol,
+        'statistics': event_study.summarize_events(events),
+        'events': [
+            {
+                **row,
+                'fiscal_date_ending': row['fiscal_date_ending'].isoformat(),
+                'reported_date': row['reported_date'].isoformat(),
+                'event_date': row['event_date'].isoformat(),
+            }
+            for row in events.drop(columns='symbol').astype(object)
+            .where(events.notna(), None).to_dict(orient='records')
+        ],
+    })
+
+
+def get_earnings_event_statistics(request):
+    logger.info("Request hit get_earnings_event_statistics")
+    return JsonResponse({'statistics': event_study.get_universe_statistics()})
+
+
+def _earnings_calendar(symbol):
+    return (
         models.EarningsCalendarData
         .objects
         .filter(stock__symbol=symbol)
         .values()
         .order_by('fiscal_date_ending')
     )
-    return JsonResponse(list(stock_data), safe=False)
\ No newline at end of file
+
+
+async def get_earnings_calendar(request, symbol):
+    logger.info("Request hit get_earnings_calendar")
+    stock_data = _earnings_calendar(symbol)
+    return JsonResponse([row async for row in stock_data], safe=False)
+
+
+async def get_stock_summary(request, symbol):
+    """
+    Everything the single-stock page needs in one response: the latest overview, the
+    daily price history, quarterly earnings and scheduled reports. The four independent
+    queries run concurrently, so the response takes as long as the slowest of them.
+    """
+    logger.info("Request hit get_stock_summary")
+    results = await async_queries.gather_queries(
+        overview=lambda: _latest_overview(symbol).first(),
+        prices=lambda: list(_daily_prices(symbol)),
+        earnings=lambda: list(_quarterly_earnings(symbol)),
+        calendar=lambda: list(_earnings_calendar(symbol)),
+    )
+    if not any(results.values()):
+        return JsonResponse({'error': f'No data found for {symbol}.'}, status=404)
+    return JsonResponse({'symbol': symbol, **results})
+
+
+def get_metrics(request):
+    return HttpResponse(metrics.registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+def get_market_earnings_calendar(request):
+    logger.info("Request hit get_market_earnings_calendar")
+    fields = request.GET.get('fields')
+    try:
+        page = earnings_calendar.upcoming_earnings(
+            start=_parse_date_param(request, 'from'),
+            end=_parse_date_param(request, 'to'),
+            sp500_only=request.GET.get('sp500_only', 'false').lower() == 'true',
+            fields=[field.strip() for field in fields.split(',')] if fields else None,
+            limit=_parse_int_param(request, 'limit', default=earnings_calendar.DEFAULT_CALENDAR_LIMIT),
+            cursor=request.GET.get('cursor'),
+        )
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return JsonResponse(page)
+
+
+def _parse_date_param(request, name):
+    """
+    Reads an optional ISO date (YYYY-MM-DD) from the query string.
+
+    Raises:
+        ValueError: If the parameter is present but is not a valid date.
+    """
+    value = request.GET.get(name)
+    if not value:
+        return None
+    try:
+        date = parse_date(value)
+    except ValueError:
+        # Well formed but out of range, e.g. 2024-13-01
+        date = None
+    if date is None:
+        raise ValueError(f"Invalid {name} date: {value}. Expected YYYY-MM-DD.")
+    return date
+
+
+def _parse_int_param(request, name, default=None, minimum=1):
+    """
+    Reads an optional integer from the query string.
+
+    Raises:
+        ValueError: If the parameter is not an integer or is below the minimum.
+    """
+    value = request.GET.get(name)
+    if not value:
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValueError(f"Invalid {name}: {value}. Expected an integer.")
+    if number < minimum:
+        raise ValueError(f"Invalid {name}: {value}. Must be at least {minimum}.")
+    return number
+
+
+def _frame_to_records(frame):
+    """
+    Converts a date indexed DataFrame into a list of row dictionaries, with missing
+    values as None.
+    """
+    frame = frame.astype(object).where(frame.notna(), None)
+    return [
+        {'date': date.isoformat(), **row}
+        for date, row in zip(frame.index, frame.to_dict(orient='records'))
+    ]
+
+
+def get_price_matrix(request):
+    logger.info("Request hit get_price_matrix")
+    symbols = price_matrix.parse_symbols(request.GET.get('symbols'))
+    field = request.GET.get('field', 'adj_close')
+
+    if not symbols:
+        return JsonResponse({'error': 'At least one symbol is required.'}, status=400)
+    if len(symbols) > price_matrix.MAX_PRICE_MATRIX_SYMBOLS:
+        return JsonResponse(
+            {'error': f'At most {price_matrix.MAX_PRICE_MATRIX_SYMBOLS} symbols are allowed.'},
+            status=400
+        )
+    try:
+        start = _parse_date_param(request, 'start')
+        end = _parse_date_param(request, 'end')
+        matrix = price_matrix.load_price_matrix(symbols, field=field, start=start, end=end)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    return JsonResponse({'field': field, **price_matrix.matrix_to_json(matrix)})
+
+
+def get_returns(request, symbol):
+    logger.info("Request hit get_returns")
+    interval = request.GET.get('interval', 'daily')
+    if interval not in dict(models.StockPriceData.INTERVAL_CHOICES):
+        return JsonResponse({'error': f'Invalid interval: {interval}.'}, status=400)
+    try:
+        window = _parse_int_param(request, 'window')
+        start = _parse_date_param(request, 'start')
+        end = _parse_date_param(request, 'end')
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    log_returns = returns.load_returns(symbol, interval=interval, start=start, end=end)
+    summary = returns.summarize_returns(log_returns, window=window)
+    return JsonResponse(_frame_to_records(summary), safe=False)
+
+
+def get_indicators(request, symbol):
+    logger.info("Request hit get_indicators")
+    names = [name.strip().lower() for name in request.GET.get('names', 'sma').split(',') if name.strip()]
+    interval = request.GET.get('interval', 'daily')
+    if interval not in dict(models.StockPriceData.INTERVAL_CHOICES):
+        return JsonResponse({'error': f'Invalid interval: {interval}.'}, status=400)
+    try:
+        window = _parse_int_param(request, 'window', minimum=2)
+        start = _parse_date_param(request, 'start')
+        end = _parse_date_param(request, 'end')
+        result = indicators.get_indicators(symbol, names, window=window, interval=interval)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    result = result.loc[start:end] if start or end else result
+    return JsonResponse(_frame_to_records(result), safe=False)
+
+
+def get_macro_panel(request):
+    logger.info("Request hit get_macro_panel")
+    series = request.GET.get('series')
+    names = [name.strip().lower() for name in series.split(',') if name.strip()] if series else None
+    try:
+        start = _parse_date_param(request, 'start')
+        end = _parse_date_param(request, 'end')
+        panel = macro.get_panel(
+            names,
+            frequency=request.GET.get('frequency', 'monthly'),
+            method=request.GET.get('method', 'ffill'),
+        )
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    panel = panel.loc[start:end] if start or end else panel
+    return JsonResponse(_frame_to_records(panel), safe=False)
+
+
+def get_yield_curve(request):
+    logger.info("Request hit get_yield_curve")
+    method = request.GET.get('method', 'linear')
+    labels = request.GET.get('maturities')
+    matrix = yield_curve.get_curve_matrix()
+    try:
+        date = _parse_date_param(request, 'date')
+        if labels:
+            labels = [label.strip() for label in labels.split(',') if label.strip()]
+        else:
+            labels = [f'{int(m) // 12}y' if m % 12 == 0 else f'{int(m)}m' for m in matrix.columns]
+        maturities = [yield_curve.parse_maturity(label) for label in labels]
+        curves = matrix.loc[:date] if date else matrix
+        if curves.empty:
+            return JsonResponse({'error': 'No yield curve data available.'}, status=404)
+        curve = yield_curve.interpolate(curves.iloc[[-1]], maturities, method).iloc[0]
+        curve = curve.astype(object).where(curve.notna(), None)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    return JsonResponse({
+        'date': curve.name.isoformat(),
+        'method': method,
+        'curve': [
+            {'maturity': label, 'months': months, 'yield': value}
+            for label, months, value in zip(labels, maturities, curve.tolist())
+        ],
+    })
+
+
+def get_yield_spread(request):
+    logger.info("Request hit get_yield_spread")
+    pairs = request.GET.getlist('pair') or ['10y-2y']
+    try:
+        start = _parse_date_param(request, 'start')
+        end = _parse_date_param(request, 'end')
+        result = yield_curve.spreads(
+            yield_curve.get_curve_matrix(), pairs, method=request.GET.get('method', 'linear')
+        )
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    result = result.loc[start:end] if start or end else result
+    return JsonResponse(_frame_to_records(result), safe=False)
+
+
+def get_correlation(request):
+    logger.info("Request hit get_correlation")
+    symbols = price_matrix.parse_symbols(request.GET.get('symbols'))
+    if not symbols:
+        symbols = list(
+            models.BaseStockData.objects
+            .filter(is_sp500=True)
+            .order_by('symbol')
+            .values_list('symbol', flat=True)
+        )
+    kind = request.GET.get('kind', 'correlation')
+    if kind not in ('correlation', 'covariance'):
+        return JsonResponse({'error': f'Invalid kind: {kind}. Must be correlation or covariance.'}, status=400)
+    try:
+        window = _parse_int_param(request, 'window', default=risk.DEFAULT_RISK_WINDOW)
+        date = _parse_date_param(request, 'date')
+        step = _parse_int_param(request, 'step')
+        if step is not None:
+            # A rolling series: one matrix every `step` trading days from start to date
+            result = risk.get_rolling_risk(
+                symbols, window=window, step=step, start=_parse_date_param(request, 'start'),
+                end=date, shrinkage=request.GET.get('shrinkage', 'none'),
+            )
+        else:
+            result = risk.get_risk_matrix(
+                symbols, window=window, end=date, shrinkage=request.GET.get('shrinkage', 'none')
+            )
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    if step is not None:
+        return JsonResponse({
+            'kind': kind,
+            'window': window,
+            'step': step,
+            'symbols': result['symbols'],
+            'series': [
+                {
+                    'date': date.isoformat(),
+                    'shrinkage': intensity,
+                    'matrix': [[None if value != value else value for value in row] for row in matrix.tolist()],
+                }
+                for date, intensity, matrix in zip(result['dates'], result['shrinkage'].tolist(), result[kind])
+            ],
+        })
+
+    matrix = result[kind]
+    return JsonResponse({
+        'kind': kind,
+        'window': window,
+        'start': result['start'].isoformat() if result['start'] else None,
+        'end': result['end'].isoformat() if result['end'] else None,
+        'shrinkage': result['shrinkage'],
+        'symbols': result['symbols'],
+        'excluded': result['excluded'],
+        # NaN (a symbol without variance) is not valid JSON
+        'matrix': [[None if value != value else value for value in row] for row in matrix.tolist()],
+    })
+
+
+def optimize_portfolio(request):
+    logger.info("Request hit optimize_portfolio")
+    symbols = price_matrix.parse_symbols(request.GET.get('symbols'))
+    if not symbols:
+        symbols = list(
+            models.BaseStockData.objects
+            .filter(is_sp500=True)
+            .order_by('symbol')
+            .values_list('symbol', flat=True)
+        )
+    try:
+        risk_free = request.GET.get('risk_free', '0')
+        try:
+            risk_free = float(risk_free)
+        except ValueError:
+            raise ValueError(f"Invalid risk_free: {risk_free}.")
+        result = optimization.optimize(
+            symbols,
+            method=request.GET.get('method', 'min_variance'),
+            window=_parse_int_param(request, 'window', default=risk.DEFAULT_RISK_WINDOW),
+            end=_parse_date_param(request, 'date'),
+            shrinkage=request.GET.get('shrinkage', 'ledoit_wolf'),
+            risk_free_rate=risk_free,
+            long_only=request.GET.get('long_only', 'true').lower() == 'true',
+        )
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    return JsonResponse({
+        **result,
+        'start': result['start'].isoformat() if result['start'] else None,
+        'end': result['end'].isoformat() if result['end'] else None,
+    })
+
+
+def run_backtest(request):
+    logger.info("Request hit run_backtest")
+    symbols = price_matrix.parse_symbols(request.GET.get('symbols'))
+    universe = not symbols
+    if universe:
+        symbols = list(
+            models.BaseStockData.objects
+            .filter(is_sp500=True)
+            .order_by('symbol')
+            .values_list('symbol', flat=True)
+        )
+    membership = request.GET.get('membership', 'true' if universe else 'false').lower() == 'true'
+    try:
+        tilts = {}
+        for tilt in request.GET.getlist('tilt'):
+            sector, _, multiplier = tilt.rpartition(':')
+            if not sector:
+                raise ValueError(f"Invalid tilt: {tilt}. Expected e.g. Technology:1.5.")
+            try:
+                tilts[sector] = float(multiplier)
+            except ValueError:
+                raise ValueError(f"Invalid tilt: {tilt}. Expected e.g. Technology:1.5.")
+        cost_bps = request.GET.get('cost_bps', '0')
+        try:
+            cost_bps = float(cost_bps)
+        except ValueError:
+            raise ValueError(f"Invalid cost_bps: {cost_bps}.")
+        result = backtest.run_backtest(
+            symbols,
+            weighting=request.GET.get('weighting', 'equal'),
+            rebalance=request.GET.get('rebalance', 'monthly'),
+            start=_parse_date_param(request, 'start'),
+            end=_parse_date_param(request, 'end'),
+            sector_tilts=tilts,
+            use_membership=membership,
+            cost_bps=cost_bps,
+        )
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    return JsonResponse({'stats': result['stats'], 'series': _frame_to_records(result['series'])})
+
+
+def search_stocks(request):
+    logger.info("Request hit search_stocks")
+    try:
+        limit = _parse_int_param(request, 'limit', default=search.DEFAULT_SEARCH_LIMIT)
+        matches = search.search(request.GET.get('q', ''), limit=limit)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return JsonResponse(matches, safe=False)
+
+
+def screen_stocks(request):
+    logger.info("Request hit screen_stocks")
+    fields = request.GET.get('fields')
+    try:
+        limit = _parse_int_param(request, 'limit', default=screener.DEFAULT_SCREEN_LIMIT)
+        rows = screener.screen(
+            filters=request.GET.getlist('filter'),
+            sort=request.GET.get('sort'),
+            fields=[field.strip() for field in fields.split(',')] if fields else None,
+            limit=limit,
+        )
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return JsonResponse(rows, safe=False)